@@ -0,0 +1,213 @@
+"""Concentrador de respuestas de varias estaciones (PCs del simulador).
+
+Cada estación sigue escribiendo su archivo local y, además, envía cada página
+confirmada a este servicio por HTTP (bandeja de salida en sync.py). El servicio guarda todo en una sola base
+SQLite y descarta los duplicados por (estación, número de secuencia), así que
+reenviar un lote es siempre seguro. El número de secuencia es el del diario
+de la estación (storage.Journal), que crece entre ejecuciones; por eso el
+archivo .journal de una estación no debe borrarse.
+
+Protocolo:
+    POST /batches   {"station": "...", "batches": [{"seq": 1, "rows": [[...9 columnas...]]}]}
+                    -> {"results": [{"seq": 1, "status": "stored" | "duplicate" | "conflict"}]}
+    GET  /status    -> {"estación": {"batches": n, "rows": n, "last_seq": n}}
+
+"conflict" indica que ya existía ese (estación, seq) con otras filas (p. ej.
+porque se borró el diario de la estación); el lote nuevo no se guarda.
+
+Uso:
+    python aggregator.py serve --port 8765 --db consolidado.sqlite
+    python aggregator.py export consolidado.sqlite -o consolidado.csv
+    python cuestionarios.py --aggregator http://servidor:8765 --station SIM-1
+
+No depende de Qt.
+"""
+import argparse
+import csv
+import hashlib
+import json
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Sequence
+
+from storage import CSV_HEADER
+
+DEFAULT_PORT = 8765
+AGGREGATE_HEADER = ["station_id", *CSV_HEADER]
+
+# =========================
+# ALMACÉN CONSOLIDADO
+# =========================
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS batches (
+    station  TEXT NOT NULL,
+    seq      INTEGER NOT NULL,
+    digest   TEXT NOT NULL,
+    received TEXT NOT NULL,
+    PRIMARY KEY (station, seq)
+);
+CREATE TABLE IF NOT EXISTS responses (
+    id INTEGER PRIMARY KEY,
+    station TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    timestamp TEXT, participant_id TEXT, block_id TEXT, stage_label TEXT,
+    instrument TEXT, item_code TEXT, item_text TEXT, response TEXT, score TEXT
+);
+"""
+
+
+def batch_digest(rows: Sequence[Sequence]) -> str:
+    # None (puntaje vacío) cuenta igual que "": así se guarda y así llegaba antes
+    payload = json.dumps([["" if v is None else str(v) for v in r] for r in rows],
+                         ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class AggregateStore:
+    """Base SQLite (WAL) compartida por todas las estaciones; un lote = una transacción."""
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()  # el servidor atiende cada petición en su hilo
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=FULL")
+        self._db.executescript(_SCHEMA)
+
+    def add(self, station: str, seq: int, rows: Sequence[Sequence]) -> str:
+        digest = batch_digest(rows)
+        with self._lock, self._db:
+            found = self._db.execute("SELECT digest FROM batches WHERE station=? AND seq=?",
+                                     (station, seq)).fetchone()
+            if found is not None:
+                return "duplicate" if found[0] == digest else "conflict"
+            self._db.execute("INSERT INTO batches VALUES (?,?,?,?)",
+                             (station, seq, digest, datetime.now().isoformat(timespec="seconds")))
+            self._db.executemany(
+                "INSERT INTO responses (station, seq, timestamp, participant_id, block_id, stage_label,"
+                " instrument, item_code, item_text, response, score) VALUES (?,?,?,?,?,?,?,?,?,?,?)",
+                [(station, seq, *("" if v is None else str(v) for v in r)) for r in rows])
+        return "stored"
+
+    def status(self) -> Dict[str, dict]:
+        with self._lock:
+            out = {s: {"batches": n, "rows": 0, "last_seq": last} for s, n, last in
+                   self._db.execute("SELECT station, COUNT(*), MAX(seq) FROM batches GROUP BY station")}
+            for s, n in self._db.execute("SELECT station, COUNT(*) FROM responses GROUP BY station"):
+                out[s]["rows"] = n
+        return out
+
+    def export_csv(self, path: str) -> int:
+        n = 0
+        with self._lock, open(path, "w", newline="", encoding="utf-8-sig") as f:
+            w = csv.writer(f)
+            w.writerow(AGGREGATE_HEADER)
+            for row in self._db.execute(
+                    "SELECT station, timestamp, participant_id, block_id, stage_label, instrument,"
+                    " item_code, item_text, response, score FROM responses ORDER BY station, seq, id"):
+                w.writerow(row)
+                n += 1
+        return n
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def _valid_batch(b) -> bool:
+    return (isinstance(b, dict) and isinstance(b.get("seq"), int) and isinstance(b.get("rows"), list)
+            and all(isinstance(r, list) and len(r) == len(CSV_HEADER) for r in b["rows"]))
+
+
+# =========================
+# SERVIDOR HTTP
+# =========================
+class AggregatorHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # conexiones persistentes: cada estación reutiliza la suya
+    store: AggregateStore  # se asigna en make_server()
+
+    def _reply(self, code: int, body):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path != "/status":
+            self._reply(404, {"error": "not found"})
+            return
+        self._reply(200, self.store.status())
+
+    def do_POST(self):
+        if self.path != "/batches":
+            self._reply(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            msg = json.loads(self.rfile.read(length))
+            station, batches = msg["station"], msg["batches"]
+            if not isinstance(station, str) or not station or not isinstance(batches, list) \
+                    or not all(_valid_batch(b) for b in batches):
+                raise ValueError("formato de lote inválido")
+        except (KeyError, TypeError, ValueError) as e:
+            self._reply(400, {"error": str(e)})
+            return
+        try:
+            results = [{"seq": b["seq"], "status": self.store.add(station, b["seq"], b["rows"])}
+                       for b in batches]
+        except sqlite3.Error as e:
+            self._reply(503, {"error": str(e)})  # la estación reintentará
+            return
+        self._reply(200, {"results": results})
+
+    def log_message(self, fmt, *args):
+        print(f"[aggregator] {self.address_string()} {fmt % args}", file=sys.stderr)
+
+
+def make_server(store: AggregateStore, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    handler = type("Handler", (AggregatorHandler,), {"store": store})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+# =========================
+# MAIN
+# =========================
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Concentrador de respuestas de varias estaciones.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    srv = sub.add_parser("serve", help="recibir lotes por HTTP")
+    srv.add_argument("--host", default="127.0.0.1", help="0.0.0.0 para aceptar otras PCs de la red")
+    srv.add_argument("--port", type=int, default=DEFAULT_PORT)
+    srv.add_argument("--db", default="consolidado.sqlite")
+    exp = sub.add_parser("export", help="exportar la base consolidada a CSV")
+    exp.add_argument("database")
+    exp.add_argument("-o", "--output", required=True)
+    args = ap.parse_args(argv)
+
+    if args.cmd == "serve":
+        store = AggregateStore(args.db)
+        server = make_server(store, args.host, args.port)
+        print(f"Concentrador en http://{args.host}:{args.port} -> {args.db}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            store.close()
+    elif args.cmd == "export":
+        store = AggregateStore(args.database)
+        try:
+            n = store.export_csv(args.output)
+        finally:
+            store.close()
+        print(f"{n} filas exportadas a {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
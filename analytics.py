@@ -0,0 +1,169 @@
+"""Estadísticas en línea por participante a lo largo de los bloques.
+
+Cada vez que se guarda un SAM-Manikin o un SAM-Estrés, RunningStats
+actualiza para ese participante, con memoria constante (algoritmo de
+Welford), la media, la varianza, el mínimo, el máximo, el último valor y el
+cambio respecto de la línea base (primer valor registrado) de:
+
+    valencia, activación, dominio (1–9)
+    estrés, amenaza, desafío y control propio (puntajes normalizados 0–1)
+
+Se alimenta como las demás vistas del escritor: refresh() sólo lee las filas
+agregadas desde la última vez y guarda su estado en <datos>.stats.json, de
+modo que al reiniciar no vuelve a leer el archivo completo. Un bloque que se
+repite cuenta como una observación más. No depende de Qt.
+"""
+import csv
+import json
+import math
+import os
+import sqlite3
+import threading
+from typing import Dict, List, NamedTuple, Tuple
+
+from instruments import INSTRUMENTS
+
+
+class Tracked(NamedTuple):
+    key: str
+    label: str
+    instrument: str   # columna instrument de la fila larga
+    item_code: str
+
+
+_STRESS_SUMMARY = INSTRUMENTS["SAM_Stress"].summary_instrument
+TRACKED = (
+    Tracked("valence", "Valencia", "SAM_Manikin", "Valencia"),
+    Tracked("arousal", "Activación", "SAM_Manikin", "Activación"),
+    Tracked("dominance", "Dominio", "SAM_Manikin", "Dominio"),
+    Tracked("stress", "Estrés", _STRESS_SUMMARY, "stress_level"),
+    Tracked("threat", "Amenaza", _STRESS_SUMMARY, "threat_sum"),
+    Tracked("challenge", "Desafío", _STRESS_SUMMARY, "challenge_sum"),
+    Tracked("control", "Control propio", _STRESS_SUMMARY, "ctrl_self_sum"),
+)
+_BY_ROW = {(t.instrument, t.item_code): t.key for t in TRACKED}
+_KEYS = {t.key for t in TRACKED}
+
+
+class RunningStat:
+    """Media y varianza de Welford más mínimo, máximo, línea base y último valor."""
+    __slots__ = ("n", "mean", "m2", "min", "max", "baseline", "last")
+
+    def __init__(self, n=0, mean=0.0, m2=0.0, min=math.inf, max=-math.inf, baseline=None, last=None):
+        self.n, self.mean, self.m2 = n, mean, m2
+        self.min, self.max = min, max
+        self.baseline, self.last = baseline, last
+
+    def add(self, x: float):
+        self.n += 1
+        d = x - self.mean
+        self.mean += d / self.n
+        self.m2 += d * (x - self.mean)
+        self.min = x if x < self.min else self.min
+        self.max = x if x > self.max else self.max
+        if self.baseline is None:
+            self.baseline = x
+        self.last = x
+
+    @property
+    def variance(self) -> float:
+        """Varianza muestral (0 con menos de dos observaciones)."""
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def sd(self) -> float:
+        return math.sqrt(self.variance)
+
+    @property
+    def change(self) -> float:
+        """Último valor menos la línea base."""
+        return self.last - self.baseline if self.n else 0.0
+
+    def to_list(self) -> list:
+        return [self.n, self.mean, self.m2, self.min, self.max, self.baseline, self.last]
+
+    @classmethod
+    def from_list(cls, values: list) -> "RunningStat":
+        """Inverso de to_list(); ValueError/TypeError si los valores no son números."""
+        n, mean, m2, lo, hi, baseline, last = values
+        opt = [None if v is None else float(v) for v in (baseline, last)]
+        return cls(int(n), float(mean), float(m2), float(lo), float(hi), *opt)
+
+    def copy(self) -> "RunningStat":
+        return RunningStat(*self.to_list())
+
+
+class RunningStats:
+    """RunningStat por (participante, variable), actualizadas con cada lote guardado."""
+    def __init__(self, backend):
+        self.backend = backend
+        self.path = backend.path + ".stats.json"
+        self._lock = threading.Lock()  # refresh() en el hilo escritor; consultas desde la interfaz
+        self._loaded = False
+        self._reset()
+
+    def _reset(self):
+        self._offset = 0
+        self._stats: Dict[str, Dict[str, RunningStat]] = {}
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                cp = json.load(f)
+            if self.backend.fingerprint(cp["offset"]) != cp["fingerprint"]:
+                return  # el archivo cambió: se reconstruye desde el inicio
+            self._stats = {pid: {k: RunningStat.from_list(v) for k, v in by_key.items() if k in _KEYS}
+                           for pid, by_key in cp["stats"].items()}
+            self._offset = cp["offset"]
+        except (OSError, ValueError, KeyError, TypeError, AttributeError, sqlite3.Error):
+            # Punto de control ilegible o dañado (es sólo una caché): se reconstruye desde el inicio
+            self._reset()
+
+    def _save(self):
+        cp = {"offset": self._offset, "fingerprint": self.backend.fingerprint(self._offset),
+              "stats": {pid: {k: s.to_list() for k, s in by_key.items()} for pid, by_key in self._stats.items()}}
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(cp, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    def refresh(self) -> int:
+        """Incorpora las filas nuevas; devuelve cuántas se leyeron."""
+        if not self._loaded:
+            self._loaded = True
+            with self._lock:
+                self._load()
+        try:
+            rows, offset = self.backend.read_since(self._offset)
+        except (ValueError, csv.Error):
+            with self._lock:
+                self._reset()
+            rows, offset = self.backend.read_since(0)
+        if not rows and offset == self._offset:
+            return 0
+        with self._lock:
+            for r in rows:
+                key = _BY_ROW.get((r[4], r[5])) if len(r) >= 9 else None
+                if key is None:
+                    continue
+                try:
+                    x = float(r[8])
+                except (TypeError, ValueError):
+                    continue  # celda vacía o dañada
+                if not math.isfinite(x):
+                    continue
+                by_key = self._stats.setdefault(str(r[1]), {})
+                by_key.setdefault(key, RunningStat()).add(x)
+            self._offset = offset
+            try:
+                self._save()
+            except OSError:
+                pass  # el estado guardado es sólo una caché
+        return len(rows)
+
+    # ---- consultas ----
+    def snapshot(self, pid: str) -> List[Tuple[Tracked, RunningStat]]:
+        """Copia de las estadísticas del participante, en el orden de TRACKED."""
+        with self._lock:
+            by_key = self._stats.get(pid, {})
+            return [(t, by_key[t.key].copy()) for t in TRACKED if t.key in by_key]
@@ -0,0 +1,273 @@
+"""Benchmark sin pantalla: construcción de páginas, puntuación y escritura.
+
+Uso:
+    python bench.py                         # 10 participantes x 20 bloques
+    python bench.py -n 50 --blocks 20 -o bench_results.json
+    python bench.py --compare bench_results_anterior.json
+
+Simula N participantes (evaluación inicial + BLOCKS bloques SAM/SAM-Estrés)
+con respuestas aleatorias y mide, por etapa, el tiempo total, el rendimiento
+(operaciones por segundo) y el pico de memoria asignada en Python
+(tracemalloc, en una segunda pasada para no inflar los tiempos). Los
+resultados se guardan en JSON para comparar una ejecución con otra.
+"""
+import os
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import argparse
+import json
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from PyQt5.QtCore import QT_VERSION_STR
+from PyQt5.QtWidgets import QApplication
+
+import cuestionarios as app_ui
+from instruments import INSTRUMENTS, panas_summary, sam_quadrant_and_emotion, sam_stress_summary
+from records import ResponseRecord
+from storage import journal_path, open_backend
+
+INITIAL = ("BAI", "PSS", "PANAS")
+BLOCK = ("SAM_Manikin", "SAM_Stress")
+
+
+# =========================
+# ETAPAS
+# =========================
+# Cada etapa recibe los parámetros y devuelve (función a medir, nº de operaciones).
+# La preparación (datos aleatorios, carpetas temporales) queda fuera de la medición.
+def _random_answers(rnd: random.Random, code: str) -> List[int]:
+    inst = INSTRUMENTS[code]
+    return [rnd.randrange(len(inst.options)) for _ in inst.items]
+
+
+def _sessions(args) -> List[tuple]:
+    """(participante, bloque, etapa, instrumento, respuestas) en el orden de la aplicación."""
+    rnd = random.Random(args.seed)
+    out = []
+    for p in range(args.participants):
+        pid = f"P{p + 1:03d}"
+        out += [(pid, 1, "Base", code, _random_answers(rnd, code)) for code in INITIAL]
+        for b in range(1, args.blocks + 1):
+            out += [(pid, b, f"Etapa {b}", code, _random_answers(rnd, code)) for code in BLOCK]
+    return out
+
+
+def _new_page(code: str):
+    if code == "SAM_Manikin":
+        return app_ui.SAMManikinWidget("", 1, "")
+    page = app_ui.InstrumentPage(INSTRUMENTS[code], "", 1, "")
+    page.ensure_rows()
+    return page
+
+
+def stage_construct(args):
+    """Construcción en frío de cada tipo de página (lo que paga la primera visita)."""
+    codes = [*INITIAL, *BLOCK] * args.constructs
+    pages = []
+
+    def run():
+        for code in codes:
+            pages.append(_new_page(code))
+        for p in pages:
+            p.deleteLater()
+        pages.clear()
+        QApplication.processEvents()
+    return run, len(codes)
+
+
+def stage_fill(args):
+    """Páginas del pool: reset(), marcar respuestas y generar las filas de la página."""
+    sessions = _sessions(args)
+    pool = {code: _new_page(code) for code in (*INITIAL, *BLOCK)}
+    sink = _RowSink()
+
+    def run():
+        for pid, block, stage, code, answers in sessions:
+            page = pool[code]
+            page.reset(pid, block, stage)
+            for g, j in zip(page.groups, answers):
+                g.button(j).setChecked(True)
+            page.save_to_csv(sink)
+            sink.commit()
+    return run, len(sessions)
+
+
+def stage_scoring_functions(args):
+    """panas_summary, sam_stress_summary y sam_quadrant_and_emotion con datos aleatorios."""
+    rnd = random.Random(args.seed)
+    n = args.participants * args.blocks
+    panas = [(rnd.randint(10, 50), rnd.randint(10, 50)) for _ in range(n)]
+    stress = [{q: rnd.randint(0, 4) for q in range(1, 27)} for _ in range(n)]
+    sam = [(rnd.randint(1, 9), rnd.randint(1, 9)) for _ in range(n)]
+
+    def run():
+        for pa, na in panas:
+            panas_summary(pa, na)
+        for s in stress:
+            sam_stress_summary(s)
+        for v, a in sam:
+            sam_quadrant_and_emotion(v, a)
+    return run, 3 * n
+
+
+def stage_scoring_registry(args):
+    """Instrument.evaluate_many por instrumento (vía usada al guardar y en rescore.py)."""
+    by_code: Dict[str, list] = {}
+    for _, _, _, code, answers in _sessions(args):
+        by_code.setdefault(code, []).append(INSTRUMENTS[code].raw_scores(answers))
+
+    def run():
+        for code, raws in by_code.items():
+            INSTRUMENTS[code].evaluate_many(raws)
+    return run, sum(len(r) for r in by_code.values())
+
+
+def _stage_persist(kind: str):
+    def stage(args):
+        """Escritura de todas las páginas con ResponseWriter (diario incluido) hasta cerrar."""
+        sessions = _sessions(args)
+        batches = []
+        ts = datetime.now().isoformat(timespec="seconds")
+        for pid, block, stage_label, code, answers in sessions:
+            batches.append(INSTRUMENTS[code].page_records(answers, ts, pid, block, stage_label))
+        n_rows = sum(len(b) for b in batches)
+
+        def run():
+            work = tempfile.mkdtemp(prefix="bench_")
+            try:
+                backend = open_backend(kind, os.path.join(work, app_ui.CSV_FILE))
+                writer = app_ui.ResponseWriter(backend, journal=journal_path(backend))
+                writer.start()
+                for records in batches:
+                    writer.extend(records)
+                    writer.commit()
+                writer.close()
+            finally:
+                shutil.rmtree(work, ignore_errors=True)
+        return run, n_rows
+    stage.__doc__ = f"[{kind}] " + stage.__doc__
+    return stage
+
+
+class _RowSink:
+    """Sustituye al escritor en stage_fill: sólo acumula las filas en memoria."""
+    def __init__(self):
+        self.rows = 0
+        self._pending: List[ResponseRecord] = []
+
+    def append(self, record):
+        self._pending.append(record)
+
+    def extend(self, records):
+        self._pending.extend(records)
+
+    def commit(self):
+        self.rows += len(self._pending)
+        self._pending = []
+
+
+STAGES: Dict[str, Callable] = {
+    "construct": stage_construct,
+    "fill": stage_fill,
+    "scoring_functions": stage_scoring_functions,
+    "scoring_registry": stage_scoring_registry,
+    "persist_csv": _stage_persist("csv"),
+    "persist_sqlite": _stage_persist("sqlite"),
+    "persist_sharded": _stage_persist("sharded"),
+}
+
+
+# =========================
+# MEDICIÓN
+# =========================
+def measure(stage: Callable, args) -> dict:
+    run, ops = stage(args)
+    t0 = time.perf_counter()
+    run()
+    seconds = time.perf_counter() - t0
+
+    peak = None
+    if not args.no_memory:
+        run, _ = stage(args)
+        tracemalloc.start()
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {
+        "description": (stage.__doc__ or "").strip(),
+        "ops": ops,
+        "seconds": round(seconds, 6),
+        "ops_per_s": round(ops / seconds, 1) if seconds else None,
+        "ms_per_op": round(seconds * 1000 / ops, 4) if ops else None,
+        "peak_kib": round(peak / 1024, 1) if peak is not None else None,
+    }
+
+
+def compare(current: dict, previous: dict) -> List[str]:
+    lines = []
+    for name, r in current["stages"].items():
+        old = previous.get("stages", {}).get(name)
+        if not old or not old.get("ms_per_op") or not r["ms_per_op"]:
+            continue
+        change = (r["ms_per_op"] / old["ms_per_op"] - 1) * 100
+        lines.append(f"  {name:<20}{old['ms_per_op']:>10.4f} -> {r['ms_per_op']:<10.4f} ms/op  ({change:+.1f} %)")
+    return lines
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark sin pantalla de la aplicación de cuestionarios.")
+    ap.add_argument("-n", "--participants", type=int, default=10)
+    ap.add_argument("--blocks", type=int, default=20, help="bloques por participante (por omisión: %(default)s)")
+    ap.add_argument("--constructs", type=int, default=5, help="construcciones en frío por tipo de página")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES))
+    ap.add_argument("--no-memory", action="store_true", help="omitir la pasada con tracemalloc")
+    ap.add_argument("-o", "--output", default="bench_results.json")
+    ap.add_argument("--compare", metavar="JSON", help="resultados anteriores para mostrar la diferencia")
+    args = ap.parse_args(argv)
+
+    qt_app = QApplication.instance() or QApplication(sys.argv[:1])
+    app_ui.init_fonts()
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "qt": QT_VERSION_STR,
+            "platform": platform.platform(),
+            "participants": args.participants,
+            "blocks": args.blocks,
+            "constructs": args.constructs,
+            "seed": args.seed,
+        },
+        "stages": {},
+    }
+    for name in args.stages:
+        r = results["stages"][name] = measure(STAGES[name], args)
+        mem = f"{r['peak_kib']:>10.1f} KiB" if r["peak_kib"] is not None else ""
+        print(f"{name:<20}{r['ops']:>8} ops {r['seconds']:>9.3f} s {r['ops_per_s']:>12.1f} ops/s{mem}",
+              file=sys.stderr)
+    qt_app.processEvents()  # libera las páginas de la etapa construct
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"Resultados en {args.output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+        print(f"Comparación con {args.compare}:", file=sys.stderr)
+        print("\n".join(compare(results, previous)), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,271 +1,350 @@
-import sys, csv, os
+import time
+_T_START = time.perf_counter()  # referencia para --profile-startup
+import sys, os, argparse, queue, socket, threading
+from array import array
 from datetime import datetime
-from typing import List, Dict, Tuple
+from collections import OrderedDict
+from typing import Callable, Iterator, List, Dict, Sequence, Tuple
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QLabel, QVBoxLayout, QHBoxLayout, QPushButton,
     QRadioButton, QButtonGroup, QScrollArea, QStackedWidget, QLineEdit,
-    QMessageBox, QGroupBox, QComboBox, QSizePolicy, QStackedLayout
+    QMessageBox, QGroupBox, QComboBox, QSizePolicy, QShortcut, QStackedLayout
 )
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QFont, QPixmap, QIcon
+from PyQt5.QtCore import Qt, QObject, QThread, QTimer, pyqtSignal
+from PyQt5.QtGui import QFont, QPixmap, QIcon, QImage, QKeySequence
+_T_QT = time.perf_counter()
+
+from analytics import RunningStats
+from dashboard import DashboardModel, DashboardWindow
+from drafts import Draft, DraftStore, draft_path
+from events import BUS, PAGE_SAVED, PageSaved
+from file_tasks import FileTasks
+from instruments import INSTRUMENTS, Instrument
+from records import ResponseRecord
+from protocol import PROTOCOL_FILE, Flow, Protocol, ProtocolError, load_protocol
+from markers import MarkerStream, parse_address
+from metrics import MetricsLog, TransitionTiming, metrics_path
+from response_times import ITEM_EVENTS, ResponseTimesLog, times_path
+from storage import BACKENDS, DEFAULT_STUDY, STORAGE_ERRORS, Journal, SessionIndex, WideView, journal_path, open_backend
+from sync import Outbox, SyncWorker, outbox_path
+_T_IMPORTS = time.perf_counter()
 
 # =========================
 # CONFIGURACIÓN GENERAL
 # =========================
 APP_TITLE = "Cuestionarios (BAI, PSS, PANAS, SAM-manikin, SAM-estrés)"
 CSV_FILE  = "respuestas_cuestionarios.csv"  # se crea/apendea en la carpeta del script
-BIG_FONT  = QFont("Segoe UI", 16)
-TITLE_FONT = QFont("Segoe UI", 20, QFont.Weight.Bold)
-BTN_FONT   = QFont("Segoe UI", 16)
+STORAGE_BACKEND = "csv"  # "csv", "sqlite" (respuestas_cuestionarios.sqlite) o "sharded"; ver storage.py
+STUDY_ID = DEFAULT_STUDY  # carpeta del estudio con --storage sharded (respuestas_cuestionarios_shards/<estudio>/...)
+AGGREGATOR_URL: str | None = None   # p. ej. "http://192.168.1.10:8765" (ver aggregator.py)
+STATION_ID = socket.gethostname()   # identifica a esta estación ante el concentrador
+MARKERS_ADDR: str | None = None     # p. ej. "192.168.1.20:16571": receptor de marcadores (ver markers.py)
+DRAFT_DELAY_MS = 800   # espera tras el último clic antes de escribir el borrador de la página
+# Fuentes: se crean en init_fonts(), ya con la QApplication en marcha
+BIG_FONT: QFont | None = None
+TITLE_FONT: QFont | None = None
+BTN_FONT: QFont | None = None
+
+def init_fonts():
+    global BIG_FONT, TITLE_FONT, BTN_FONT
+    if BIG_FONT is not None:
+        return
+    BIG_FONT  = QFont("Segoe UI", 16)
+    TITLE_FONT = QFont("Segoe UI", 20, QFont.Weight.Bold)
+    BTN_FONT   = QFont("Segoe UI", 16)
 
 # =========================
 # DEFINICIÓN DE CUESTIONARIOS
 # =========================
-
-# --- BAI (Inventario de Ansiedad de Beck, 21 ítems, 0..3)
-BAI_INSTRUCTIONS = ("INSTRUCCIONES:\n"
-                    "Lea cada síntoma y marque cuánto le ha afectado actualmente. Considere como referencia las dificultades que ha tenido este último mes.")
-BAI_ITEMS = [
-    "Hormigueo o entumecimiento",
-    "Sensación de calor",
-    "Con temblor en las piernas",
-    "Incapacidad de relajarse",
-    "Miedo a que suceda lo peor",
-    "Mareo o aturdimiento",
-    "Latidos del corazón fuertes y acelerados",
-    "Sensación de inestabilidad e inseguridad física",
-    "Atemorizado o asustado",
-    "Nerviosismo",
-    "Sensación de bloqueo o ahogo",
-    "Temblores en las manos",
-    "Inquieto, inseguro o estremecimiento",
-    "Miedo a perder el control",
-    "Dificultad para respirar",
-    "Miedo a morirse",
-    "Sobresaltos",
-    "Con problemas digestivos o abdominales",
-    "Palidez",
-    "Rubor facial",
-    "Con sudores, fríos o calientes (no debidos a la temperatura)",
-]
-BAI_OPTIONS = [("Nada",0), ("Leve",1), ("Moderado",2), ("Bastante",3)]
-
-# --- PSS (Escala de Estrés Percibido 14 ítems, 0..4)
-# Ítems invertidos: 4, 5, 6, 7, 9, 10, 13 (indexados 1..14).
-PSS_REVERSE = {4,5,6,7,9,10,13}
-PSS_ITEMS = [
-    "En el último mes, ¿con qué frecuencia te has sentido afectado por algo que ocurrió inesperadamente?",
-    "En el último mes, ¿con qué frecuencia te has sentido incapaz de controlar las cosas importantes en tu vida?",
-    "En el último mes, ¿con qué frecuencia te has sentido nervioso o estresado?",
-    "En el último mes, ¿con qué frecuencia has manejado con éxito los pequeños problemas irritantes de la vida?",
-    "En el último mes, ¿con qué frecuencia has sentido que has afrontado efectivamente los cambios importantes que han estado ocurriendo en tu vida?",
-    "En el último mes, ¿con qué frecuencia has estado seguro sobre tu capacidad para manejar tus problemas personales?",
-    "En el último mes, ¿con qué frecuencia has sentido que las cosas van bien?",
-    "En el último mes, ¿con qué frecuencia has sentido que no podías afrontar todas las cosas que tenías que hacer?",
-    "En el último mes, ¿con qué frecuencia has podido controlar las dificultades de tu vida?",
-    "En el último mes, ¿con qué frecuencia has sentido que tenías todo bajo control?",
-    "En el último mes, ¿con qué frecuencia has estado enfadado porque las cosas que te han ocurrido estaban fuera de tu control?",
-    "En el último mes, ¿con qué frecuencia has pensado sobre las cosas que te faltan por hacer?",
-    "En el último mes, ¿con qué frecuencia has podido controlar la forma de pasar el tiempo?",
-    "En el último mes, ¿con qué frecuencia has sentido que las dificultades se acumulan tanto que no puedes superarlas?",
+# Los ítems, opciones y la puntuación de cada instrumento están en instruments.py.
+
+# --- SAM-manikin: imágenes de cada dimensión
+# (etiqueta, imagen en Sources/, invertir escala)
+SAM_MANIKIN_DIMS = [
+    ("Valencia (muy desagradable → muy agradable)", "valence_scale.png", False),
+    ("Activación (muy activado → muy calmado)",     "arousal_scale.png", True),
+    ("Dominio (sin control → con mucho control)",    "dominance_scale.png", False),
 ]
-PSS_OPTIONS = [("Nunca",0),("Casi nunca",1),("De vez en cuando",2),("A menudo",3),("Muy a menudo",4)]
-
-# --- PANAS (20 adjetivos, 1..5)
-PANAS_INSTRUCTIONS = ("INSTRUCCIONES:\n"
-                      "Esta escala consiste en una serie de palabras  que describen diferentes sentimientos y emociones. Lea cada palabra y marque la respuesta apropieada para usted.\n"
-                      "Indique cómo se siente generalmente.")
-PANAS_ITEMS = [
-    "Motivado/a","Molesto/a","Emocionado/a", "De malas","Firme", "Culpable","Temeroso/a","Agresivo/a","Entusiasmado/a","Estar orgulloso/a","Irritable","Alerta","Avergonzado/a","Inspirado/a","Nervioso/a", "Decidido/a", "Estar atento/a", "Inquieto/a", "Activo/a", "Inseguro/a"
-]
-PANAS_OPTIONS = [("Muy poco o nada",1),("Algo",2),("Moderadamente",3),("Bastante",4),("Extremadamente",5)]
-
-# --- SAM-manikin (valencia, activación, dominio) 1..5
-SAM_MANIKIN_ITEMS = [
-    ("Valencia (muy desagradable → muy agradable)", 1, 9),
-    ("Activación (muy activado → muy calmado)",     1, 9),
-    ("Dominio (sin control → con mucho control)",    1, 9),
-]
-
-# --- SAM-estrés (Stress Appraisal Measure, subset: 2,5,8,14,20,16,22,19,24,26) escala 0..4
-SAM_STRESS_Instructions = ("INSTRUCCIONES:\n"
-                           "Este cuestionario se refiere a tus pensamientos sobre la situación identificada previamente. No hay respuestas correctas o incorrrectas.\n"
-                           "Por favor, responde según como te sentiste con la situación.")
-SAM_STRESS_ALL = {
-    1:"¿Es esta una situación totalmente desesperada?",
-    2:"¿Esta situación te crea tensión?",
-    3:"¿El resultado de esta situación es incontrolable por alguien más?",
-    4:"¿Hay alguien o alguna agencia a la que puedas recurrir para pedir ayuda si la necesitas?",
-    5:"¿La situación te hizo sentir ansioso?",
-    6:"¿Esta situación tiene consecuencias importantes para ti?",
-    7:"¿Esta situación va a tener un impacto positivo en ti?",
-    8:"¿Qué tan ansioso estabas por abordar el evento?",
-    9:"¿Cuánto te afectará el resultado de esta situación?",
-    10:"¿Hasta qué punto puedes convertirte en una persona más fuerte debido a este problema?",
-    11:"¿El resultado de esta situación será negativo?",
-    12:"¿Tienes la capacidad de hacerlo bien en esta situación?",
-    13:"¿Esta situación tiene implicaciones serias para ti?",
-    14:"¿Tuviste lo necesario para hacerlo bien en esa situación?",
-    15:"¿Hubo ayuda disponible para mí para lidiar con este problema?",
-    16:"¿La situación superó o agotó mis recursos de afrontamiento?",
-    17:"¿Hubo suficientes recursos disponibles para ayudarme a lidiar con esta situación?",
-    18:"¿Estaba fuera del poder de alguien hacer algo sobre esta situación?",
-    19:"¿Qué tan emocionado estuviste pensando en el resultado de esta situación?",
-    20:"¿Qué tan amenazante fue la situación?",
-    21:"¿El problema fue irresoluble por alguien?",
-    22:"¿Pude superar el problema?",
-    23:"¿Hubo alguien que pudiera ayudarme a manejar este problema?",
-    24:"¿En qué medida percibí esta situación como estresante?",
-    25:"¿Tuve las habilidades necesarias para lograr un resultado exitoso en esta situación?",
-    26:"¿En qué medida este evento requirió esfuerzos de afrontamiento de mi parte?",
-    27:"¿Esta situación tuvo consecuencias a largo plazo para mí?",
-    28:"¿Esto iba a tener un impacto negativo en mí?",
-}
-SAM_STRESS_SUBSET_ORDER = [2,8,14,20,16,5,22,19,24,26]
-SAM_STRESS_OPTIONS = [("Nada",0),("Poco",1),("Algo",2),("Mucho",3),("Demasiado",4)]
 
 # =========================
-# INTERPRETACIÓN / RESÚMENES
+# ESCRITURA DE RESPUESTAS
 # =========================
+class ResponseWriter(QThread):
+    """Escribe las respuestas en disco desde un hilo propio.
+
+    Los registros (ResponseRecord) de cada cuestionario se acumulan con
+    append()/extend() en el hilo de la interfaz; commit() entrega el lote (inmutable) a la cola del hilo escritor
+    y regresa de inmediato. Cada lote se registra primero en el diario
+    (Journal) y después se escribe con el backend configurado (ver storage.py).
+    Si el archivo está bloqueado (p. ej. abierto en Excel) se reintenta sin
+    congelar la pantalla del participante; lo que no alcance a escribirse
+    queda en el diario y se completa al iniciar la siguiente vez. Con un
+    concentrador configurado, cada lote confirmado se anexa además a la
+    bandeja de salida (pusher) junto con su número de secuencia.
+    """
+    committed = pyqtSignal(int)  # filas escritas en el lote
+    failed = pyqtSignal(str)     # descripción del error (se seguirá reintentando)
+    indexed = pyqtSignal()       # el índice de sesiones se actualizó
+
+    RETRY_SECONDS = 2.0
+    CLOSE_RETRIES = 3
+
+    def __init__(self, backend, index: SessionIndex | None = None, journal: str | None = None,
+                 pusher: SyncWorker | None = None, views: Sequence = ()):
+        super().__init__()
+        self.backend = backend
+        self.index = index
+        self.journal_file = journal  # el diario se abre y se lee en el hilo escritor
+        self.journal: Journal | None = None
+        self.pusher = pusher
+        self.views = tuple(views)  # vistas derivadas (refresh()) que se ponen al día tras cada lote
+        self._pending: List[ResponseRecord] = []
+        self._queue: "queue.Queue[Tuple[ResponseRecord, ...] | None]" = queue.Queue()
+        self._closing = False
+
+    # ---- hilo de la interfaz ----
+    def append(self, record: ResponseRecord):
+        self._pending.append(record)
+
+    def extend(self, records: Sequence[ResponseRecord]):
+        self._pending.extend(records)
+
+    def commit(self):
+        if not self._pending:
+            return
+        self._queue.put(tuple(self._pending))
+        self._pending = []
 
-# ---- BAI
-def interpret_bai(total: int) -> str:
-    if total <= 7:
-        return "Minimal anxiety"
-    elif total <= 15:
-        return "Mild anxiety"
-    elif total <= 25:
-        return "Moderate anxiety"
-    else:
-        return "Severe anxiety"
-
-# ---- PSS
-def interpret_pss(total: int) -> str:
-    if total <= 18:
-        return "Low stress"
-    elif total <= 37:
-        return "Moderate stress"
-    else:
-        return "High stress"
-
-# ---- PANAS
-PANAS_POS_WORDS = {
-    "Motivado/a","Emocionado/a","Firme","Entusiasmado/a","Estar orgulloso/a",
-    "Alerta","Inspirado/a","Decidido/a","Estar atento/a","Activo/a"
-}
-PANAS_NEG_WORDS = {
-    "Molesto/a","De malas","Culpable","Temeroso/a","Agresivo/a",
-    "Irritable","Avergonzado/a","Nervioso/a","Inquieto/a","Inseguro/a"
-}
-
-# índices 1-based de PANAS positivos/negativos con respecto a PANAS_ITEMS
-PANAS_POS_IDX = {i for i, w in enumerate(PANAS_ITEMS, start=1) if w in PANAS_POS_WORDS}
-PANAS_NEG_IDX = {i for i, w in enumerate(PANAS_ITEMS, start=1) if w in PANAS_NEG_WORDS}
-
-def _band_10_25_26_35_36_50(x: int) -> str:
-    # Rango teórico 10..50 (10 ítems, escala 1..5)
-    if x <= 25:
-        return "Low"
-    elif x <= 35:
-        return "Moderate"
-    else:
-        return "High"
-
-def panas_summary(pa_sum: int, na_sum: int):
-    balance = pa_sum - na_sum
-    bal_label = "Negative" if balance < 0 else ("Balanced" if balance == 0 else "Positive")
-    pa_cat = _band_10_25_26_35_36_50(pa_sum)
-    na_cat = _band_10_25_26_35_36_50(na_sum)
-
-    # Etiqueta global (1–2 palabras, inglés)
-    if pa_cat == "High" and na_cat == "Low":
-        overall = "Optimal"
-    elif pa_cat == "Low" and na_cat == "High":
-        overall = "Distress"
-    elif pa_cat == "High" and na_cat == "High":
-        overall = "Ambivalent"
-    elif pa_cat == "Low" and na_cat == "Low":
-        overall = "Blunted affect"
-    else:
-        # respaldo por balance
-        overall = "Positive" if balance > 0 else ("Negative" if balance < 0 else "Balanced")
-
-    return {
-        "PA_sum": pa_sum, "NA_sum": na_sum, "PA_minus_NA": balance,
-        "PA_cat": pa_cat, "NA_cat": na_cat, "Balance_cat": bal_label,
-        "Overall": overall
-    }
-
-# ---- SAM-Manikin (cuadrante por Valence–Arousal y emoción)
-def sam_quadrant_and_emotion(V: int, A: int):
-    if V == 5 and A == 5:
-        return "Q0", "Neutral"
-    if V > 5 and A > 5:
-        return "Q1", "Elated"
-    if V < 5 and A > 5:
-        return "Q2", "Anxious/tense"
-    if V < 5 and A < 5:
-        return "Q3", "Tired/sadness"
-    if V > 5 and A < 5:
-        return "Q4", "Calm"
-    if V > 5 and A == 5:
-        return "Q1/Q4", "Happy"
-    if V == 5 and A > 5:
-        return "Q1/Q2", "Aroused"
-    if V < 5 and A == 5:
-        return "Q2/Q3", "Unhappy"
-    if V == 5 and A < 5:
-        return "Q3/Q4", "Quiet"
-    # fallback (no debería alcanzarse)
-    return "Q?", "Undefined"
-
-# ---- SAM-Stress (sumatorias y bandas)
-def _band_low_mod_high(sum_val: int, low_max: int, mod_max: int) -> str:
-    if sum_val <= low_max:
-        return "Low"
-    elif sum_val <= mod_max:
-        return "Moderate"
-    else:
-        return "High"
-
-def sam_stress_summary(scores_by_q: dict[int, int]):
-    # Aseguramos presencia; si falta alguna clave, tomamos 0
-    g = lambda *kk: sum(scores_by_q.get(k, 0) for k in kk)
-
-    s_stress = g(2,16,24,26)             # 0..16
-    s_threat = g(2,5)                     # 0..8
-    s_chall  = g(8,19)                    # 0..8
-    s_ctrl   = g(14,22)                   # 0..8
-
-    return {
-        "STRESS_sum": (s_stress, _band_low_mod_high(s_stress, 5, 10) + " stress"),
-        "THREAT_sum": (s_threat, _band_low_mod_high(s_threat, 2, 5) + " threat"),
-        "CHALLENGE_sum": (s_chall, _band_low_mod_high(s_chall, 2, 5) + " challenge"),
-        "CTRL_SELF_sum": (s_ctrl, _band_low_mod_high(s_ctrl, 2, 5) + " controllable-by-self"),
-    }
+    def close(self):
+        """Entrega lo pendiente y espera a que el hilo termine de escribir."""
+        if self._closing:
+            return
+        self.commit()
+        self._closing = True
+        self._queue.put(None)
+        self.wait()
+
+    # ---- hilo escritor ----
+    def run(self):
+        if self.journal_file is not None:
+            try:
+                self.journal = Journal(self.journal_file)
+            except OSError as e:
+                print(f"[Journal] No se pudo abrir {self.journal_file}: {e}; se escribe sin diario.", file=sys.stderr)
+        self._recover()
+        self._refresh_views()
+        self._refresh_index()
+        while True:
+            batch = self._queue.get()
+            if batch is None:
+                break
+            self._write_with_retry(batch)
+            self._refresh_views()
+            self._refresh_index()  # emite indexed con las vistas ya al día
+        self.backend.close()
+        if self.journal is not None:
+            self.journal.close()
+
+    def _recover(self):
+        """Completa las páginas que quedaron sin confirmar en la ejecución anterior."""
+        if self.journal is None:
+            return
+        if not self.journal.pending:
+            self.journal.compact()  # todo confirmado: no hace falta guardar las filas
+            return
+        try:
+            n = self._recover_journal()
+        except STORAGE_ERRORS as e:
+            self.failed.emit(str(e))  # se reintenta antes del siguiente lote
+            return
+        if n:
+            print(f"[Journal] {n} página(s) recuperada(s) del diario.", file=sys.stderr)
+
+    def _refresh_index(self):
+        if self.index is None:
+            return
+        try:
+            self.index.refresh()
+        except Exception as e:
+            # El índice es una ayuda para el entrevistador: nunca detiene la escritura
+            print(f"[SessionIndex] No se pudo actualizar el índice: {type(e).__name__}: {e}", file=sys.stderr)
+            return
+        self.indexed.emit()
+
+    def _refresh_views(self):
+        for view in self.views:
+            try:
+                view.refresh()
+            except STORAGE_ERRORS as e:
+                # Se reintenta tras el siguiente lote; los datos ya están en el backend
+                print(f"[{type(view).__name__}] No se pudo actualizar {view.path}: {e}", file=sys.stderr)
+            except Exception as e:
+                # Una vista derivada nunca detiene la escritura: se desactiva hasta reiniciar
+                print(f"[{type(view).__name__}] Se desactiva {view.path}: {type(e).__name__}: {e}", file=sys.stderr)
+                self.views = tuple(v for v in self.views if v is not view)
+
+    def _write_with_retry(self, batch: tuple):
+        attempts = 0
+        seq = start = None
+        while True:
+            try:
+                if self.journal is None:
+                    self.backend.write_batch(batch)
+                else:
+                    if self.journal.pending:
+                        self._recover_journal()  # en orden: primero lo anterior
+                    if seq is None:
+                        start = self.backend.position()
+                        seq = self.journal.begin(batch, start)
+                        self.backend.write_batch(batch, seq)
+                    elif not self.backend.has_batch(seq, start, batch):
+                        # Un intento fallido pudo dejarlo a medias; si falló después
+                        # de escribirlo (p. ej. al confirmar) no se escribe dos veces
+                        self.backend.repair(start)
+                        self.backend.write_batch(batch, seq)
+                    if self.pusher is not None:
+                        # Antes de confirmar: si el proceso muere aquí, recover() lo vuelve a anexar
+                        self._push(seq, batch)
+                    self.journal.commit(seq)
+                break
+            except STORAGE_ERRORS as e:
+                attempts += 1
+                self.backend.close()  # se reabre en el siguiente intento
+                if self._closing and attempts >= self.CLOSE_RETRIES:
+                    where = "quedan en el diario" if seq is not None else "se perdieron"
+                    print(f"[ResponseWriter] {len(batch)} filas no se escribieron ({where}): {e}", file=sys.stderr)
+                    return
+                self.failed.emit(str(e))
+                time.sleep(self.RETRY_SECONDS)
+        self.committed.emit(len(batch))
+
+    def _recover_journal(self) -> int:
+        # Cada lote recuperado pudo no haber llegado a la bandeja; el concentrador descarta los repetidos
+        return self.journal.recover(self.backend, self._push if self.pusher is not None else None)
+
+    def _push(self, seq: int, rows: Sequence[ResponseRecord]):
+        """Anexa el lote a la bandeja de salida (sólo disco; la red va aparte)."""
+        try:
+            self.pusher.push(seq, rows)
+        except OSError as e:
+            print(f"[SyncWorker] El lote {seq} no se agregó a la bandeja de salida: {e}", file=sys.stderr)
 
 # =========================
-# UTILIDADES CSV
+# CACHÉ DE IMÁGENES
 # =========================
-def ensure_csv_header(path: str):
-    exists = os.path.isfile(path)
-    if not exists:
-        with open(path, "a", newline="", encoding="utf-8-sig") as f:
-            w = csv.writer(f)
-            w.writerow([
-                "timestamp","participant_id","block_id","stage_label",
-                "instrument","item_code","item_text","response","score"
-            ])
-
-def append_row(row: List):
-    with open(CSV_FILE, "a", newline="", encoding="utf-8-sig") as f:
-        csv.writer(f).writerow(row)
+def device_pixel_ratio() -> float:
+    app = QApplication.instance()
+    return app.devicePixelRatio() if app is not None else 1.0
+
+class PixmapCache:
+    """Imágenes ya escaladas, compartidas por todas las páginas que las usan.
+
+    La clave es (ruta, ancho, alto, devicePixelRatio). La decodificación y el
+    escalado se hacen sobre QImage, que puede prepararse en un hilo de fondo
+    con preload(); en el hilo de la interfaz sólo se convierte a QPixmap una
+    vez. Si una página pide una imagen que preload() todavía está
+    preparando, espera a ese hilo en vez de decodificarla otra vez. Si cambia
+    la fecha de modificación del archivo se vuelve a cargar.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._images: Dict[tuple, Tuple[float, QImage]] = {}
+        self._pixmaps: Dict[tuple, Tuple[float, QPixmap]] = {}
+        self._loading: Dict[tuple, threading.Event] = {}  # claves que prepara preload()
+
+    @staticmethod
+    def _key(path: str, w: int, h: int, dpr: float) -> tuple:
+        return (os.path.abspath(path), w, h, dpr)
+
+    def _load(self, key: tuple, mtime: float) -> QImage | None:
+        path, w, h, dpr = key
+        img = QImage(path)
+        if img.isNull():
+            return None
+        img = img.scaled(round(w * dpr), round(h * dpr),
+                         Qt.AspectRatioMode.KeepAspectRatio,
+                         Qt.TransformationMode.SmoothTransformation)
+        img.setDevicePixelRatio(dpr)
+        with self._lock:
+            self._images[key] = (mtime, img)
+        return img
+
+    def preload(self, paths: List[str], w: int, h: int, dpr: float = 1.0) -> threading.Thread:
+        """Decodifica y escala las imágenes en segundo plano."""
+        keys = [self._key(path, w, h, dpr) for path in paths]
+        with self._lock:
+            for key in keys:
+                self._loading.setdefault(key, threading.Event())
+
+        def work():
+            for key in keys:
+                try:
+                    self._load(key, os.path.getmtime(key[0]))
+                except OSError:
+                    pass
+                finally:
+                    with self._lock:
+                        done = self._loading.pop(key, None)
+                    if done is not None:
+                        done.set()
+        t = threading.Thread(target=work, name="PixmapCache.preload", daemon=True)
+        t.start()
+        return t
+
+    def pixmap(self, path: str, w: int, h: int, dpr: float = 1.0) -> QPixmap | None:
+        """QPixmap escalado listo para usar, o None si el archivo no existe."""
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+        key = self._key(path, w, h, dpr)
+        cached = self._pixmaps.get(key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        with self._lock:
+            loading = self._loading.get(key)
+        if loading is not None:
+            loading.wait()  # ya se está preparando en segundo plano
+        with self._lock:
+            entry = self._images.get(key)
+        img = entry[1] if entry is not None and entry[0] == mtime else self._load(key, mtime)
+        if img is None:
+            return None
+        pm = QPixmap.fromImage(img)
+        self._pixmaps[key] = (mtime, pm)
+        return pm
+
+SAM_PIXMAPS = PixmapCache()
 
 # =========================
 # WIDGETS GENERALES
 # =========================
+def clear_groups(groups: List[QButtonGroup]):
+    """Desmarca todas las opciones (un grupo exclusivo no permite desmarcar directamente)."""
+    for g in groups:
+        b = g.checkedButton()
+        if b is not None:
+            g.setExclusive(False)
+            b.setChecked(False)
+            g.setExclusive(True)
+
+def progress_text(answered: int, total: int) -> str:
+    return f"{answered} / {total} respondidas"
+
 class QuestionGroup(QWidget):
-    """Grupo de varias preguntas con opciones tipo radio grande."""
+    """Grupo de varias preguntas con opciones tipo radio grande.
+
+    Las filas de preguntas se crean bajo demanda: al construir la página sólo
+    se crean las primeras EAGER_ROWS y el resto se agrega por bloques conforme
+    el participante se acerca al final del área visible. Las respuestas se
+    guardan en un arreglo compacto (índice de opción, -1 = sin responder) que,
+    junto con la cuenta de ítems sin responder, se actualiza con cada clic:
+    saber si la página está completa o mostrar el avance no recorre las filas.
+    """
+    EAGER_ROWS = 6
+    CHUNK_ROWS = 4
+    answers_changed = pyqtSignal()
+
     def __init__(self, instrument: str, items: List[str],
                  options: List[Tuple[str,int]], participant_id: str,
                  block_id: int, stage_label: str, item_prefix: str = "",
@@ -280,6 +359,9 @@ class QuestionGroup(QWidget):
         self.stage_label = stage_label
         self.item_prefix = item_prefix
         self.groups: List[QButtonGroup] = []
+        self.answers = array("b", [-1] * len(items))
+        self.unanswered = len(items)
+        self.visit = 0  # visita abierta en response_times (0 = no se registran clics)
 
         layout = QVBoxLayout()
         title = QLabel(instrument)
@@ -296,169 +378,155 @@ class QuestionGroup(QWidget):
             instr.setContentsMargins(8, 0, 8, 12)
             layout.addWidget(instr)
 
-        # Scroll para listas largas
+        # Scroll para listas largas (una sola fuente compartida por todas las filas)
         container = QWidget()
-        v = QVBoxLayout(container)
-        v.setSpacing(16)
-
-        for idx, txt in enumerate(items, start=1):
-            box = QGroupBox(f"{idx}. {txt}")
-            box_font = QFont(BIG_FONT)
-            box.setFont(box_font)
-            hb = QHBoxLayout()
-            bg = QButtonGroup(self)
-            bg.setExclusive(True)
-            for opt_txt, val in options:
-                rb = QRadioButton(opt_txt)
-                rb.setFont(BIG_FONT)
-                rb.setProperty("score", val)
-                bg.addButton(rb)
-                hb.addWidget(rb)
-            box.setLayout(hb)
-            v.addWidget(box)
-            self.groups.append(bg)
+        container.setFont(BIG_FONT)
+        self._rows = QVBoxLayout(container)
+        self._rows.setSpacing(16)
+        self._rows.addStretch(1)
+        self.ensure_rows(self.EAGER_ROWS)
 
-        v.addStretch(1)
         scroll = QScrollArea()
         scroll.setWidgetResizable(True)
         scroll.setWidget(container)
+        self.scroll = scroll
+        bar = scroll.verticalScrollBar()
+        bar.valueChanged.connect(self._maybe_grow)
+        bar.rangeChanged.connect(self._maybe_grow)
 
         layout.addWidget(scroll)
 
         btns = QHBoxLayout()
+        self.progress = QLabel(progress_text(0, len(items)))
+        self.progress.setStyleSheet("color:#555;")
         self.prev_btn = QPushButton("Anterior")
         self.next_btn = QPushButton("Siguiente")
         self.prev_btn.setFont(BTN_FONT)
         self.next_btn.setFont(BTN_FONT)
+        btns.addWidget(self.progress)
         btns.addStretch(1)
         btns.addWidget(self.prev_btn)
         btns.addWidget(self.next_btn)
         layout.addLayout(btns)
         self.setLayout(layout)
 
+    # ---- construcción bajo demanda ----
+    def item_title(self, idx: int, txt: str) -> str:
+        return f"{idx}. {txt}"
+
+    def ensure_rows(self, n: int | None = None):
+        """Crea las filas que falten hasta tener n (todas si n es None)."""
+        n = len(self.items) if n is None else min(n, len(self.items))
+        for i in range(len(self.groups), n):
+            self._add_row(i)
+
+    def _add_row(self, i: int):
+        box = QGroupBox(self.item_title(i + 1, self.items[i]))
+        hb = QHBoxLayout()
+        bg = QButtonGroup(self)
+        bg.setExclusive(True)
+        for j, (opt_txt, val) in enumerate(self.options):
+            rb = QRadioButton(opt_txt)
+            rb.setProperty("score", val)
+            bg.addButton(rb, j)
+            hb.addWidget(rb)
+        bg.idToggled.connect(lambda j, on, i=i: self._on_toggled(i, j, on))
+        bg.idClicked.connect(lambda j, i=i: ITEM_EVENTS.click(self.visit, i, j))
+        box.setLayout(hb)
+        self._rows.insertWidget(self._rows.count() - 1, box)  # antes del stretch
+        self.groups.append(bg)
+
+    def _maybe_grow(self, *_):
+        if len(self.groups) >= len(self.items):
+            return
+        bar = self.scroll.verticalScrollBar()
+        if bar.maximum() - bar.value() < self.scroll.viewport().height():
+            self.ensure_rows(len(self.groups) + self.CHUNK_ROWS)
+
+    def _on_toggled(self, i: int, j: int, on: bool):
+        # En un grupo exclusivo el orden de las señales (se marca una, se desmarca otra) no importa
+        if on:
+            if self.answers[i] < 0:
+                self.unanswered -= 1
+            self.answers[i] = j
+        elif self.answers[i] == j:
+            self.answers[i] = -1
+            self.unanswered += 1
+        else:
+            return
+        self.progress.setText(progress_text(len(self.items) - self.unanswered, len(self.items)))
+        self.answers_changed.emit()
+
+    # ---- respuestas ----
+    def reset(self, participant_id: str, block_id: int, stage_label: str):
+        """Limpia las respuestas y asigna participante/bloque/etapa para reutilizar la página."""
+        self.participant_id = participant_id
+        self.block_id = block_id
+        self.stage_label = stage_label
+        clear_groups(self.groups)
+        self.scroll.verticalScrollBar().setValue(0)
+
+    def set_answers(self, answers: Sequence[int]) -> bool:
+        """Marca las respuestas de un borrador (índices de opción, -1 = sin responder)."""
+        if len(answers) != len(self.items) or any(j >= len(self.options) for j in answers):
+            return False
+        self.ensure_rows()
+        for g, j in zip(self.groups, answers):
+            if j >= 0:
+                g.button(j).setChecked(True)
+        return True
+
     def all_answered(self) -> bool:
-        return all(g.checkedButton() is not None for g in self.groups)
+        return self.unanswered == 0
 
-    def save_to_csv(self):
-        ts = datetime.now().isoformat(timespec="seconds")
-        for idx, g in enumerate(self.groups, start=1):
-            b = g.checkedButton()
-            score = b.property("score")
-            code = f"{self.item_prefix}{idx}"
-            txt  = self.items[idx-1]
-            append_row([ts, self.participant_id, self.block_id, self.stage_label,
-                        self.instrument, code, txt, b.text(), score])
-
-# PSS con inversión de ítems
-class PSSWidget(QuestionGroup):
-    def __init__(self, instrument: str, items, options, participant_id: str, block_id: int, stage_label: str):
-        instr_text = (
-            "INSTRUCCIONES:\n"
-            "Las preguntas en esta escala hacen referencia a tus sentimientos y pensamientos durante el último mes. En cada caso, por favor indica la expresión que mejor represente como te has sentido o cómo has enfrentado cada situación.\n"
-            ""
-        )
-        super().__init__(instrument, items, options, participant_id, block_id, stage_label, item_prefix='PSS_', instructions=instr_text)
+    def item_code(self, i: int) -> str:
+        return f"{self.item_prefix}{i + 1}"
 
-    def save_to_csv(self):
-        ts = datetime.now().isoformat(timespec="seconds")
-        total = 0
-        for idx, g in enumerate(self.groups, start=1):
-            b = g.checkedButton()
-            val = b.property("score")  # 0..4
-            # invertir donde corresponda
-            score = 4 - val if idx in PSS_REVERSE else val
-            total += score
-            code = f"PSS_{idx}"
-            txt  = self.items[idx-1]
-            append_row([ts, self.participant_id, self.block_id, self.stage_label,
-                        "PSS", code, txt, b.text(), score])
-        # guardar total como fila resumen
-        append_row([ts, self.participant_id, self.block_id, self.stage_label,
-                    "PSS_TOTAL", "sum", "Suma de 14 ítems", interpret_pss(total), total])
-        
-# BAI con total + interpretación
-class BAIWidget(QuestionGroup):
-    def __init__(self, instrument: str, items, options, participant_id: str, block_id: int, stage_label: str):
-        super().__init__(instrument, items, options, participant_id, block_id, stage_label, item_prefix='BAI_', instructions=BAI_INSTRUCTIONS)
-
-    def save_to_csv(self):
-        ts = datetime.now().isoformat(timespec="seconds")
-        total = 0
-        for idx, g in enumerate(self.groups, start=1):
-            b = g.checkedButton()
-            score = int(b.property("score"))
-            total += score
-            code = f"BAI_{idx}"
-            txt  = self.items[idx-1]
-            append_row([ts, self.participant_id, self.block_id, self.stage_label,
-                        "BAI", code, txt, b.text(), score])
-
-        # Resumen: total + interpretación
-        append_row([ts, self.participant_id, self.block_id, self.stage_label,
-                    "BAI_SUMMARY", "total", "Total (0–63)", interpret_bai(total), total])
-
-# PANAS con PA / NA / PA-NA + categorías e interpretación global
-class PANASWidget(QuestionGroup):
-    def __init__(self, instrument: str, items, options, participant_id: str, block_id: int, stage_label: str):
-        super().__init__(instrument, items, options, participant_id, block_id, stage_label, item_prefix='PANAS_', instructions=PANAS_INSTRUCTIONS)
-
-    def save_to_csv(self):
+    def response_label(self, j: int) -> str:
+        return self.options[j][0]
+
+# Página para cualquier instrumento del registro (ver instruments.py)
+class InstrumentPage(QuestionGroup):
+    def __init__(self, definition: Instrument, participant_id: str, block_id: int, stage_label: str):
+        self.definition = definition
+        super().__init__(definition.title, list(definition.items), list(definition.options),
+                         participant_id, block_id, stage_label, item_prefix=f"{definition.code}_",
+                         instructions=definition.instructions)
+
+    def item_title(self, idx: int, txt: str) -> str:
+        return super().item_title(idx, txt) if self.definition.numbered else txt
+
+    def item_code(self, i: int) -> str:
+        return self.definition.item_codes[i]
+
+    def save_to_csv(self, writer: ResponseWriter):
         ts = datetime.now().isoformat(timespec="seconds")
-        pa_sum = 0
-        na_sum = 0
-
-        for idx, g in enumerate(self.groups, start=1):
-            b = g.checkedButton()
-            score = int(b.property("score"))  # 1..5
-            code = f"PANAS_{idx}"
-            txt  = self.items[idx-1]
-
-            # Guardado por ítem
-            append_row([ts, self.participant_id, self.block_id, self.stage_label,
-                        "PANAS", code, txt, b.text(), score])
-
-            # Acumuladores PA/NA
-            if idx in PANAS_POS_IDX:
-                pa_sum += score
-            elif idx in PANAS_NEG_IDX:
-                na_sum += score
-
-        info = panas_summary(pa_sum, na_sum)
-
-        # Filas de totales
-        append_row([ts, self.participant_id, self.block_id, self.stage_label,
-                    "PANAS_SUMMARY", "PA_sum", "Positive Affect (sum 10 items)", "", info["PA_sum"]])
-        append_row([ts, self.participant_id, self.block_id, self.stage_label,
-                    "PANAS_SUMMARY", "NA_sum", "Negative Affect (sum 10 items)", "", info["NA_sum"]])
-        append_row([ts, self.participant_id, self.block_id, self.stage_label,
-                    "PANAS_SUMMARY", "PA_minus_NA", "Balance (PA - NA)", "", info["PA_minus_NA"]])
-
-        # Clasificaciones
-        append_row([ts, self.participant_id, self.block_id, self.stage_label,
-                    "PANAS_SUMMARY", "PA_cat", "PA category", info["PA_cat"], ""])
-        append_row([ts, self.participant_id, self.block_id, self.stage_label,
-                    "PANAS_SUMMARY", "NA_cat", "NA category", info["NA_cat"], ""])
-        append_row([ts, self.participant_id, self.block_id, self.stage_label,
-                    "PANAS_SUMMARY", "Balance_cat", "Balance category", info["Balance_cat"], ""])
-
-        # Interpretación global
-        append_row([ts, self.participant_id, self.block_id, self.stage_label,
-                    "PANAS_SUMMARY", "Overall", "Overall affective state", info["Overall"], ""])
+        records = tuple(self.definition.page_records(self.answers, ts, self.participant_id,
+                                                     self.block_id, self.stage_label))
+        writer.extend(records)
+        BUS.publish(PAGE_SAVED, PageSaved(ts, self.participant_id, self.block_id, self.stage_label,
+                                          self.definition.code, records))
 
 # SAM-manikin simple (3 preguntas, 1..9) con imagen horizontal de tamaño uniforme
 class SAMManikinWidget(QWidget):
+    # --- tamaño uniforme para TODAS las imágenes ---
+    SCALE_W, SCALE_H = 600, 160
+    answers_changed = pyqtSignal()
+
     def __init__(self, participant_id: str, block_id: int, stage_label: str):
         super().__init__()
         self.participant_id = participant_id
         self.block_id = block_id
         self.stage_label = stage_label
         self.groups: List[QButtonGroup] = []
-
-        # --- tamaño uniforme para TODAS las imágenes ---
-        self.SCALE_W, self.SCALE_H = 600, 160
+        self.definition = INSTRUMENTS["SAM_Manikin"]
+        # El id de cada radio es el índice de su puntaje (1..9 -> 0..8)
+        self.answers = array("b", [-1] * len(SAM_MANIKIN_DIMS))
+        self.unanswered = len(SAM_MANIKIN_DIMS)
+        self.visit = 0
 
         layout = QVBoxLayout()
-        title = QLabel("Maniquí de autoevaluación (Valencia, Activación, Dominio)")
+        title = QLabel(self.definition.title)
         title.setFont(TITLE_FONT)
         layout.addWidget(title)
 
@@ -474,13 +542,7 @@ class SAMManikinWidget(QWidget):
         instr.setContentsMargins(8, 0, 8, 12)
         layout.addWidget(instr)
 
-        dims = [
-            ("Valencia (muy desagradable → muy agradable)", "valence_scale.png", False),
-            ("Activación (muy activado → muy calmado)",     "arousal_scale.png", True),
-            ("Dominio (sin control → con mucho control)",    "dominance_scale.png", False),
-        ]
-
-        for label_text, img_file, invert in dims:
+        for label_text, img_file, invert in SAM_MANIKIN_DIMS:
             group_box = QGroupBox(label_text)
             group_box.setFont(BIG_FONT)
             vbox = QVBoxLayout()
@@ -491,12 +553,8 @@ class SAMManikinWidget(QWidget):
             img_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
             img_label.setFixedSize(self.SCALE_W, self.SCALE_H)
             img_label.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents, True)
-            if os.path.isfile(img_path):
-                pm = QPixmap(img_path).scaled(
-                    self.SCALE_W, self.SCALE_H,
-                    Qt.AspectRatioMode.KeepAspectRatio,
-                    Qt.TransformationMode.SmoothTransformation
-                )
+            pm = SAM_PIXMAPS.pixmap(img_path, self.SCALE_W, self.SCALE_H, device_pixel_ratio())
+            if pm is not None:
                 img_label.setPixmap(pm)
             else:
                 img_label.setText(f"[Falta imagen: {img_file}]")
@@ -514,9 +572,12 @@ class SAMManikinWidget(QWidget):
             for k in range(1, 10):  # 1..9
                 rb = QRadioButton(str(k))
                 rb.setFont(BIG_FONT)
-                rb.setProperty("score", 10 - k if invert else k)
-                bg.addButton(rb)
+                score = 10 - k if invert else k
+                rb.setProperty("score", score)
+                bg.addButton(rb, score - 1)
                 rb_h.addWidget(rb)
+            bg.idToggled.connect(lambda j, on, i=len(self.groups): self._on_toggled(i, j, on))
+            bg.idClicked.connect(lambda j, i=len(self.groups): ITEM_EVENTS.click(self.visit, i, j))
 
             # --- SUPERPOSICIÓN: imagen + radios ---
             canvas = QWidget()
@@ -543,10 +604,13 @@ class SAMManikinWidget(QWidget):
 
         # Navegación
         btns = QHBoxLayout()
+        self.progress = QLabel(progress_text(0, len(self.groups)))
+        self.progress.setStyleSheet("color:#555;")
         self.prev_btn = QPushButton("Anterior")
         self.next_btn = QPushButton("Siguiente")
         self.prev_btn.setFont(BTN_FONT)
         self.next_btn.setFont(BTN_FONT)
+        btns.addWidget(self.progress)
         btns.addStretch(1)
         btns.addWidget(self.prev_btn)
         btns.addWidget(self.next_btn)
@@ -554,81 +618,61 @@ class SAMManikinWidget(QWidget):
 
         self.setLayout(layout)
 
+    def reset(self, participant_id: str, block_id: int, stage_label: str):
+        """Limpia las respuestas y asigna participante/bloque/etapa para reutilizar la página."""
+        self.participant_id = participant_id
+        self.block_id = block_id
+        self.stage_label = stage_label
+        clear_groups(self.groups)
+
+    def _on_toggled(self, i: int, j: int, on: bool):
+        if on:
+            if self.answers[i] < 0:
+                self.unanswered -= 1
+            self.answers[i] = j
+        elif self.answers[i] == j:
+            self.answers[i] = -1
+            self.unanswered += 1
+        else:
+            return
+        self.progress.setText(progress_text(len(self.groups) - self.unanswered, len(self.groups)))
+        self.answers_changed.emit()
+
+    def set_answers(self, answers: Sequence[int]) -> bool:
+        if len(answers) != len(self.groups) or any(j > 8 for j in answers):
+            return False
+        for g, j in zip(self.groups, answers):
+            if j >= 0:
+                g.button(j).setChecked(True)
+        return True
+
     def all_answered(self) -> bool:
-        return all(g.checkedButton() is not None for g in self.groups)
+        return self.unanswered == 0
 
-    def save_to_csv(self):
-        ts = datetime.now().isoformat(timespec="seconds")
-        names = ["Valencia","Activación","Dominio"]
-        vals = []
-        for i, g in enumerate(self.groups):
-            b = g.checkedButton()
-            score = int(b.property("score"))
-            vals.append(score)
-            append_row([ts, self.participant_id, self.block_id, self.stage_label,
-                        "SAM_Manikin", names[i], names[i], str(score), score])
-            
-        # Resumen por cuadrante (Valence–Arousal)
-        V, A = vals[0], vals[1]
-        quadrant, emotion = sam_quadrant_and_emotion(V, A)
-        append_row([ts, self.participant_id, self.block_id, self.stage_label,
-                    "SAM_Manikin_SUMMARY", "quadrant", "Quadrant by Valence–Arousal", quadrant, ""])
-        append_row([ts, self.participant_id, self.block_id, self.stage_label,
-                    "SAM_Manikin_SUMMARY", "interpretation", "Emotion", emotion, ""])
-
-# SAM-estrés (subset)
-class SAMStressSubsetWidget(QuestionGroup):
-    def __init__(self, participant_id: str, block_id: int, stage_label: str):
-        items = [f"{k}. {SAM_STRESS_ALL[k]}" for k in SAM_STRESS_SUBSET_ORDER]
-        super().__init__("Medida de evaluación del estrés (SAM) – Subconjunto", items,
-                         SAM_STRESS_OPTIONS, participant_id, block_id, stage_label, item_prefix="SAMQ_",
-                         instructions=SAM_STRESS_Instructions)
-        # Sobrescribe el rotulado para conservar el código original
-        for i, gb in enumerate(self.findChildren(QGroupBox), start=0):
-            k = SAM_STRESS_SUBSET_ORDER[i]
-            gb.setTitle(f"{SAM_STRESS_ALL[k]}")
-
-    def save_to_csv(self):
+    def item_code(self, i: int) -> str:
+        return self.definition.item_codes[i]
+
+    def response_label(self, j: int) -> str:
+        return self.definition.options[j][0]
+
+    def save_to_csv(self, writer: ResponseWriter):
         ts = datetime.now().isoformat(timespec="seconds")
-        scores_by_q = {}
-        for i, g in enumerate(self.groups):
-            k = SAM_STRESS_SUBSET_ORDER[i]
-            b = g.checkedButton()
-            score = int(b.property("score"))
-            scores_by_q[k] = score
-            append_row([ts, self.participant_id, self.block_id, self.stage_label,
-                        "SAM_Stress", f"Question{k}", SAM_STRESS_ALL[k], b.text(), score])
-
-        # Resúmenes solicitados
-        sums = sam_stress_summary(scores_by_q)
-
-        # 2,16,24,26 -> stress level
-        s, label = sums["STRESS_sum"]
-        append_row([ts, self.participant_id, self.block_id, self.stage_label,
-                    "SAM_Stress_SUMMARY", "stress_level", "Stress Score", label, s/16])
-
-        # 2+5 -> threat
-        s, label = sums["THREAT_sum"]
-        append_row([ts, self.participant_id, self.block_id, self.stage_label,
-                    "SAM_Stress_SUMMARY", "threat_sum", "Threat Score", label, s/8])
-
-        # 8+19 -> challenge
-        s, label = sums["CHALLENGE_sum"]
-        append_row([ts, self.participant_id, self.block_id, self.stage_label,
-                    "SAM_Stress_SUMMARY", "challenge_sum", "Challenge Score", label, s/8])
-
-        # 14+22 -> controllable-by-self
-        s, label = sums["CTRL_SELF_sum"]
-        append_row([ts, self.participant_id, self.block_id, self.stage_label,
-                    "SAM_Stress_SUMMARY", "ctrl_self_sum", "Ctrl-self score", label, s/8])
+        records = tuple(self.definition.page_records(self.answers, ts, self.participant_id,
+                                                     self.block_id, self.stage_label))
+        writer.extend(records)
+        BUS.publish(PAGE_SAVED, PageSaved(ts, self.participant_id, self.block_id, self.stage_label,
+                                          self.definition.code, records))
 
 # =========================
 # PÁGINAS DE FLUJO
 # =========================
 class StartPage(QWidget):
     """Pantalla inicial para ID de participante y elegir flujo."""
-    def __init__(self, proceed_initial, proceed_block):
+    def __init__(self, flows: Sequence[Flow], proceed, index: SessionIndex | None = None,
+                 stats: RunningStats | None = None, blocks: int = 20):
         super().__init__()
+        self.index = index
+        self.stats = stats
         v = QVBoxLayout()
         title = QLabel(APP_TITLE)
         title.setFont(TITLE_FONT)
@@ -644,7 +688,7 @@ class StartPage(QWidget):
 
         self.block_combo = QComboBox()
         self.block_combo.setFont(BIG_FONT)
-        self.block_combo.addItems([str(i) for i in range(1, 21)])
+        self.block_combo.addItems([str(i) for i in range(1, blocks + 1)])
         block_row = QHBoxLayout()
         block_row.addWidget(QLabel("Bloque #:"))
         block_row.addWidget(self.block_combo)
@@ -652,55 +696,188 @@ class StartPage(QWidget):
         for w in (block_row.itemAt(0).widget(),):
             w.setFont(BIG_FONT)
 
-        btn_initial = QPushButton("Evaluación inicial (BAI + PSS + PANAS)")
-        btn_block   = QPushButton("Iniciar Bloque Inter-etapas (SAM-manikin + SAM-estrés)")
-        for b in (btn_initial, btn_block):
+        # Lo ya registrado para el participante (según el índice de sesiones)
+        self.history = QLabel()
+        self.history.setWordWrap(True)
+        self.history.setFont(QFont('Segoe UI', 14))
+        self.history.setStyleSheet("color:#333;")
+        self.history.hide()
+
+        # Estadísticas acumuladas de los bloques del participante (para el entrevistador)
+        self.stats_label = QLabel()
+        self.stats_label.setFont(QFont('Consolas', 11))
+        self.stats_label.setStyleSheet("color:#333;")
+        self.stats_label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        self.stats_label.hide()
+
+        # Un botón por flujo del protocolo
+        flow_buttons = []
+        for flow in flows:
+            b = QPushButton(flow.label)
             b.setFont(BTN_FONT)
+            b.clicked.connect(lambda _, name=flow.name: proceed(name, self._payload(name)))
+            flow_buttons.append(b)
 
         v.addWidget(self.id_edit)
         v.addWidget(self.stage_edit)
         v.addLayout(block_row)
+        v.addWidget(self.history)
+        v.addWidget(self.stats_label)
         v.addSpacing(20)
-        v.addWidget(btn_initial)
-        v.addWidget(btn_block)
+        for b in flow_buttons:
+            v.addWidget(b)
         v.addStretch(1)
         self.setLayout(v)
 
-        btn_initial.clicked.connect(lambda: proceed_initial(self._payload()))
-        btn_block.clicked.connect(lambda: proceed_block(self._payload()))
+        self.id_edit.textChanged.connect(lambda _: self.refresh_history())
+        self.block_combo.currentIndexChanged.connect(lambda _: self.refresh_history(suggest=False))
 
-    def _payload(self):
+    def refresh_history(self, suggest: bool = True):
+        """Muestra lo registrado para el ID escrito y sugiere el siguiente bloque."""
+        pid = self.id_edit.text().strip()
+        self._show_stats(pid)
+        if self.index is None or not pid:
+            self.history.hide()
+            return
+        done = self.index.completed_blocks(pid)
+        if suggest and done:
+            nxt = self.index.suggest_block(pid)
+            if nxt <= self.block_combo.count():
+                self.block_combo.setCurrentIndex(nxt - 1)
+        text = ("Evaluación inicial: " + ("registrada" if self.index.initial_done(pid) else "pendiente") +
+                " · Bloques completados: " + (", ".join(map(str, done)) if done else "ninguno"))
+        if int(self.block_combo.currentText()) in done:
+            text += f"\n⚠ El bloque {self.block_combo.currentText()} ya está registrado para este participante."
+        self.history.setText(text)
+        self.history.show()
+
+    def _show_stats(self, pid: str):
+        snap = self.stats.snapshot(pid) if self.stats is not None and pid else []
+        if not snap:
+            self.stats_label.hide()
+            return
+        lines = [f"{'':<15}{'n':>3}{'media':>8}{'DE':>7}{'mín':>7}{'máx':>7}{'último':>8}{'Δ base':>8}"]
+        for t, st in snap:
+            lines.append(f"{t.label:<15}{st.n:>3}{st.mean:>8.2f}{st.sd:>7.2f}{st.min:>7.2f}{st.max:>7.2f}"
+                         f"{st.last:>8.2f}{st.change:>+8.2f}")
+        self.stats_label.setText("\n".join(lines))
+        self.stats_label.show()
+
+    def _confirm_repeat(self, message: str) -> bool:
+        answer = QMessageBox.question(self, "Ya registrado", message + "\n¿Continuar de todos modos?",
+                                      QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                                      QMessageBox.StandardButton.No)
+        return answer == QMessageBox.StandardButton.Yes
+
+    def _payload(self, flow: str | None = None):
         pid = self.id_edit.text().strip()
         stage = self.stage_edit.text().strip() or "SinEtiqueta"
         block = int(self.block_combo.currentText())
         if not pid:
             QMessageBox.warning(self, "Dato faltante", "Introduce el ID del participante.")
             return None
+        if self.index is not None:
+            if flow == "block" and block in self.index.completed_blocks(pid):
+                if not self._confirm_repeat(f"El bloque {block} ya está registrado para {pid}."):
+                    return None
+            elif flow == "initial" and self.index.initial_done(pid):
+                if not self._confirm_repeat(f"La evaluación inicial de {pid} ya está registrada."):
+                    return None
         return {"participant_id": pid, "stage_label": stage, "block_id": block}
 
 class TransitionPage(QWidget):
-    def __init__(self, message: str, on_next):
+    """Mensaje entre cuestionarios; se reutiliza cambiando texto y acción."""
+    def __init__(self, message: str = "", on_next=None):
         super().__init__()
+        self._on_next = on_next
         v = QVBoxLayout()
-        lab = QLabel(message)
-        lab.setWordWrap(True)
-        lab.setFont(TITLE_FONT)
-        lab.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.label = QLabel(message)
+        self.label.setWordWrap(True)
+        self.label.setFont(TITLE_FONT)
+        self.label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         v.addStretch(1)
-        v.addWidget(lab)
+        v.addWidget(self.label)
         v.addStretch(1)
         btn = QPushButton("Continuar")
         btn.setFont(BTN_FONT)
-        btn.clicked.connect(on_next)
+        btn.clicked.connect(self._continue)
         v.addWidget(btn, alignment=Qt.AlignmentFlag.AlignCenter)
         self.setLayout(v)
 
+    def set_content(self, message: str, on_next):
+        self.label.setText(message)
+        self._on_next = on_next
+
+    def _continue(self):
+        if self._on_next is not None:
+            self._on_next()
+
+# =========================
+# CONSTRUCCIÓN EN RATOS LIBRES
+# =========================
+class IdleBuilder(QObject):
+    """Ejecuta trabajos por partes en los ratos libres del ciclo de eventos.
+
+    Cada trabajo es un generador: cada next() hace un trozo pequeño (p. ej.
+    crear unas cuantas filas) y vuelve. Un QTimer de intervalo 0 avanza un
+    trozo por vuelta, así que los clics y el teclado se atienden entre trozo
+    y trozo. Los trabajos urgentes (la página siguiente) pasan al frente.
+    """
+    def __init__(self, parent: QObject | None = None):
+        super().__init__(parent)
+        self._jobs: "OrderedDict[str, Iterator]" = OrderedDict()
+        self._on_idle: List[Callable[[], None]] = []
+        self._timer = QTimer(self)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._tick)
+
+    def add(self, key: str, job: Iterator, urgent: bool = False):
+        if key not in self._jobs:
+            self._jobs[key] = job
+        if urgent:
+            self._jobs.move_to_end(key, last=False)
+        self._timer.start()
+
+    def promote(self, key: str):
+        if key in self._jobs:
+            self._jobs.move_to_end(key, last=False)
+
+    def when_idle(self, callback: Callable[[], None]):
+        """Llama a callback una vez, cuando ya no queden trabajos."""
+        self._on_idle.append(callback)
+        self._timer.start()
+
+    def _tick(self):
+        if not self._jobs:
+            self._timer.stop()
+            callbacks, self._on_idle = self._on_idle, []
+            for cb in callbacks:
+                cb()
+            return
+        key, job = next(iter(self._jobs.items()))
+        try:
+            next(job)
+        except StopIteration:
+            self._jobs.pop(key, None)
+
 # =========================
 # APLICACIÓN PRINCIPAL
 # =========================
+
 class MainWindow(QWidget):
-    def __init__(self):
+    """Ventana del participante; el protocolo (protocol.py) decide qué páginas se muestran.
+
+    Es una máquina de estados sencilla: (flujo, paso). "Siguiente" valida y
+    guarda la página actual y avanza; mientras el participante contesta, la
+    página del siguiente paso se construye y se deja limpia de antemano para
+    que el cambio sea inmediato.
+    """
+    def __init__(self, storage: str = STORAGE_BACKEND, aggregator: str | None = AGGREGATOR_URL,
+                 station: str = STATION_ID, dashboard: bool = False, protocol: Protocol | None = None,
+                 markers: str | None = MARKERS_ADDR, study: str = STUDY_ID):
         super().__init__()
+        self.protocol = protocol or load_protocol(PROTOCOL_FILE)
+        init_fonts()
         self.setWindowTitle(APP_TITLE)
         self.resize(1100, 800)
         self.setWindowIcon(QIcon("Sources/logo.ico"))
@@ -708,127 +885,429 @@ class MainWindow(QWidget):
         # Fuente grande por defecto
         self.setFont(BIG_FONT)
 
-        ensure_csv_header(CSV_FILE)
+        # Un único escritor para toda la sesión (se inicia al final, ya conectado)
+        backend = open_backend(storage, CSV_FILE, study)
+        self.index = SessionIndex(backend)
+        self.stats = RunningStats(backend)
+        # Envío opcional de cada página confirmada al concentrador de estaciones
+        self.pusher = SyncWorker(aggregator, station, Outbox(outbox_path(backend.path))) if aggregator else None
+        self.writer = ResponseWriter(backend, self.index, journal_path(backend), self.pusher,
+                                     views=[WideView(backend), self.stats])
+        self.writer.committed.connect(self._on_saved)
+        self.writer.failed.connect(self._on_save_failed)
+        # Registros auxiliares: se escriben en un hilo de fondo, no al cambiar de página
+        self.file_tasks = FileTasks()
+        # Tiempos de cada cambio de página, en un archivo aparte
+        self.metrics = MetricsLog(metrics_path(backend.path), self.file_tasks)
+        # Tiempos de respuesta por ítem, en otra tabla aparte
+        self.times = ResponseTimesLog(times_path(backend.path), tasks=self.file_tasks)
+        # Marcadores opcionales para alinear con el simulador y los registros fisiológicos
+        self.markers = MarkerStream(*parse_address(markers), source_id=station) if markers else None
+        # Borrador de la página en curso: se escribe un momento después del último clic
+        self.drafts = DraftStore(draft_path(backend.path), self.file_tasks)
+        self._draft_timer = QTimer(self)
+        self._draft_timer.setSingleShot(True)
+        self._draft_timer.setInterval(DRAFT_DELAY_MS)
+        self._draft_timer.timeout.connect(self._write_draft)
+        # Panel del entrevistador (Ctrl+D): el modelo escucha desde el inicio, la ventana se crea al abrirla
+        self.dashboard_model = DashboardModel()
+        self.dashboard: DashboardWindow | None = None
+        QShortcut(QKeySequence("Ctrl+D"), self, activated=self.toggle_dashboard)
 
         self.stack = QStackedWidget()
+        # Aviso discreto para el entrevistador si el CSV no se puede escribir
+        self.save_status = QLabel()
+        self.save_status.setStyleSheet("color:#aa0000;")
+        self.save_status.setFont(QFont('Segoe UI', 11))
+        self.save_status.hide()
         layout = QVBoxLayout()
         layout.addWidget(self.stack)
+        layout.addWidget(self.save_status)
         self.setLayout(layout)
 
         # Página de inicio
-        self.start = StartPage(self.start_initial_flow, self.start_block_flow)
+        self.start = StartPage(list(self.protocol.flows.values()), self.start_flow, self.index, self.stats,
+                               self.protocol.blocks)
         self.stack.addWidget(self.start)
+        self.writer.indexed.connect(self.start.refresh_history)
+
+        # Páginas reutilizables: cada instrumento se construye una sola vez
+        self.pid, self.block, self.stage = "", 1, ""
+        self.flow: Flow | None = None
+        self.step = -1
+        self._prepared: QWidget | None = None  # página ya limpia para el siguiente paso
+        self.pages: Dict[str, QWidget] = {}
+        self.idle = IdleBuilder(self)
+        self.transition = TransitionPage()
+        self.stack.addWidget(self.transition)
+
+        self.writer.start()
+        if dashboard:
+            self.toggle_dashboard()
+
+    # ---------- Páginas ----------
+    def _page(self, code: str, urgent: bool = False) -> QWidget:
+        """Página del pool; si no existe se crea su esqueleto y el resto de filas en ratos libres."""
+        page = self.pages.get(code)
+        if page is None:
+            page = self._build_page(code)
+            self.pages[code] = page
+            self.stack.addWidget(page)
+            if isinstance(page, QuestionGroup) and len(page.groups) < len(page.items):
+                self.idle.add(f"rows:{code}", self._grow_rows(page), urgent)
+        return page
+
+    def _page_job(self, code: str, then: Callable[[], None] | None = None, urgent: bool = False) -> Iterator:
+        self._page(code, urgent)
+        if then is not None:
+            then()
+        yield
+
+    @staticmethod
+    def _grow_rows(page: QuestionGroup) -> Iterator:
+        while len(page.groups) < len(page.items):
+            page.ensure_rows(len(page.groups) + page.CHUNK_ROWS)
+            yield
+
+    def _build_page(self, code: str) -> QWidget:
+        if code == "SAM_Manikin":
+            page = SAMManikinWidget(self.pid, self.block, self.stage)
+        else:
+            page = InstrumentPage(INSTRUMENTS[code], self.pid, self.block, self.stage)
+        page.prev_btn.clicked.connect(self._prev)
+        page.next_btn.clicked.connect(self._next)
+        page.answers_changed.connect(self._draft_timer.start)
+        return page
+
+    def warm_up(self, on_done=None):
+        """Prepara imágenes y páginas después de mostrar la pantalla inicial.
+
+        Todo pasa por IdleBuilder (primero los esqueletos de las páginas y
+        después sus filas, por trozos) para que la pantalla inicial siga
+        respondiendo mientras tanto.
+        """
+        def preload():
+            SAM_PIXMAPS.preload([os.path.join("Sources", f) for _, f, _ in SAM_MANIKIN_DIMS],
+                                SAMManikinWidget.SCALE_W, SAMManikinWidget.SCALE_H, device_pixel_ratio())
+            yield
+        self.idle.add("pixmaps", preload())
+        for code in self.protocol.pages():
+            self.idle.add(f"page:{code}", self._page_job(code))
+        if on_done is not None:
+            self.idle.when_idle(on_done)
+
+    def _show_page(self, code: str, timing: TransitionTiming | None = None, mark: bool = True) -> QWidget:
+        """Muestra una página del pool limpia y asociada al participante actual.
+
+        Con mark=False quien la muestra llama a _mark_shown() (p. ej. después
+        de restaurar respuestas).
+        """
+        page = self._page(code, urgent=True)
+        self.idle.promote(f"rows:{code}")
+        if page is not self._prepared:
+            page.reset(self.pid, self.block, self.stage)
+        self._prepared = None
+        if mark:
+            self._mark_shown(page)
+        self._show(page, timing)
+        return page
+
+    def _mark_shown(self, page: QWidget):
+        page.visit = ITEM_EVENTS.shown(page.answers, page.visit)
+        self._marker("page_shown", page=page.definition.code, step=self.step)
+
+    def _marker(self, name: str, **fields):
+        if self.markers is not None:
+            self.markers.push(name, participant=self.pid, block=self.block, stage=self.stage,
+                              flow=self.flow.name if self.flow else "", **fields)
+
+    def _show_transition(self, message: str, on_next, timing: TransitionTiming | None = None):
+        self.transition.set_content(message, on_next)
+        self._show(self.transition, timing)
+
+    def _show(self, page: QWidget, timing: TransitionTiming | None):
+        if timing is None:
+            self.stack.setCurrentWidget(page)
+            return
+        timing.lap("construct")
+        self.stack.setCurrentWidget(page)
+        timing.lap("show")
+
+        def painted():
+            timing.lap("paint")
+            self.metrics.record(timing)
+        # El temporizador 0 corre después del maquetado y pintado pendientes
+        QTimer.singleShot(0, painted)
+
+    def _validated(self, page, name: str, message: str) -> TransitionTiming | None:
+        """Inicia el cronómetro de la transición si la página está completa."""
+        timing = self.metrics.start(name)
+        if not page.all_answered():
+            QMessageBox.information(self, "Faltan respuestas", message)
+            return None
+        timing.lap("validate")
+        return timing
 
     # ---------- Flujos ----------
-    def start_initial_flow(self, payload):
+    def start_flow(self, name: str, payload):
         if not payload: return
         self.pid = payload["participant_id"]
         self.stage = payload["stage_label"]
         self.block = payload["block_id"]
-        # BAI
-        self.bai = BAIWidget("Inventario de Ansiedad de Beck (BAI)",
-                             BAI_ITEMS, BAI_OPTIONS, self.pid, self.block, self.stage)
-        self.bai.prev_btn.clicked.connect(self.go_start)
-        self.bai.next_btn.clicked.connect(self._bai_next)
-        self.stack.addWidget(self.bai); self.stack.setCurrentWidget(self.bai)
-
-    def _bai_next(self):
-        if not self.bai.all_answered():
-            QMessageBox.information(self, "Faltan respuestas", "Responde todas las preguntas.")
+        self.flow = self.protocol.flows[name]
+        self.step = -1
+        self._prepared = None
+        self._marker("flow_start")
+        self._advance()
+
+    def start_initial_flow(self, payload):
+        self.start_flow("initial", payload)
+
+    def start_block_flow(self, payload):
+        self.start_flow("block", payload)
+
+    def _timing_name(self, i: int) -> str:
+        """Nombre de la transición desde el paso i hasta la siguiente página (o el fin)."""
+        src = self.flow.steps[i].page.lower() if self.flow.steps[i].is_page else "transicion"
+        j = self.flow.next_page(i)
+        return f"{src}>{self.flow.steps[j].page.lower() if j is not None else 'fin'}"
+
+    def _advance(self, timing: TransitionTiming | None = None):
+        """Pasa al siguiente paso del flujo (o a la pantalla inicial al terminar)."""
+        self.step += 1
+        if self.step >= len(self.flow.steps):
+            self._marker("flow_end", completed=True)
+            self.flow = None
+            self.writer.commit()
+            self.times.flush()
+            self._show(self.start, timing)
             return
-        self.bai.save_to_csv()
-        # PSS
-        self.pss = PSSWidget("Escala de Estrés Percibido (PSS)", PSS_ITEMS, PSS_OPTIONS, self.pid, self.block, self.stage)
-        self.pss.prev_btn.clicked.connect(lambda: self.stack.setCurrentWidget(self.bai))
-        self.pss.next_btn.clicked.connect(self._pss_next)
-        self.stack.addWidget(self.pss); self.stack.setCurrentWidget(self.pss)
-
-    def _pss_next(self):
-        if not self.pss.all_answered():
-            QMessageBox.information(self, "Faltan respuestas", "Responde todas las preguntas.")
+        step = self.flow.steps[self.step]
+        if step.is_page:
+            self._show_page(step.page, timing)
+        else:
+            text = step.text.format(block=self.block, participant=self.pid, stage=self.stage)
+            self._show_transition(text, self._continue, timing)
+        QTimer.singleShot(0, self._prefetch)
+
+    def _prefetch(self):
+        """Construye y limpia la página del siguiente paso mientras se contesta la actual."""
+        if self.flow is None:
             return
-        self.pss.save_to_csv()
-        # PANAS
-        self.panas = PANASWidget("Escala de Afectividad Positiva y Negativa (PANAS) (versión corta en castellano)",
-                                 PANAS_ITEMS, PANAS_OPTIONS, self.pid, self.block, self.stage)
-        self.panas.prev_btn.clicked.connect(lambda: self.stack.setCurrentWidget(self.pss))
-        self.panas.next_btn.clicked.connect(self._panas_next)
-        self.stack.addWidget(self.panas); self.stack.setCurrentWidget(self.panas)
-
-    def _panas_next(self):
-        if not self.panas.all_answered():
-            QMessageBox.information(self, "Faltan respuestas", "Responde todas las preguntas.")
+        j = self.flow.next_page(self.step)
+        if j is None:
             return
-        self.panas.save_to_csv()
-        done = TransitionPage(
-            "¡Gracias! Terminaste la evaluación inicial.\n\n"
-            "Pulsa continuar para volver a la pantalla inicial.",
-            self.go_start
-        )
-        self.stack.addWidget(done); self.stack.setCurrentWidget(done)
-
-    def start_block_flow(self, payload):
-        if not payload: return
-        self.pid = payload["participant_id"]
-        self.stage = payload["stage_label"]
-        self.block = payload["block_id"]
-
-        intro = TransitionPage(
-            f"Bloque {self.block}\n\n"
-            "Responda la Escala de Autoevaluación con Maniquí (SAM: Valencia, Activación, Dominio).",
-            self._block_sam_manikin
-        )
-        self.stack.addWidget(intro); self.stack.setCurrentWidget(intro)
-
-    def _block_sam_manikin(self):
-        self.sam = SAMManikinWidget(self.pid, self.block, self.stage)
-        self.sam.prev_btn.clicked.connect(self.go_start)
-        self.sam.next_btn.clicked.connect(self._sam_next)
-        self.stack.addWidget(self.sam); self.stack.setCurrentWidget(self.sam)
-
-    def _sam_next(self):
-        if not self.sam.all_answered():
-            QMessageBox.information(self, "Faltan respuestas", "Responde las tres dimensiones.")
+        code = self.flow.steps[j].page
+        page = self.pages.get(code)
+        if page is None:
+            # Se construye por trozos antes que cualquier otra cosa y después se vuelve aquí
+            self.idle.add(f"prefetch:{code}", self._page_job(code, self._prefetch, urgent=True), urgent=True)
             return
-        self.sam.save_to_csv()
-        trans = TransitionPage(
-            "Ahora responde el Cuestionario de Evaluación de Estrés (SAM).",
-            self._block_sam_stress
-        )
-        self.stack.addWidget(trans); self.stack.setCurrentWidget(trans)
-
-    def _block_sam_stress(self):
-        self.samstress = SAMStressSubsetWidget(self.pid, self.block, self.stage)
-        self.samstress.prev_btn.clicked.connect(lambda: self.stack.setCurrentWidget(self.sam))
-        self.samstress.next_btn.clicked.connect(self._block_done)
-        self.stack.addWidget(self.samstress); self.stack.setCurrentWidget(self.samstress)
-
-    def _block_done(self):
-        if not self.samstress.all_answered():
-            QMessageBox.information(self, "Faltan respuestas", "Responde todos los ítems.")
+        self.idle.promote(f"rows:{code}")
+        k = self.flow.prev_page(self.step)
+        if page is self.stack.currentWidget() or page is self._prepared or \
+                (k is not None and page is self.pages.get(self.flow.steps[k].page)):
+            return  # la página se repite en el flujo: se limpiará al llegar
+        page.reset(self.pid, self.block, self.stage)
+        self._prepared = page
+
+    def _continue(self):
+        self._advance(self.metrics.start(self._timing_name(self.step)))
+
+    def _next(self):
+        step = self.flow.steps[self.step]
+        page = self.pages[step.page]
+        timing = self._validated(page, self._timing_name(self.step), step.missing)
+        if timing is None:
             return
-        self.samstress.save_to_csv()
-        done = TransitionPage(
-            f"Bloque {self.block} completado.\n\n"
-            "Espere indicaciones y pulse continuar\n"
-            "cuando sea momento se pasará al siguiente bloque.",
-            self.go_start
-        )
-        self.stack.addWidget(done); self.stack.setCurrentWidget(done)
+        self._save_page(page)
+        timing.lap("persist")
+        self._advance(timing)
+
+    def _prev(self):
+        """Vuelve a la página anterior del flujo con sus respuestas, o a la pantalla inicial."""
+        j = self.flow.prev_page(self.step)
+        if j is None:
+            self.go_start()
+            return
+        self.step = j
+        page = self.pages[self.flow.steps[j].page]
+        if page is self._prepared:
+            self._prepared = None
+        self._mark_shown(page)
+        self.stack.setCurrentWidget(page)
+        self._draft_timer.start()  # el borrador sigue a la página en pantalla
+        QTimer.singleShot(0, self._prefetch)
+
+    # ---------- Persistencia ----------
+    def _save_page(self, page):
+        # Las filas de la página se escriben juntas al cambiar de página
+        page.save_to_csv(self.writer)
+        self.writer.commit()
+        self._marker("page_submitted", page=page.definition.code, step=self.step)
+        self.times.page_saved(page.visit, (self.pid, self.block, self.stage, page.definition.code),
+                              page.item_code, page.response_label)
+        page.visit = 0
+        self._drop_draft()
+
+    # ---------- Borrador ----------
+    def _write_draft(self):
+        """Guarda (o borra, si no hay nada marcado) el borrador de la página en pantalla."""
+        page = self.stack.currentWidget()
+        if self.flow is None or not self.flow.steps[self.step].is_page or page.unanswered == len(page.answers):
+            self._drop_draft()
+            return
+        # Sólo se encola: el archivo se escribe en el hilo de fondo (file_tasks)
+        self.drafts.save(Draft(self.pid, self.block, self.stage, self.flow.name, self.step,
+                               self.flow.steps[self.step].page, list(page.answers),
+                               datetime.now().isoformat(timespec="seconds")))
+
+    def _drop_draft(self):
+        self._draft_timer.stop()
+        self.drafts.clear()
+
+    def resume_draft(self):
+        """Si quedó un borrador de la sesión anterior, ofrece retomar esa página con sus respuestas."""
+        draft = self.drafts.load()
+        if draft is None:
+            return
+        flow = self.protocol.flows.get(draft.flow)
+        if flow is None or not 0 <= draft.step < len(flow.steps) or flow.steps[draft.step].page != draft.page:
+            self._drop_draft()  # el protocolo cambió: el borrador ya no corresponde
+            return
+        answer = QMessageBox.question(
+            self, "Respuestas sin guardar",
+            f"Quedó sin terminar {INSTRUMENTS[draft.page].title} de {draft.participant_id} "
+            f"(bloque {draft.block_id}, {draft.stage_label}) con {draft.answered} respuestas, "
+            f"del {draft.saved_at.replace('T', ' a las ')}.\n\n¿Retomar desde esa página?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if answer != QMessageBox.StandardButton.Yes:
+            self._drop_draft()
+            return
+        self.pid, self.block, self.stage = draft.participant_id, draft.block_id, draft.stage_label
+        self.flow, self.step = flow, draft.step
+        self._marker("flow_start", resumed=True, step=self.step)
+        page = self._show_page(draft.page, mark=False)
+        if not page.set_answers(draft.answers):
+            self._drop_draft()
+        self._mark_shown(page)  # una sola vez, con las respuestas del borrador ya marcadas
+        QTimer.singleShot(0, self._prefetch)
+
+    def _on_saved(self, n_rows: int):
+        self.save_status.hide()
+
+    def _on_save_failed(self, error: str):
+        self.save_status.setText(f"No se pudo guardar en {self.writer.backend.path} ({error}). Reintentando…")
+        self.save_status.show()
+
+    def toggle_dashboard(self):
+        if self.dashboard is None:
+            self.dashboard = DashboardWindow(self.dashboard_model)
+        if self.dashboard.isVisible():
+            self.dashboard.hide()
+        else:
+            self.dashboard.show()
+
+    def closeEvent(self, event):
+        if self.dashboard is not None:
+            self.dashboard.close()
+        self.dashboard_model.close()
+        if self._draft_timer.isActive():
+            self._draft_timer.stop()
+            self._write_draft()
+        self.writer.close()
+        if self.pusher is not None:
+            self.pusher.close()
+        self.metrics.close()
+        self.times.close()
+        self.file_tasks.close()
+        if self.markers is not None:
+            self.markers.close()
+        super().closeEvent(event)
 
     # ---------- Navegación ----------
     def go_start(self):
+        if self.flow is not None:
+            self._marker("flow_end", completed=False)
+        self.flow = None
+        self.writer.commit()
+        self.times.flush()
+        self._drop_draft()
         self.stack.setCurrentWidget(self.start)
 
 # =========================
 # MAIN
 # =========================
+class StartupProfile:
+    """Tiempos de arranque para --profile-startup (marcas relativas al inicio del proceso)."""
+    def __init__(self):
+        self.marks: List[Tuple[str, float]] = [("imports PyQt5", _T_QT), ("imports app", _T_IMPORTS)]
+
+    def mark(self, name: str):
+        self.marks.append((name, time.perf_counter()))
+
+    def report(self) -> str:
+        lines = ["Perfil de arranque (ms):"]
+        prev = _T_START
+        for name, t in self.marks:
+            lines.append(f"  {name:<28}{(t - prev) * 1000:9.1f}   (acum. {(t - _T_START) * 1000:8.1f})")
+            prev = t
+        return "\n".join(lines)
+
+def parse_args(argv: List[str]):
+    """Opciones propias; el resto de argumentos se pasa a Qt."""
+    ap = argparse.ArgumentParser(description=APP_TITLE)
+    ap.add_argument("--storage", choices=sorted(BACKENDS), default=STORAGE_BACKEND,
+                    help="dónde guardar las respuestas (por omisión: %(default)s)")
+    ap.add_argument("--study", default=STUDY_ID,
+                    help="nombre del estudio; con --storage sharded, carpeta de sus archivos (por omisión: %(default)s)")
+    ap.add_argument("--aggregator", metavar="URL", default=AGGREGATOR_URL,
+                    help="concentrador al que enviar cada página guardada (ver aggregator.py)")
+    ap.add_argument("--station", default=STATION_ID,
+                    help="nombre de esta estación en el concentrador (por omisión: %(default)s)")
+    ap.add_argument("--protocol", default=PROTOCOL_FILE,
+                    help="archivo JSON con los flujos y sus pasos (por omisión: %(default)s)")
+    ap.add_argument("--markers", metavar="HOST[:PUERTO]", default=MARKERS_ADDR,
+                    help="enviar marcadores de eventos por UDP a este receptor (ver markers.py)")
+    ap.add_argument("--dashboard", action="store_true",
+                    help="abrir también el panel del entrevistador (se alterna con Ctrl+D)")
+    ap.add_argument("--profile-startup", action="store_true",
+                    help="medir el arranque, imprimir los tiempos y salir")
+    return ap.parse_known_args(argv[1:])
+
 def main():
-    app = QApplication(sys.argv)
+    args, qt_args = parse_args(sys.argv)
+    try:
+        protocol = load_protocol(args.protocol)
+    except ProtocolError as e:
+        sys.exit(f"Protocolo inválido: {e}")
+    profile = StartupProfile()
+    app = QApplication(sys.argv[:1] + qt_args)
     app.setApplicationDisplayName(APP_TITLE)
-    w = MainWindow()
+    profile.mark("QApplication")
+    init_fonts()
+    profile.mark("fuentes")
+    w = MainWindow(storage=args.storage, aggregator=args.aggregator, station=args.station,
+                   dashboard=args.dashboard, protocol=protocol, markers=args.markers,
+                   study=args.study)
+    profile.mark("MainWindow")
     w.show()
+    profile.mark("show()")
+
+    def start_page_visible():
+        profile.mark("pantalla inicial visible")
+        if not args.profile_startup:
+            w.resume_draft()
+        # Lo demás (imágenes SAM, páginas) se prepara con la pantalla inicial ya visible
+        w.warm_up(on_done=warmed_up)
+
+    def warmed_up():
+        profile.mark("precarga en segundo plano")
+        if args.profile_startup:
+            print(profile.report(), file=sys.stderr)
+            w.close()
+
+    QTimer.singleShot(0, start_page_visible)
     sys.exit(app.exec())
-
 if __name__ == "__main__":
     main()
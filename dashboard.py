@@ -0,0 +1,129 @@
+"""Panel del entrevistador: resúmenes en vivo por participante.
+
+DashboardModel se suscribe al bus de eventos (events.BUS) y, por cada página
+guardada, sólo actualiza en memoria la fila del participante y la marca como
+pendiente. DashboardWindow redibuja las filas pendientes a un ritmo máximo
+(MAX_FPS): varias páginas guardadas entre dos cuadros se dibujan una sola
+vez, así que el panel nunca compite con la pantalla del participante aunque
+muestre muchos participantes.
+"""
+import threading
+from typing import Dict, List, Set, Tuple
+
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QFont
+from PyQt5.QtWidgets import QAbstractItemView, QHeaderView, QLabel, QTableWidget, QTableWidgetItem, QVBoxLayout, QWidget
+
+from events import BUS, PAGE_SAVED, EventBus, PageSaved
+from instruments import INSTRUMENTS
+
+# (columna, título, instrumento de la fila resumen, item_code, campo del registro: "response" o "score")
+SUMMARY_CELLS: List[Tuple[str, str, str, str, str]] = [
+    ("bai", "BAI total", INSTRUMENTS["BAI"].summary_instrument, "total", "score"),
+    ("bai_band", "BAI", INSTRUMENTS["BAI"].summary_instrument, "total", "response"),
+    ("pss", "PSS total", INSTRUMENTS["PSS"].summary_instrument, "sum", "score"),
+    ("pss_band", "PSS", INSTRUMENTS["PSS"].summary_instrument, "sum", "response"),
+    ("pa", "PANAS PA", INSTRUMENTS["PANAS"].summary_instrument, "PA_sum", "score"),
+    ("na", "PANAS NA", INSTRUMENTS["PANAS"].summary_instrument, "NA_sum", "score"),
+    ("quadrant", "SAM cuadrante", INSTRUMENTS["SAM_Manikin"].summary_instrument, "quadrant", "response"),
+    ("emotion", "SAM emoción", INSTRUMENTS["SAM_Manikin"].summary_instrument, "interpretation", "response"),
+]
+COLUMNS = [("pid", "Participante"), ("stage", "Etapa"), ("block", "Bloque"),
+           *((key, title) for key, title, *_ in SUMMARY_CELLS), ("updated", "Actualizado")]
+_CELL_OF = {(inst, code, field): key for key, _, inst, code, field in SUMMARY_CELLS}
+
+
+class DashboardModel:
+    """Último resumen de cada participante; se alimenta del bus desde cualquier hilo."""
+    def __init__(self, bus: EventBus = BUS):
+        self._lock = threading.Lock()
+        self._rows: Dict[str, Dict[str, str]] = {}
+        self._dirty: Set[str] = set()
+        self._unsubscribe = bus.subscribe(PAGE_SAVED, self._on_page_saved)
+
+    def _on_page_saved(self, ev: PageSaved):
+        with self._lock:
+            row = self._rows.setdefault(ev.participant_id, {"pid": ev.participant_id})
+            row["stage"] = ev.stage_label
+            row["block"] = str(ev.block_id)
+            row["updated"] = ev.timestamp[11:] or ev.timestamp
+            for r in ev.rows:
+                for field in ("response", "score"):
+                    key = _CELL_OF.get((r.instrument, r.item_code, field))
+                    if key is not None:
+                        value = getattr(r, field)
+                        row[key] = "" if value is None else str(value)
+            self._dirty.add(ev.participant_id)
+
+    def take_changes(self) -> List[Dict[str, str]]:
+        """Copia de las filas que cambiaron desde la última llamada."""
+        with self._lock:
+            changed = [dict(self._rows[pid]) for pid in self._dirty]
+            self._dirty.clear()
+        return changed
+
+    def close(self):
+        self._unsubscribe()
+
+
+class DashboardWindow(QWidget):
+    """Ventana aparte con una fila por participante, redibujada a lo sumo MAX_FPS veces por segundo."""
+    MAX_FPS = 4
+
+    def __init__(self, model: DashboardModel):
+        super().__init__()
+        self.model = model
+        self.setWindowTitle("Panel del entrevistador")
+        self.resize(1000, 400)
+        self._row_of: Dict[str, int] = {}
+
+        note = QLabel("Resúmenes de las páginas guardadas en esta sesión.")
+        note.setStyleSheet("color:#555;")
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels([title for _, title in COLUMNS])
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.verticalHeader().hide()
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.table.setFont(QFont("Segoe UI", 11))
+        layout = QVBoxLayout(self)
+        layout.addWidget(note)
+        layout.addWidget(self.table)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(1000 // self.MAX_FPS)
+        self._timer.timeout.connect(self.refresh_view)
+
+    def showEvent(self, event):
+        self.refresh_view()
+        self._timer.start()  # sólo se redibuja mientras la ventana está visible
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self._timer.stop()
+        super().hideEvent(event)
+
+    def refresh_view(self):
+        """Dibuja las filas que cambiaron desde el último cuadro."""
+        changes = self.model.take_changes()
+        if not changes:
+            return
+        self.table.setUpdatesEnabled(False)
+        try:
+            for row in changes:
+                n = self._row_of.get(row["pid"])
+                if n is None:
+                    n = self._row_of[row["pid"]] = self.table.rowCount()
+                    self.table.insertRow(n)
+                for col, (key, _) in enumerate(COLUMNS):
+                    value = row.get(key, "")
+                    item = self.table.item(n, col)
+                    if item is None:
+                        item = QTableWidgetItem(value)
+                        if key not in ("pid", "stage", "bai_band", "pss_band", "emotion"):
+                            item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+                        self.table.setItem(n, col, item)
+                    elif item.text() != value:
+                        item.setText(value)
+        finally:
+            self.table.setUpdatesEnabled(True)
@@ -0,0 +1,93 @@
+"""Borrador de la página en curso, para no perder respuestas tras un cierre inesperado.
+
+Las páginas se guardan en el archivo de datos al pulsar "Siguiente"; mientras
+tanto sus respuestas sólo viven en memoria. DraftStore guarda en
+<datos>.draft.json un borrador pequeño con la posición en el flujo y el
+vector de respuestas de la página que se está contestando:
+
+    {"participant_id": "P01", "block_id": 3, "stage_label": "Ruta 1",
+     "flow": "initial", "step": 0, "page": "BAI",
+     "answers": [2, 0, -1, ...], "saved_at": "2025-01-01T10:00:00"}
+
+(-1 = sin responder). La interfaz agrupa los clics y escribe el borrador un
+momento después del último; al guardar la página el borrador se borra. Al
+reiniciar, si queda un borrador, se ofrece retomar esa página. No depende de Qt.
+"""
+import json
+import os
+from typing import List, NamedTuple
+
+from file_tasks import FileTasks, dispatch
+
+
+def draft_path(data_path: str) -> str:
+    return data_path + ".draft.json"
+
+
+class Draft(NamedTuple):
+    participant_id: str
+    block_id: int
+    stage_label: str
+    flow: str
+    step: int
+    page: str
+    answers: List[int]
+    saved_at: str = ""
+
+    @property
+    def answered(self) -> int:
+        return sum(1 for a in self.answers if a >= 0)
+
+
+class DraftStore:
+    """Un solo borrador por archivo de datos; escrituras atómicas y sin repetir contenido.
+
+    Con `tasks` guardar y borrar sólo se encolan (en orden) para el hilo de
+    fondo y los errores se informan allí; sin él se hacen en el momento.
+    """
+    def __init__(self, path: str, tasks: FileTasks | None = None):
+        self.path = path
+        self.tasks = tasks
+        self._last: Draft | None = None
+        self._exists = os.path.isfile(path)
+
+    def save(self, draft: Draft):
+        # saved_at cambia en cada llamada; sólo cuenta si cambió el contenido
+        if (self._exists and self._last is not None
+                and draft._replace(saved_at="") == self._last._replace(saved_at="")):
+            return
+        self._last = draft
+        self._exists = True
+        dispatch(self.tasks, self._write, draft)
+
+    def _write(self, draft: Draft):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(draft._asdict(), f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    def load(self) -> Draft | None:
+        """Borrador guardado, o None si no hay o no se puede leer."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                raw = json.load(f)
+            draft = Draft(str(raw["participant_id"]), int(raw["block_id"]), str(raw["stage_label"]),
+                          str(raw["flow"]), int(raw["step"]), str(raw["page"]),
+                          [int(a) for a in raw["answers"]], str(raw.get("saved_at", "")))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        self._last = draft
+        return draft
+
+    def clear(self):
+        if not self._exists:
+            return
+        self._last = None
+        self._exists = False
+        dispatch(self.tasks, self._remove)
+
+    def _remove(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,53 @@
+"""Bus de eventos en memoria (publicar/suscribir) dentro del proceso.
+
+Las páginas publican PAGE_SAVED cada vez que guardan (save_to_csv); quien
+quiera reaccionar (p. ej. el panel del entrevistador) se suscribe sin que
+las páginas sepan de él. Los suscriptores se llaman en el hilo que publica,
+así que deben ser rápidos: guardar el evento y volver. No depende de Qt.
+"""
+import sys
+import threading
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+from records import ResponseRecord
+
+PAGE_SAVED = "page_saved"
+
+
+class PageSaved(NamedTuple):
+    timestamp: str
+    participant_id: str
+    block_id: int
+    stage_label: str
+    instrument: str
+    rows: Tuple[ResponseRecord, ...]  # como los escribe la página (Instrument.page_records)
+
+
+class EventBus:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subs: Dict[str, List[Callable]] = {}
+
+    def subscribe(self, topic: str, callback: Callable) -> Callable[[], None]:
+        """Registra callback(evento) para el tema; devuelve la función para darse de baja."""
+        with self._lock:
+            self._subs.setdefault(topic, []).append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                subs = self._subs.get(topic, [])
+                if callback in subs:
+                    subs.remove(callback)
+        return unsubscribe
+
+    def publish(self, topic: str, event):
+        with self._lock:
+            subs = tuple(self._subs.get(topic, ()))
+        for callback in subs:
+            try:
+                callback(event)
+            except Exception as e:  # un suscriptor con errores no debe impedir guardar
+                print(f"[EventBus] Error en un suscriptor de {topic}: {e!r}", file=sys.stderr)
+
+
+BUS = EventBus()
@@ -0,0 +1,110 @@
+"""Escrituras auxiliares a disco fuera del hilo de la interfaz.
+
+Los registros secundarios (tiempos entre páginas, tiempos de respuesta,
+borrador de la página en curso) se escriben justo cuando el participante
+espera el cambio de página. FileTasks los ejecuta en orden en un único hilo
+de fondo: submit() sólo encola la función y regresa. Un error se informa
+por stderr y nunca llega a la interfaz. CsvAppendLog reúne lo común de los
+registros CSV que se agregan por lotes. No depende de Qt.
+"""
+import csv
+import os
+import queue
+import sys
+import threading
+from typing import Callable, Iterable, List, Sequence
+
+
+class FileTasks:
+    """Cola FIFO de escrituras atendida por un hilo; flush() espera a que se vacíe."""
+    def __init__(self, name: str = "file-tasks"):
+        self._queue: "queue.Queue[tuple | None]" = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._loop, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, fn: Callable, *args):
+        if self._closed:
+            fn(*args)  # después de close() se escribe en el momento
+            return
+        self._queue.put((fn, args))
+
+    def _loop(self):
+        while True:
+            task = self._queue.get()
+            try:
+                if task is None:
+                    return
+                fn, args = task
+                try:
+                    fn(*args)
+                except Exception as e:
+                    print(f"[FileTasks] {getattr(fn, '__qualname__', fn)}: {type(e).__name__}: {e}", file=sys.stderr)
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """Espera a que terminen las escrituras encoladas."""
+        self._queue.join()
+
+    def close(self):
+        """Termina lo encolado y detiene el hilo."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+
+def dispatch(tasks: FileTasks | None, fn: Callable, *args):
+    """Encola fn(*args) en `tasks`; sin cola de fondo la ejecuta en el momento."""
+    if tasks is None:
+        fn(*args)
+    else:
+        tasks.submit(fn, *args)
+
+
+class CsvAppendLog:
+    """Filas que se acumulan en memoria y se agregan a un CSV por lotes.
+
+    add() sólo acumula; flush() entrega el lote a `tasks` (o lo escribe en el
+    momento). El encabezado se escribe si el archivo no existe o está vacío.
+    Si la escritura falla se avisa por stderr y esas filas se reintentan con
+    el lote siguiente: un registro auxiliar nunca interrumpe la sesión.
+    """
+    def __init__(self, path: str, header: Sequence[str], what: str,
+                 tasks: FileTasks | None = None, bom: bool = False):
+        self.path = path
+        self.header = list(header)
+        self.what = what          # para el aviso: "No se pudieron guardar <what> ..."
+        self.tasks = tasks
+        self.bom = bom            # utf-8-sig al crear el archivo, para Excel
+        self._pending: List[list] = []
+        self._unwritten: List[list] = []  # sólo la toca quien escribe (tasks o este hilo)
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, rows: Iterable[list]):
+        self._pending.extend(rows)
+
+    def flush(self):
+        if not self._pending:
+            return
+        rows, self._pending = self._pending, []
+        dispatch(self.tasks, self._append, rows)
+
+    def _append(self, rows: List[list]):
+        self._unwritten.extend(rows)
+        try:
+            new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            encoding = "utf-8-sig" if new and self.bom else "utf-8"
+            with open(self.path, "a", newline="", encoding=encoding) as f:
+                w = csv.writer(f)
+                if new:
+                    w.writerow(self.header)
+                w.writerows(self._unwritten)
+        except OSError as e:
+            print(f"[WARN] No se pudieron guardar {self.what} en {self.path}: {e}", file=sys.stderr)
+            return
+        self._unwritten.clear()
@@ -0,0 +1,447 @@
+"""Definición de los cuestionarios, su interpretación y su puntuación.
+
+No depende de Qt: lo usa la interfaz (cuestionarios.py) y puede importarse
+desde scripts de análisis sin abrir ventanas.
+"""
+from array import array
+from operator import mul
+from sys import intern
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from records import ResponseRecord
+
+# =========================
+# DEFINICIÓN DE CUESTIONARIOS
+# =========================
+
+# --- BAI (Inventario de Ansiedad de Beck, 21 ítems, 0..3)
+BAI_INSTRUCTIONS = ("INSTRUCCIONES:\n"
+                    "Lea cada síntoma y marque cuánto le ha afectado actualmente. Considere como referencia las dificultades que ha tenido este último mes.")
+BAI_ITEMS = [
+    "Hormigueo o entumecimiento",
+    "Sensación de calor",
+    "Con temblor en las piernas",
+    "Incapacidad de relajarse",
+    "Miedo a que suceda lo peor",
+    "Mareo o aturdimiento",
+    "Latidos del corazón fuertes y acelerados",
+    "Sensación de inestabilidad e inseguridad física",
+    "Atemorizado o asustado",
+    "Nerviosismo",
+    "Sensación de bloqueo o ahogo",
+    "Temblores en las manos",
+    "Inquieto, inseguro o estremecimiento",
+    "Miedo a perder el control",
+    "Dificultad para respirar",
+    "Miedo a morirse",
+    "Sobresaltos",
+    "Con problemas digestivos o abdominales",
+    "Palidez",
+    "Rubor facial",
+    "Con sudores, fríos o calientes (no debidos a la temperatura)",
+]
+BAI_OPTIONS = [("Nada",0), ("Leve",1), ("Moderado",2), ("Bastante",3)]
+
+# --- PSS (Escala de Estrés Percibido 14 ítems, 0..4)
+# Ítems invertidos: 4, 5, 6, 7, 9, 10, 13 (indexados 1..14).
+PSS_REVERSE = {4,5,6,7,9,10,13}
+PSS_ITEMS = [
+    "En el último mes, ¿con qué frecuencia te has sentido afectado por algo que ocurrió inesperadamente?",
+    "En el último mes, ¿con qué frecuencia te has sentido incapaz de controlar las cosas importantes en tu vida?",
+    "En el último mes, ¿con qué frecuencia te has sentido nervioso o estresado?",
+    "En el último mes, ¿con qué frecuencia has manejado con éxito los pequeños problemas irritantes de la vida?",
+    "En el último mes, ¿con qué frecuencia has sentido que has afrontado efectivamente los cambios importantes que han estado ocurriendo en tu vida?",
+    "En el último mes, ¿con qué frecuencia has estado seguro sobre tu capacidad para manejar tus problemas personales?",
+    "En el último mes, ¿con qué frecuencia has sentido que las cosas van bien?",
+    "En el último mes, ¿con qué frecuencia has sentido que no podías afrontar todas las cosas que tenías que hacer?",
+    "En el último mes, ¿con qué frecuencia has podido controlar las dificultades de tu vida?",
+    "En el último mes, ¿con qué frecuencia has sentido que tenías todo bajo control?",
+    "En el último mes, ¿con qué frecuencia has estado enfadado porque las cosas que te han ocurrido estaban fuera de tu control?",
+    "En el último mes, ¿con qué frecuencia has pensado sobre las cosas que te faltan por hacer?",
+    "En el último mes, ¿con qué frecuencia has podido controlar la forma de pasar el tiempo?",
+    "En el último mes, ¿con qué frecuencia has sentido que las dificultades se acumulan tanto que no puedes superarlas?",
+]
+PSS_INSTRUCTIONS = ("INSTRUCCIONES:\n"
+                    "Las preguntas en esta escala hacen referencia a tus sentimientos y pensamientos durante el último mes. En cada caso, por favor indica la expresión que mejor represente como te has sentido o cómo has enfrentado cada situación.\n")
+PSS_OPTIONS = [("Nunca",0),("Casi nunca",1),("De vez en cuando",2),("A menudo",3),("Muy a menudo",4)]
+
+# --- PANAS (20 adjetivos, 1..5)
+PANAS_INSTRUCTIONS = ("INSTRUCCIONES:\n"
+                      "Esta escala consiste en una serie de palabras  que describen diferentes sentimientos y emociones. Lea cada palabra y marque la respuesta apropieada para usted.\n"
+                      "Indique cómo se siente generalmente.")
+PANAS_ITEMS = [
+    "Motivado/a","Molesto/a","Emocionado/a", "De malas","Firme", "Culpable","Temeroso/a","Agresivo/a","Entusiasmado/a","Estar orgulloso/a","Irritable","Alerta","Avergonzado/a","Inspirado/a","Nervioso/a", "Decidido/a", "Estar atento/a", "Inquieto/a", "Activo/a", "Inseguro/a"
+]
+PANAS_OPTIONS = [("Muy poco o nada",1),("Algo",2),("Moderadamente",3),("Bastante",4),("Extremadamente",5)]
+
+# --- SAM-manikin (valencia, activación, dominio) 1..5
+SAM_MANIKIN_ITEMS = [
+    ("Valencia (muy desagradable → muy agradable)", 1, 9),
+    ("Activación (muy activado → muy calmado)",     1, 9),
+    ("Dominio (sin control → con mucho control)",    1, 9),
+]
+# --- SAM-estrés (Stress Appraisal Measure, subset: 2,5,8,14,20,16,22,19,24,26) escala 0..4
+SAM_STRESS_Instructions = ("INSTRUCCIONES:\n"
+                           "Este cuestionario se refiere a tus pensamientos sobre la situación identificada previamente. No hay respuestas correctas o incorrrectas.\n"
+                           "Por favor, responde según como te sentiste con la situación.")
+SAM_STRESS_ALL = {
+    1:"¿Es esta una situación totalmente desesperada?",
+    2:"¿Esta situación te crea tensión?",
+    3:"¿El resultado de esta situación es incontrolable por alguien más?",
+    4:"¿Hay alguien o alguna agencia a la que puedas recurrir para pedir ayuda si la necesitas?",
+    5:"¿La situación te hizo sentir ansioso?",
+    6:"¿Esta situación tiene consecuencias importantes para ti?",
+    7:"¿Esta situación va a tener un impacto positivo en ti?",
+    8:"¿Qué tan ansioso estabas por abordar el evento?",
+    9:"¿Cuánto te afectará el resultado de esta situación?",
+    10:"¿Hasta qué punto puedes convertirte en una persona más fuerte debido a este problema?",
+    11:"¿El resultado de esta situación será negativo?",
+    12:"¿Tienes la capacidad de hacerlo bien en esta situación?",
+    13:"¿Esta situación tiene implicaciones serias para ti?",
+    14:"¿Tuviste lo necesario para hacerlo bien en esa situación?",
+    15:"¿Hubo ayuda disponible para mí para lidiar con este problema?",
+    16:"¿La situación superó o agotó mis recursos de afrontamiento?",
+    17:"¿Hubo suficientes recursos disponibles para ayudarme a lidiar con esta situación?",
+    18:"¿Estaba fuera del poder de alguien hacer algo sobre esta situación?",
+    19:"¿Qué tan emocionado estuviste pensando en el resultado de esta situación?",
+    20:"¿Qué tan amenazante fue la situación?",
+    21:"¿El problema fue irresoluble por alguien?",
+    22:"¿Pude superar el problema?",
+    23:"¿Hubo alguien que pudiera ayudarme a manejar este problema?",
+    24:"¿En qué medida percibí esta situación como estresante?",
+    25:"¿Tuve las habilidades necesarias para lograr un resultado exitoso en esta situación?",
+    26:"¿En qué medida este evento requirió esfuerzos de afrontamiento de mi parte?",
+    27:"¿Esta situación tuvo consecuencias a largo plazo para mí?",
+    28:"¿Esto iba a tener un impacto negativo en mí?",
+}
+SAM_STRESS_SUBSET_ORDER = [2,8,14,20,16,5,22,19,24,26]
+SAM_STRESS_OPTIONS = [("Nada",0),("Poco",1),("Algo",2),("Mucho",3),("Demasiado",4)]
+
+# =========================
+# ESTRUCTURAS DEL REGISTRO
+# =========================
+# Banda de interpretación: (máximo inclusivo, etiqueta); None = sin límite superior
+Band = Tuple[Optional[int], str]
+
+def band_label(bands: Sequence[Band], x: int) -> str:
+    for upper, label in bands:
+        if upper is None or x <= upper:
+            return label
+    return bands[-1][1]
+
+class Subscale(NamedTuple):
+    """Suma de un conjunto de ítems (por clave de ítem) con sus bandas."""
+    key: str
+    items: Tuple[int, ...]
+    bands: Tuple[Band, ...] = ()
+    suffix: str = ""                 # se agrega a la etiqueta de la banda
+    max_score: Optional[int] = None  # si se da, también se calcula el valor normalizado
+
+class SummaryRow(NamedTuple):
+    """Fila resumen del CSV; response/score nombran valores calculados ("" = celda vacía)."""
+    code: str
+    text: str
+    response: str = ""
+    score: str = ""
+
+class Instrument:
+    """Instrumento definido como datos y compilado a vectores de pesos.
+
+    item_keys identifican cada ítem (1..n por omisión) y son las que usan
+    reverse y las subescalas. Al cargar se compila, para cada subescala, un
+    vector de coeficientes y una constante tales que
+
+        suma = constante + Σ coef[i] * puntaje_crudo[i]
+
+    de modo que la inversión de ítems queda incluida en los coeficientes y
+    puntuar es un producto punto por subescala, sin ramas por ítem.
+    """
+    def __init__(self, code: str, title: str, items: Sequence[str],
+                 options: Sequence[Tuple[str, int]], *,
+                 item_keys: Sequence[int] | None = None,
+                 item_codes: Sequence[str] | None = None,
+                 wide_codes: Sequence[str] | None = None,
+                 instructions: str | None = None, numbered: bool = True,
+                 reverse: Iterable[int] = (), reverse_base: int = 0,
+                 subscales: Sequence[Subscale] = (),
+                 summary_instrument: str = "",
+                 summary_rows: Sequence[SummaryRow] = (),
+                 derive: Callable[[dict], dict] | None = None):
+        # Los códigos se internan: todas las filas comparten la misma cadena
+        self.code = intern(code)
+        self.title = title
+        self.items = tuple(items)
+        self.options = tuple(options)
+        self.item_keys = tuple(item_keys) if item_keys is not None else tuple(range(1, len(items) + 1))
+        self.item_codes = tuple(map(intern, item_codes if item_codes is not None
+                                    else (f"{code}_{k}" for k in self.item_keys)))
+        self.wide_codes = tuple(wide_codes) if wide_codes is not None else self.item_codes
+        self.instructions = instructions
+        self.numbered = numbered
+        self.subscales = tuple(subscales)
+        self.summary_instrument = intern(summary_instrument)
+        self.summary_rows = tuple(r._replace(code=intern(r.code)) for r in summary_rows)
+        self.derive = derive
+
+        # --- compilación ---
+        n = len(self.items)
+        rev = set(reverse)
+        self.option_scores = array("i", (v for _, v in self.options))
+        self.option_index: Dict[str, int] = {label: j for j, (label, _) in enumerate(self.options)}
+        self.sign = array("i", (-1 if k in rev else 1 for k in self.item_keys))
+        self.offset = array("i", (reverse_base if k in rev else 0 for k in self.item_keys))
+        pos = {k: i for i, k in enumerate(self.item_keys)}
+        self.weights: List[Tuple[Subscale, array, int]] = []
+        for sub in self.subscales:
+            w = [0] * n
+            for k in sub.items:
+                w[pos[k]] = 1
+            coef = array("i", (wi * si for wi, si in zip(w, self.sign)))
+            const = sum(wi * oi for wi, oi in zip(w, self.offset))
+            self.weights.append((sub, coef, const))
+
+    def raw_scores(self, answers: Sequence[int]) -> array:
+        """Puntajes crudos a partir de los índices de opción elegidos."""
+        vals = self.option_scores
+        return array("i", (vals[j] for j in answers))
+
+    def item_scores(self, raw: Sequence[int]) -> List[int]:
+        """Puntajes por ítem ya invertidos donde corresponda."""
+        return [o + s * r for o, s, r in zip(self.offset, self.sign, raw)]
+
+    def evaluate(self, raw: Sequence[int]) -> dict:
+        """Sumas de subescala, bandas, normalizados y valores derivados."""
+        return self.evaluate_many([raw])[0]
+
+    def evaluate_many(self, raws: Sequence[Sequence[int]]) -> List[dict]:
+        """Como evaluate() pero por columnas: cada subescala se calcula para
+        todas las páginas con el mismo vector de coeficientes."""
+        values: List[dict] = [{} for _ in raws]
+        for sub, coef, const in self.weights:
+            sums = [const + sum(map(mul, coef, raw)) for raw in raws]
+            for v, s in zip(values, sums):
+                v[sub.key] = s
+                if sub.bands:
+                    v[sub.key + "_band"] = band_label(sub.bands, s) + sub.suffix
+                if sub.max_score:
+                    v[sub.key + "_norm"] = s / sub.max_score
+        if self.derive is not None:
+            for v in values:
+                v.update(self.derive(v))
+        return values
+
+    def summary(self, values: dict) -> List[tuple]:
+        """Filas resumen (instrument, item_code, item_text, response, score); score None = vacío."""
+        return [(self.summary_instrument, r.code, r.text,
+                 values[r.response] if r.response else "",
+                 values[r.score] if r.score else None)
+                for r in self.summary_rows]
+
+    def wide_columns(self) -> List[Tuple[str, str, str, str]]:
+        """Columnas del formato ancho: (columna, instrument, item_code, "response"|"score").
+
+        Una columna por ítem (su puntaje) y, por cada fila resumen, una con el
+        valor numérico y/o una con la etiqueta (sufijo _label si hay ambas).
+        """
+        cols = [(wide, self.code, code, "score") for wide, code in zip(self.wide_codes, self.item_codes)]
+        for r in self.summary_rows:
+            name = f"{self.code}_{r.code}"
+            if r.score:
+                cols.append((name, self.summary_instrument, r.code, "score"))
+            if r.response:
+                cols.append((name + "_label" if r.score else name, self.summary_instrument, r.code, "response"))
+        return cols
+
+    def page_records(self, answers: Sequence[int], timestamp: str, participant_id: str,
+                     block_id: int, stage_label: str) -> List[ResponseRecord]:
+        """Registros de una página contestada: uno por ítem y luego las filas resumen."""
+        raw = self.raw_scores(answers)
+        make = ResponseRecord._make
+        head = (timestamp, participant_id, block_id, stage_label)
+        labels = [label for label, _ in self.options]
+        records = [make((*head, self.code, code, txt, labels[j], score))
+                   for code, txt, j, score in zip(self.item_codes, self.items, answers, self.item_scores(raw))]
+        records.extend(make((*head, *row)) for row in self.summary(self.evaluate(raw)))
+        return records
+
+# =========================
+# INTERPRETACIÓN / RESÚMENES
+# =========================
+
+# ---- BAI
+BAI_BANDS = ((7, "Minimal anxiety"), (15, "Mild anxiety"), (25, "Moderate anxiety"), (None, "Severe anxiety"))
+
+def interpret_bai(total: int) -> str:
+    return band_label(BAI_BANDS, total)
+
+# ---- PSS
+PSS_BANDS = ((18, "Low stress"), (37, "Moderate stress"), (None, "High stress"))
+
+def interpret_pss(total: int) -> str:
+    return band_label(PSS_BANDS, total)
+
+# ---- PANAS
+PANAS_POS_WORDS = {
+    "Motivado/a","Emocionado/a","Firme","Entusiasmado/a","Estar orgulloso/a",
+    "Alerta","Inspirado/a","Decidido/a","Estar atento/a","Activo/a"
+}
+PANAS_NEG_WORDS = {
+    "Molesto/a","De malas","Culpable","Temeroso/a","Agresivo/a",
+    "Irritable","Avergonzado/a","Nervioso/a","Inquieto/a","Inseguro/a"
+}
+
+# índices 1-based de PANAS positivos/negativos con respecto a PANAS_ITEMS
+PANAS_POS_IDX = {i for i, w in enumerate(PANAS_ITEMS, start=1) if w in PANAS_POS_WORDS}
+PANAS_NEG_IDX = {i for i, w in enumerate(PANAS_ITEMS, start=1) if w in PANAS_NEG_WORDS}
+
+# Rango teórico 10..50 (10 ítems, escala 1..5)
+PANAS_BANDS = ((25, "Low"), (35, "Moderate"), (None, "High"))
+
+def _band_10_25_26_35_36_50(x: int) -> str:
+    return band_label(PANAS_BANDS, x)
+
+def panas_summary(pa_sum: int, na_sum: int):
+    balance = pa_sum - na_sum
+    bal_label = "Negative" if balance < 0 else ("Balanced" if balance == 0 else "Positive")
+    pa_cat = _band_10_25_26_35_36_50(pa_sum)
+    na_cat = _band_10_25_26_35_36_50(na_sum)
+
+    # Etiqueta global (1–2 palabras, inglés)
+    if pa_cat == "High" and na_cat == "Low":
+        overall = "Optimal"
+    elif pa_cat == "Low" and na_cat == "High":
+        overall = "Distress"
+    elif pa_cat == "High" and na_cat == "High":
+        overall = "Ambivalent"
+    elif pa_cat == "Low" and na_cat == "Low":
+        overall = "Blunted affect"
+    else:
+        # respaldo por balance
+        overall = "Positive" if balance > 0 else ("Negative" if balance < 0 else "Balanced")
+
+    return {
+        "PA_sum": pa_sum, "NA_sum": na_sum, "PA_minus_NA": balance,
+        "PA_cat": pa_cat, "NA_cat": na_cat, "Balance_cat": bal_label,
+        "Overall": overall
+    }
+
+# ---- SAM-Manikin (cuadrante por Valence–Arousal y emoción)
+def sam_quadrant_and_emotion(V: int, A: int):
+    if V == 5 and A == 5:
+        return "Q0", "Neutral"
+    if V > 5 and A > 5:
+        return "Q1", "Elated"
+    if V < 5 and A > 5:
+        return "Q2", "Anxious/tense"
+    if V < 5 and A < 5:
+        return "Q3", "Tired/sadness"
+    if V > 5 and A < 5:
+        return "Q4", "Calm"
+    if V > 5 and A == 5:
+        return "Q1/Q4", "Happy"
+    if V == 5 and A > 5:
+        return "Q1/Q2", "Aroused"
+    if V < 5 and A == 5:
+        return "Q2/Q3", "Unhappy"
+    if V == 5 and A < 5:
+        return "Q3/Q4", "Quiet"
+    # fallback (no debería alcanzarse)
+    return "Q?", "Undefined"
+
+# ---- SAM-Stress (sumatorias y bandas)
+def _band_low_mod_high(sum_val: int, low_max: int, mod_max: int) -> str:
+    return band_label(((low_max, "Low"), (mod_max, "Moderate"), (None, "High")), sum_val)
+
+SAM_STRESS_SUBSCALES = (
+    Subscale("STRESS_sum",    (2, 16, 24, 26), ((5, "Low"), (10, "Moderate"), (None, "High")), " stress", 16),
+    Subscale("THREAT_sum",    (2, 5),          ((2, "Low"), (5, "Moderate"), (None, "High")), " threat", 8),
+    Subscale("CHALLENGE_sum", (8, 19),         ((2, "Low"), (5, "Moderate"), (None, "High")), " challenge", 8),
+    Subscale("CTRL_SELF_sum", (14, 22),        ((2, "Low"), (5, "Moderate"), (None, "High")), " controllable-by-self", 8),
+)
+
+def sam_stress_summary(scores_by_q: dict[int, int]):
+    # Aseguramos presencia; si falta alguna clave, tomamos 0
+    out = {}
+    for sub in SAM_STRESS_SUBSCALES:
+        s = sum(scores_by_q.get(k, 0) for k in sub.items)
+        out[sub.key] = (s, band_label(sub.bands, s) + sub.suffix)
+    return out
+
+# =========================
+# REGISTRO DE INSTRUMENTOS
+# =========================
+INSTRUMENTS: Dict[str, Instrument] = {}
+
+def register(instrument: Instrument) -> Instrument:
+    INSTRUMENTS[instrument.code] = instrument
+    return instrument
+
+register(Instrument(
+    "BAI", "Inventario de Ansiedad de Beck (BAI)", BAI_ITEMS, BAI_OPTIONS,
+    instructions=BAI_INSTRUCTIONS,
+    subscales=[Subscale("total", tuple(range(1, len(BAI_ITEMS) + 1)), BAI_BANDS)],
+    summary_instrument="BAI_SUMMARY",
+    summary_rows=[SummaryRow("total", "Total (0–63)", "total_band", "total")],
+))
+
+register(Instrument(
+    "PSS", "Escala de Estrés Percibido (PSS)", PSS_ITEMS, PSS_OPTIONS,
+    instructions=PSS_INSTRUCTIONS,
+    reverse=PSS_REVERSE, reverse_base=4,
+    subscales=[Subscale("sum", tuple(range(1, len(PSS_ITEMS) + 1)), PSS_BANDS)],
+    summary_instrument="PSS_TOTAL",
+    summary_rows=[SummaryRow("sum", "Suma de 14 ítems", "sum_band", "sum")],
+))
+
+register(Instrument(
+    "PANAS", "Escala de Afectividad Positiva y Negativa (PANAS) (versión corta en castellano)",
+    PANAS_ITEMS, PANAS_OPTIONS,
+    instructions=PANAS_INSTRUCTIONS,
+    subscales=[Subscale("PA", tuple(sorted(PANAS_POS_IDX)), PANAS_BANDS),
+               Subscale("NA", tuple(sorted(PANAS_NEG_IDX)), PANAS_BANDS)],
+    derive=lambda v: panas_summary(v["PA"], v["NA"]),
+    summary_instrument="PANAS_SUMMARY",
+    summary_rows=[
+        SummaryRow("PA_sum", "Positive Affect (sum 10 items)", score="PA_sum"),
+        SummaryRow("NA_sum", "Negative Affect (sum 10 items)", score="NA_sum"),
+        SummaryRow("PA_minus_NA", "Balance (PA - NA)", score="PA_minus_NA"),
+        SummaryRow("PA_cat", "PA category", "PA_cat"),
+        SummaryRow("NA_cat", "NA category", "NA_cat"),
+        SummaryRow("Balance_cat", "Balance category", "Balance_cat"),
+        SummaryRow("Overall", "Overall affective state", "Overall"),
+    ],
+))
+
+def _sam_manikin_derive(v: dict) -> dict:
+    quadrant, emotion = sam_quadrant_and_emotion(v["V"], v["A"])
+    return {"quadrant": quadrant, "emotion": emotion}
+
+register(Instrument(
+    "SAM_Manikin", "Maniquí de autoevaluación (Valencia, Activación, Dominio)",
+    ["Valencia", "Activación", "Dominio"], [(str(k), k) for k in range(1, 10)],
+    item_codes=["Valencia", "Activación", "Dominio"],
+    subscales=[Subscale("V", (1,)), Subscale("A", (2,)), Subscale("D", (3,))],
+    derive=_sam_manikin_derive,
+    summary_instrument="SAM_Manikin_SUMMARY",
+    summary_rows=[
+        SummaryRow("quadrant", "Quadrant by Valence–Arousal", "quadrant"),
+        SummaryRow("interpretation", "Emotion", "emotion"),
+    ],
+))
+
+register(Instrument(
+    "SAM_Stress", "Medida de evaluación del estrés (SAM) – Subconjunto",
+    [SAM_STRESS_ALL[k] for k in SAM_STRESS_SUBSET_ORDER], SAM_STRESS_OPTIONS,
+    item_keys=SAM_STRESS_SUBSET_ORDER,
+    item_codes=[f"Question{k}" for k in SAM_STRESS_SUBSET_ORDER],
+    wide_codes=[f"SAMQ_{k}" for k in SAM_STRESS_SUBSET_ORDER],
+    instructions=SAM_STRESS_Instructions, numbered=False,
+    subscales=SAM_STRESS_SUBSCALES,
+    summary_instrument="SAM_Stress_SUMMARY",
+    summary_rows=[
+        SummaryRow("stress_level", "Stress Score", "STRESS_sum_band", "STRESS_sum_norm"),
+        SummaryRow("threat_sum", "Threat Score", "THREAT_sum_band", "THREAT_sum_norm"),
+        SummaryRow("challenge_sum", "Challenge Score", "CHALLENGE_sum_band", "CHALLENGE_sum_norm"),
+        SummaryRow("ctrl_self_sum", "Ctrl-self score", "CTRL_SELF_sum_band", "CTRL_SELF_sum_norm"),
+    ],
+))
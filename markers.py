@@ -0,0 +1,242 @@
+"""Marcadores de eventos por UDP para sincronizar con el simulador y los registros fisiológicos.
+
+El simulador y los registradores (ECG/EDA) muestrean a cientos de Hz; las
+filas de respuestas sólo llevan la hora al segundo. MarkerStream emite, al
+estilo de un flujo de marcadores de Lab Streaming Layer, un marcador con la
+lectura del reloj monotónico local (time.perf_counter_ns(), en segundos,
+el mismo reloj que t_ns en <datos>.times.csv) cada vez que:
+
+    flow_start      empieza un flujo (evaluación inicial o bloque); al retomar
+                    un borrador lleva resumed=true y el paso donde se retoma
+    page_shown      se muestra una página del cuestionario
+    page_submitted  se guarda una página ("Siguiente")
+    flow_end        termina el flujo
+
+Cada datagrama UDP (JSON) lleva el encabezado del flujo y uno o varios marcadores:
+
+    {"name": "cuestionarios", "type": "Markers", "source_id": "<estación>",
+     "seq": 12, "samples": [[1234.567891, "page_shown", {"page": "BAI", ...}], ...]}
+
+Enviar no bloquea la interfaz: push() sólo deja el marcador en una cola y un
+hilo los agrupa en datagramas (lo que se acumula mientras se envía el
+anterior sale junto). Es lo mejor posible, como en LSL sobre la red: si no
+hay receptor los marcadores se pierden sin afectar la sesión.
+
+Reloj compartido: el mismo socket responde sondas de sincronización
+({"probe": n, "t0": ...} -> {"probe": n, "t0": ..., "t1": ..., "t2": ...}).
+Con varias sondas el receptor estima, como NTP y el time_correction de LSL,
+offset = ((t1 - t0) + (t2 - t3)) / 2 usando la de menor ida y vuelta, y
+pasa los tiempos de los marcadores a su propio reloj (t - offset).
+
+Receptor de prueba (imprime los marcadores ya corregidos):
+    python markers.py listen --port 16571 --source 127.0.0.1:16570
+
+(16570 es CLOCK_PORT, el puerto del emisor para las sondas.)
+"""
+import argparse
+import json
+import queue
+import socket
+import sys
+import threading
+import time
+from typing import List, NamedTuple, Tuple
+
+STREAM_NAME = "cuestionarios"
+STREAM_TYPE = "Markers"
+DEFAULT_PORT = 16571
+CLOCK_PORT = 16570   # donde el emisor responde las sondas de reloj
+MAX_SAMPLES = 50   # marcadores por datagrama (muy por debajo del límite de UDP)
+
+
+def local_clock() -> float:
+    """Reloj monotónico local en segundos (como lsl_local_clock)."""
+    return time.perf_counter_ns() / 1e9
+
+
+def parse_address(text: str, default_port: int = DEFAULT_PORT) -> Tuple[str, int]:
+    """'host:puerto' (o sólo 'host') -> (host, puerto)."""
+    host, _, port = text.rpartition(":") if ":" in text else (text, "", "")
+    return host or "127.0.0.1", int(port) if port else default_port
+
+
+# =========================
+# EMISOR
+# =========================
+class MarkerStream:
+    """Emite marcadores a (host, port) desde un hilo; push() nunca espera a la red."""
+    def __init__(self, host: str, port: int = DEFAULT_PORT, source_id: str = "",
+                 clock_port: int = CLOCK_PORT):
+        self.target = (host, port)
+        self.source_id = source_id
+        self.sent = 0
+        self.dropped = 0
+        self._seq = 0
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            self._sock.bind(("0.0.0.0", clock_port))
+        except OSError:
+            self._sock.bind(("0.0.0.0", 0))  # puerto ocupado: otro cualquiera (se avisa abajo)
+            print(f"[Marcadores] El puerto {clock_port} está ocupado; sondas de reloj en "
+                  f"{self._sock.getsockname()[1]}", file=sys.stderr)
+        self.address = self._sock.getsockname()  # a donde se envían las sondas de reloj
+        self._sock.settimeout(0.5)  # para que el hilo de sondas vea close()
+        self._stop = threading.Event()
+        self._sender = threading.Thread(target=self._send_loop, name="markers-send", daemon=True)
+        self._responder = threading.Thread(target=self._probe_loop, name="markers-clock", daemon=True)
+        self._sender.start()
+        self._responder.start()
+
+    def push(self, marker: str, **fields):
+        """Anota el marcador con la hora actual del reloj local."""
+        self._queue.put((local_clock(), marker, fields))
+
+    def _send_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            samples = [list(item)]
+            stop = False
+            while len(samples) < MAX_SAMPLES:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                samples.append(list(item))
+            self._seq += 1
+            packet = {"name": STREAM_NAME, "type": STREAM_TYPE, "source_id": self.source_id,
+                      "seq": self._seq, "samples": samples}
+            try:
+                self._sock.sendto(json.dumps(packet, ensure_ascii=False).encode("utf-8"), self.target)
+                self.sent += len(samples)
+            except OSError:
+                self.dropped += len(samples)  # sin receptor o sin red: los marcadores son opcionales
+            if stop:
+                return
+
+    def _probe_loop(self):
+        while not self._stop.is_set():
+            try:
+                data, addr = self._sock.recvfrom(2048)
+            except socket.timeout:
+                continue
+            except ConnectionResetError:
+                continue  # Windows avisa así que un envío anterior no tenía receptor
+            except OSError:
+                return  # socket cerrado
+            t1 = local_clock()
+            try:
+                probe = json.loads(data)
+                reply = {"probe": probe["probe"], "t0": probe["t0"], "t1": t1}
+            except (ValueError, KeyError, TypeError):
+                continue
+            reply["t2"] = local_clock()
+            try:
+                self._sock.sendto(json.dumps(reply).encode("utf-8"), addr)
+            except OSError:
+                pass
+
+    def close(self):
+        """Envía lo pendiente y cierra el socket."""
+        self._queue.put(None)
+        self._sender.join(timeout=2)
+        self._stop.set()
+        self._responder.join(timeout=2)
+        self._sock.close()
+
+
+# =========================
+# RECEPTOR DE PRUEBA
+# =========================
+class Marker(NamedTuple):
+    source_id: str
+    seq: int
+    timestamp: float   # reloj del emisor, en segundos
+    marker: str
+    fields: dict
+
+
+class MarkerReceiver:
+    """Receptor local: recibe marcadores y estima el desfase de reloj con el emisor."""
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.bind((host, port))
+        self.address = self._sock.getsockname()
+        self._clock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)  # sondas aparte de los marcadores
+
+    def receive(self, timeout: float | None = 1.0) -> List[Marker]:
+        """Marcadores del siguiente datagrama ([] si no llega ninguno a tiempo)."""
+        self._sock.settimeout(timeout)
+        try:
+            data, _ = self._sock.recvfrom(65535)
+            packet = json.loads(data)
+            return [Marker(packet["source_id"], packet["seq"], t, m, f) for t, m, f in packet["samples"]]
+        except (socket.timeout, ValueError, KeyError, TypeError):
+            return []
+
+    def estimate_offset(self, source: Tuple[str, int], probes: int = 8,
+                        timeout: float = 0.5) -> Tuple[float, float] | None:
+        """(desfase, ida y vuelta) en segundos; reloj del receptor = reloj del emisor - desfase."""
+        best = None
+        self._clock.settimeout(timeout)
+        for n in range(probes):
+            t0 = local_clock()
+            try:
+                self._clock.sendto(json.dumps({"probe": n, "t0": t0}).encode("utf-8"), source)
+                while True:
+                    reply = json.loads(self._clock.recvfrom(2048)[0])
+                    if reply.get("probe") == n:
+                        break
+            except (socket.timeout, OSError, ValueError):
+                continue
+            t3 = local_clock()
+            rtt = (t3 - t0) - (reply["t2"] - reply["t1"])
+            offset = ((reply["t1"] - t0) + (reply["t2"] - t3)) / 2
+            if best is None or rtt < best[1]:
+                best = (offset, rtt)
+        return best
+
+    def close(self):
+        self._sock.close()
+        self._clock.close()
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Receptor de prueba de los marcadores del cuestionario.")
+    sub = ap.add_subparsers(dest="command", required=True)
+    listen = sub.add_parser("listen", help="imprimir los marcadores que lleguen")
+    listen.add_argument("--host", default="127.0.0.1")
+    listen.add_argument("--port", type=int, default=DEFAULT_PORT)
+    listen.add_argument("--source", metavar="HOST:PUERTO",
+                        help="dirección del emisor para estimar el desfase de reloj")
+    args = ap.parse_args(argv)
+
+    rx = MarkerReceiver(args.host, args.port)
+    offset = 0.0
+    if args.source:
+        est = rx.estimate_offset(parse_address(args.source))
+        if est is None:
+            print("No respondió el emisor; se muestran los tiempos sin corregir.", file=sys.stderr)
+        else:
+            offset = est[0]
+            print(f"Desfase {offset * 1000:.3f} ms (ida y vuelta {est[1] * 1000:.3f} ms)", file=sys.stderr)
+    print(f"Escuchando en {rx.address[0]}:{rx.address[1]} (Ctrl+C para salir)", file=sys.stderr)
+    try:
+        while True:
+            for m in rx.receive(timeout=None):
+                print(f"{m.timestamp - offset:.6f}\t{m.source_id}\t{m.seq}\t{m.marker}\t"
+                      f"{json.dumps(m.fields, ensure_ascii=False)}", flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        rx.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""Tiempos de espera entre páginas (clic en "Siguiente" -> página siguiente visible).
+
+Cada transición se divide en fases:
+    validate   all_answered() de la página actual
+    persist    save_to_csv() y entrega del lote al hilo escritor
+    construct  construcción (sólo la primera vez) y reset() de la página siguiente
+    show       stack.setCurrentWidget()
+    paint      hasta el siguiente turno del ciclo de eventos (maquetado y pintado)
+
+Las mediciones se añaden a un CSV aparte (<archivo de respuestas>.metrics.csv)
+para no mezclarlas con los datos del estudio. Resumen por transición y fase:
+
+    python metrics.py respuestas_cuestionarios.csv.metrics.csv
+"""
+import argparse
+import csv
+import sys
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
+
+from file_tasks import CsvAppendLog, FileTasks
+
+PHASES = ("validate", "persist", "construct", "show", "paint")
+METRICS_HEADER = ["timestamp", "transition", *(f"{p}_ms" for p in PHASES), "total_ms"]
+PERCENTILES = (50, 95, 99)
+
+
+def metrics_path(data_path: str) -> str:
+    return data_path + ".metrics.csv"
+
+
+class TransitionTiming:
+    """Cronómetro de una transición; lap() cierra la fase en curso."""
+    __slots__ = ("name", "start", "last", "phases")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = self.last = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+
+    def lap(self, phase: str):
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + (now - self.last)
+        self.last = now
+
+    def row(self) -> list:
+        ms = [round(self.phases.get(p, 0.0) * 1000, 3) for p in PHASES]
+        return [datetime.now().isoformat(timespec="seconds"), self.name, *ms,
+                round((self.last - self.start) * 1000, 3)]
+
+
+class MetricsLog:
+    """Acumula las transiciones en memoria y las vuelca al CSV en lotes pequeños.
+
+    El volcado ocurre cada FLUSH_EVERY transiciones y al cerrar, de modo que la
+    escritura en disco no cae en cada clic del participante; con `tasks` se
+    hace además en ese hilo de fondo y no en el de la interfaz.
+    """
+    FLUSH_EVERY = 20
+
+    def __init__(self, path: str, tasks: FileTasks | None = None):
+        self.path = path
+        self._log = CsvAppendLog(path, METRICS_HEADER, "las métricas", tasks)
+
+    def start(self, name: str) -> TransitionTiming:
+        return TransitionTiming(name)
+
+    def record(self, timing: TransitionTiming):
+        self._log.add([timing.row()])
+        if len(self._log) >= self.FLUSH_EVERY:
+            self.flush()
+
+    def flush(self):
+        self._log.flush()
+
+    def close(self):
+        self.flush()
+
+
+# =========================
+# RESUMEN
+# =========================
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Percentil por rango más cercano sobre una lista ya ordenada."""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, -(-len(sorted_values) * p // 100) - 1))
+    return sorted_values[int(k)]
+
+
+def summarize(rows: Iterable[Dict[str, str]]) -> List[Tuple[str, str, int, Tuple[float, ...]]]:
+    """(transición, fase, n, (p50, p95, p99)) por cada transición y fase, incluido el total."""
+    samples: Dict[Tuple[str, str], List[float]] = {}
+    for r in rows:
+        for col in METRICS_HEADER[2:]:
+            try:
+                v = float(r[col])
+            except (KeyError, TypeError, ValueError):
+                continue
+            samples.setdefault((r["transition"], col[:-3]), []).append(v)
+    out = []
+    order = {p: i for i, p in enumerate((*PHASES, "total"))}
+    for (name, phase), values in sorted(samples.items(), key=lambda kv: (kv[0][0], order[kv[0][1]])):
+        values.sort()
+        out.append((name, phase, len(values), tuple(percentile(values, p) for p in PERCENTILES)))
+    return out
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Resumen p50/p95/p99 de los tiempos entre páginas.")
+    ap.add_argument("log", help="archivo .metrics.csv")
+    args = ap.parse_args(argv)
+
+    with open(args.log, newline="", encoding="utf-8") as f:
+        summary = summarize(csv.DictReader(f))
+    print(f"{'transición':<22}{'fase':<11}{'n':>6}" + "".join(f"{f'p{p} ms':>11}" for p in PERCENTILES))
+    for name, phase, n, values in summary:
+        print(f"{name:<22}{phase:<11}{n:>6}" + "".join(f"{v:>11.2f}" for v in values))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""Protocolo de aplicación: qué flujos hay y qué páginas muestra cada uno.
+
+El protocolo se lee de un archivo JSON (protocol.json por omisión) para poder
+cambiar el orden de los cuestionarios, los textos de las transiciones o las
+repeticiones sin tocar el código (los comentarios # son sólo explicativos):
+
+    {
+      "blocks": 20,                         # bloques que ofrece la pantalla inicial
+      "flows": [
+        {"name": "initial", "label": "Evaluación inicial (BAI + PSS + PANAS)",
+         "steps": [
+           {"page": "BAI"},                 # código de instruments.INSTRUMENTS
+           {"page": "PSS", "missing": "Responde todas las preguntas."},
+           {"transition": "¡Gracias! ... bloque {block}"},
+           {"repeat": 2, "steps": [...]}    # grupo de pasos repetido
+         ]}
+      ]
+    }
+
+En los textos de transición pueden usarse {block}, {participant} y {stage}.
+Los flujos "initial" y "block" además activan en la pantalla inicial el
+aviso de evaluación/bloque ya registrado. No depende de Qt.
+"""
+import json
+import string
+from typing import Dict, List, NamedTuple, Tuple
+
+from instruments import INSTRUMENTS
+
+PROTOCOL_FILE = "protocol.json"
+DEFAULT_MISSING = "Responde todas las preguntas."
+# Campos de los textos de transición, con valores de ejemplo para probarlos al cargar
+TEXT_FIELDS = {"block": 1, "participant": "P01", "stage": "Base"}
+
+
+class ProtocolError(ValueError):
+    """El archivo de protocolo no es válido."""
+
+
+class Step(NamedTuple):
+    page: str = ""        # código del instrumento ("" en las transiciones)
+    text: str = ""        # texto de la transición
+    missing: str = DEFAULT_MISSING
+
+    @property
+    def is_page(self) -> bool:
+        return bool(self.page)
+
+
+class Flow(NamedTuple):
+    name: str
+    label: str
+    steps: Tuple[Step, ...]
+
+    def next_page(self, i: int) -> int | None:
+        """Índice del siguiente paso con página después de i (None si no hay)."""
+        return next((j for j in range(i + 1, len(self.steps)) if self.steps[j].is_page), None)
+
+    def prev_page(self, i: int) -> int | None:
+        return next((j for j in range(i - 1, -1, -1) if self.steps[j].is_page), None)
+
+
+class Protocol(NamedTuple):
+    blocks: int
+    flows: Dict[str, Flow]   # en el orden del archivo
+
+    def pages(self) -> List[str]:
+        """Instrumentos que usa el protocolo, en orden de primera aparición."""
+        seen: Dict[str, None] = {}
+        for flow in self.flows.values():
+            for s in flow.steps:
+                if s.is_page:
+                    seen.setdefault(s.page, None)
+        return list(seen)
+
+
+def _check_text(text: str, at: str):
+    """Un texto de transición sólo puede usar {block}, {participant} y {stage}."""
+    try:
+        fields = [name for _, name, _, _ in string.Formatter().parse(text) if name is not None]
+    except ValueError as e:
+        raise ProtocolError(f"{at}: llaves mal formadas en el texto ({e}); use {{{{ y }}}} para una llave literal") from None
+    unknown = [name for name in fields if name not in TEXT_FIELDS]
+    if unknown:
+        raise ProtocolError(f"{at}: campo desconocido {{{unknown[0]}}} en el texto "
+                            f"(disponibles: {', '.join(f'{{{k}}}' for k in TEXT_FIELDS)})")
+    try:
+        text.format(**TEXT_FIELDS)
+    except (ValueError, TypeError) as e:
+        raise ProtocolError(f"{at}: formato inválido en el texto ({e})") from None
+
+
+def _steps(raw, where: str) -> List[Step]:
+    if not isinstance(raw, list) or not raw:
+        raise ProtocolError(f"{where}: 'steps' debe ser una lista no vacía")
+    out: List[Step] = []
+    for n, s in enumerate(raw, start=1):
+        at = f"{where}, paso {n}"
+        if not isinstance(s, dict):
+            raise ProtocolError(f"{at}: se esperaba un objeto")
+        if "repeat" in s:
+            times = s["repeat"]
+            if not isinstance(times, int) or times < 1:
+                raise ProtocolError(f"{at}: 'repeat' debe ser un entero >= 1")
+            out += _steps(s.get("steps"), at) * times
+        elif "page" in s:
+            if s["page"] not in INSTRUMENTS:
+                raise ProtocolError(f"{at}: instrumento desconocido {s['page']!r} "
+                                    f"(disponibles: {', '.join(INSTRUMENTS)})")
+            out.append(Step(page=s["page"], missing=str(s.get("missing", DEFAULT_MISSING))))
+        elif "transition" in s:
+            text = str(s["transition"])
+            _check_text(text, at)
+            out.append(Step(text=text))
+        else:
+            raise ProtocolError(f"{at}: se esperaba 'page', 'transition' o 'repeat'")
+    return out
+
+
+def parse_protocol(data: dict) -> Protocol:
+    try:
+        blocks = int(data.get("blocks", 20))
+        raw_flows = data["flows"]
+    except (AttributeError, KeyError, TypeError, ValueError):
+        raise ProtocolError("se esperaba un objeto con 'flows' (y opcionalmente 'blocks')") from None
+    if blocks < 1 or not isinstance(raw_flows, list) or not raw_flows:
+        raise ProtocolError("'blocks' debe ser >= 1 y 'flows' una lista no vacía")
+    flows: Dict[str, Flow] = {}
+    for n, f in enumerate(raw_flows, start=1):
+        if not isinstance(f, dict) or not f.get("name"):
+            raise ProtocolError(f"flujo {n}: falta 'name'")
+        name = str(f["name"])
+        if name in flows:
+            raise ProtocolError(f"flujo {name!r} repetido")
+        flows[name] = Flow(name, str(f.get("label", name)), tuple(_steps(f.get("steps"), f"flujo {name!r}")))
+    return Protocol(blocks, flows)
+
+
+def load_protocol(path: str = PROTOCOL_FILE) -> Protocol:
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except OSError as e:
+        raise ProtocolError(f"no se pudo leer {path}: {e}") from None
+    except ValueError as e:
+        raise ProtocolError(f"{path} no es JSON válido: {e}") from None
+    return parse_protocol(data)
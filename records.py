@@ -0,0 +1,50 @@
+"""Registro tipado de una fila de respuestas.
+
+ResponseRecord es la fila larga de siempre (mismos campos y orden que
+storage.CSV_HEADER), pero como tupla con nombre y con tipos fijos:
+
+    block_id    int
+    instrument  str internado (sys.intern): una sola copia por código
+    item_code   str internado
+    response    str ("" si la fila no tiene etiqueta)
+    score       int, float o None (celda vacía)
+
+Las páginas la construyen (Instrument.page_records) y viaja tal cual por el
+bus de eventos, el escritor, el diario y los backends: el CSV escribe None
+como celda vacía y SQLite separa score_int/score_real según el tipo, sin
+convertir texto. Lo leído de JSON o de un CSV (diario, bandeja de salida)
+se normaliza una vez con from_row(). No depende de Qt.
+"""
+from sys import intern
+from typing import NamedTuple, Sequence
+
+
+class ResponseRecord(NamedTuple):
+    timestamp: str
+    participant_id: str
+    block_id: int
+    stage_label: str
+    instrument: str
+    item_code: str
+    item_text: str
+    response: str
+    score: int | float | None
+
+    @classmethod
+    def from_row(cls, row: Sequence) -> "ResponseRecord":
+        """Normaliza una fila suelta (p. ej. de JSON, con "" o texto en score)."""
+        ts, pid, block, stage, inst, code, text, resp, score = row
+        return cls(str(ts), str(pid), int(block), str(stage), intern(str(inst)), intern(str(code)),
+                   str(text), "" if resp is None else str(resp), parse_score(score))
+
+
+def parse_score(value) -> int | float | None:
+    """Puntaje de una celda: "" -> None, "3" -> 3, "0.25" -> 0.25."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
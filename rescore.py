@@ -0,0 +1,118 @@
+"""Re-puntúa en lote un CSV de respuestas sin abrir la interfaz.
+
+Uso:
+    python rescore.py respuestas_cuestionarios.csv -o respuestas_rescored.csv
+    python rescore.py respuestas_cuestionarios.csv --summaries-only -o resumenes.csv
+
+Lee el CSV largo (una fila por ítem), agrupa las filas de ítems de cada
+página contestada por (timestamp, participant_id, block_id, stage_label,
+instrument) y vuelve a calcular las puntuaciones por ítem y todas las filas
+resumen con las bandas y cortes actuales de instruments.py. Las filas resumen
+antiguas se descartan.
+"""
+import argparse
+import csv
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from instruments import INSTRUMENTS
+from storage import CSV_HEADER, open_path
+
+PageKey = Tuple[str, str, str, str, str]  # (timestamp, participant_id, block_id, stage_label, instrument)
+Page = Tuple[PageKey, array]               # (clave, índices de opción en el orden del instrumento)
+
+
+def read_pages(rows: Iterable[List[str]]) -> Tuple[List[Page], int]:
+    """Agrupa las filas de ítems por página.
+
+    La aplicación escribe cada página como un bloque contiguo, así que una
+    página nueva empieza cuando cambia la clave o cuando se repite un ítem
+    (dos páginas guardadas en el mismo segundo). Devuelve las páginas completas
+    y el número de filas que no pudieron usarse; las páginas incompletas
+    (p. ej. cortadas por un cierre inesperado) se omiten.
+    """
+    positions = {code: {c: i for i, c in enumerate(inst.item_codes)} for code, inst in INSTRUMENTS.items()}
+    pages: List[Page] = []
+    skipped = 0
+    key: PageKey | None = None
+    answers: array | None = None
+
+    def close_page():
+        nonlocal skipped
+        if answers is None:
+            return
+        if -1 in answers:
+            skipped += sum(1 for j in answers if j != -1)
+        else:
+            pages.append((key, answers))
+
+    for r in rows:
+        if len(r) < 9:
+            skipped += 1
+            continue
+        inst = INSTRUMENTS.get(r[4])
+        if inst is None:
+            continue  # fila resumen u otro instrumento
+        i = positions[inst.code].get(r[5])
+        j = inst.option_index.get(r[7])
+        if i is None or j is None:
+            skipped += 1
+            continue
+        k = (r[0], r[1], r[2], r[3], r[4])
+        if k != key or answers[i] != -1:
+            close_page()
+            key, answers = k, array("b", [-1] * len(inst.items))
+        answers[i] = j
+    close_page()
+    return pages, skipped
+
+
+def rescore(pages: List[Page], summaries_only: bool = False) -> Iterator[list]:
+    """Filas de salida por página, en el orden en que aparecieron en el archivo."""
+    by_inst: Dict[str, List[int]] = {}
+    for n, (key, _) in enumerate(pages):
+        by_inst.setdefault(key[4], []).append(n)
+    results: List[dict] = [{} for _ in pages]
+    for code, idx in by_inst.items():
+        inst = INSTRUMENTS[code]
+        raws = [inst.raw_scores(pages[n][1]) for n in idx]
+        for n, values in zip(idx, inst.evaluate_many(raws)):
+            results[n] = values
+    for (key, answers), values in zip(pages, results):
+        inst = INSTRUMENTS[key[4]]
+        meta = list(key[:4])
+        if not summaries_only:
+            item_scores = inst.item_scores(inst.raw_scores(answers))
+            for code, txt, j, score in zip(inst.item_codes, inst.items, answers, item_scores):
+                yield meta + [inst.code, code, txt, inst.options[j][0], score]
+        yield from (meta + list(row) for row in inst.summary(values))
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Re-puntúa en lote el CSV de respuestas de cuestionarios.")
+    ap.add_argument("input", help="CSV de respuestas (formato largo) o base .sqlite")
+    ap.add_argument("-o", "--output", help="CSV de salida (por omisión, salida estándar)")
+    ap.add_argument("--summaries-only", action="store_true", help="escribir sólo las filas resumen")
+    args = ap.parse_args(argv)
+
+    source = open_path(args.input)
+    try:
+        pages, skipped = read_pages(source.iter_rows())
+    finally:
+        source.close()
+
+    out = open(args.output, "w", newline="", encoding="utf-8-sig") if args.output else sys.stdout
+    try:
+        w = csv.writer(out)
+        w.writerow(CSV_HEADER)
+        w.writerows(rescore(pages, args.summaries_only))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"{len(pages)} páginas re-puntuadas; {skipped} filas omitidas.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""Tiempos de respuesta por ítem: página visible -> primer clic -> respuesta final, y cambios.
+
+Las filas de respuestas sólo llevan la hora (al segundo) en que se guardó la
+página. Para los tiempos de reacción, cada página anota aquí, con
+time.perf_counter_ns() (reloj monotónico), cuándo se mostró y cada clic en
+una opción. Anotar es escribir cinco enteros en un búfer circular
+preasignado (EventRing): no reserva memoria ni toma locks, porque sólo
+escribe el hilo de la interfaz. Al guardar la página sus eventos se
+convierten en filas, y ResponseTimesLog las agrega por lotes a un CSV aparte
+(<datos>.times.csv), con una fila por evento:
+
+    event     shown    la página quedó visible (t_ms = 0)
+              answer   primera respuesta del ítem
+              change   se eligió otra opción en un ítem ya respondido
+              saved    se pulsó "Siguiente" y la página se guardó
+    t_ms      milisegundos desde shown
+    t_ns      lectura del reloj monotónico (para alinear con otros registros)
+
+La respuesta final de cada ítem es su último answer/change. Si una página
+acumula más de CAPACITY eventos sin guardarse se conservan los más recientes
+(ver EventRing.dropped). No depende de Qt.
+"""
+import time
+from array import array
+from datetime import datetime
+from typing import Callable, Dict, List, Sequence
+
+from file_tasks import CsvAppendLog, FileTasks
+
+CAPACITY = 4096
+TIMES_HEADER = ["timestamp", "participant_id", "block_id", "stage_label",
+                "instrument", "item_code", "event", "response", "t_ms", "t_ns"]
+
+# Tipos de evento en el búfer
+SHOWN, PRESET, CLICK, SAVED = range(4)
+
+
+def times_path(data_path: str) -> str:
+    return data_path + ".times.csv"
+
+
+class EventRing:
+    """Búfer circular de eventos (t_ns, visita, tipo, ítem, opción) en arreglos preasignados.
+
+    Cada vez que una página se muestra abre una "visita" (shown); los clics
+    se anotan con esa visita y take() devuelve los de una visita al guardarla.
+    """
+    __slots__ = ("capacity", "dropped", "_t", "_visit", "_kind", "_item", "_option",
+                 "_head", "_next_visit", "_starts")
+
+    def __init__(self, capacity: int = CAPACITY):
+        self.capacity = capacity
+        self.dropped = 0
+        self._t = array("q", [0]) * capacity
+        self._visit = array("q", [0]) * capacity
+        self._kind = array("b", [0]) * capacity
+        self._item = array("h", [0]) * capacity
+        self._option = array("b", [0]) * capacity
+        self._head = 0          # eventos escritos desde el inicio
+        self._next_visit = 1
+        self._starts: Dict[int, int] = {}  # visita abierta -> posición de su primer evento
+
+    def record(self, visit: int, kind: int, item: int = -1, option: int = -1):
+        i = self._head % self.capacity
+        self._t[i] = time.perf_counter_ns()
+        self._visit[i] = visit
+        self._kind[i] = kind
+        self._item[i] = item
+        self._option[i] = option
+        self._head += 1
+
+    def shown(self, answers: Sequence[int] = (), previous: int = 0) -> int:
+        """Abre una visita; answers son las respuestas que la página ya trae marcadas."""
+        self._starts.pop(previous, None)  # una visita que no se guardó se descarta
+        visit = self._next_visit
+        self._next_visit += 1
+        self._starts[visit] = self._head
+        self.record(visit, SHOWN)
+        for i, j in enumerate(answers):
+            if j >= 0:
+                self.record(visit, PRESET, i, j)
+        return visit
+
+    def click(self, visit: int, item: int, option: int):
+        if visit:
+            self.record(visit, CLICK, item, option)
+
+    def take(self, visit: int) -> List[tuple]:
+        """Cierra la visita y devuelve sus eventos (t_ns, tipo, ítem, opción) en orden."""
+        start = self._starts.pop(visit, None)
+        if start is None:
+            return []
+        self.record(visit, SAVED)
+        first = self._head - self.capacity
+        if start < first:
+            self.dropped += first - start
+            start = first
+        out = []
+        for n in range(start, self._head):
+            i = n % self.capacity
+            if self._visit[i] == visit:
+                out.append((self._t[i], self._kind[i], self._item[i], self._option[i]))
+        return out
+
+
+ITEM_EVENTS = EventRing()
+
+
+def visit_rows(events: Sequence[tuple], item_code: Callable[[int], str],
+               response: Callable[[int], str]) -> List[list]:
+    """Filas [item_code, event, response, t_ms, t_ns] de los eventos de una visita."""
+    rows: List[list] = []
+    current: Dict[int, int] = {}  # ítem -> opción elegida hasta el momento
+    t0 = events[0][0] if events else 0
+    for t, kind, item, option in events:
+        ms = round((t - t0) / 1e6, 3)
+        if kind == SHOWN:
+            rows.append(["", "shown", "", ms, t])
+        elif kind == PRESET:
+            current[item] = option
+        elif kind == CLICK:
+            before = current.get(item)
+            if before == option:
+                continue  # clic sobre la opción ya marcada
+            current[item] = option
+            rows.append([item_code(item), "answer" if before is None else "change", response(option), ms, t])
+        elif kind == SAVED:
+            rows.append(["", "saved", "", ms, t])
+    return rows
+
+
+class ResponseTimesLog:
+    """Acumula las filas de tiempos y las agrega al CSV por lotes (cada FLUSH_EVERY páginas y al cerrar).
+
+    Con `tasks` el archivo se escribe en ese hilo de fondo y no en el de la interfaz.
+    """
+    FLUSH_EVERY = 10
+
+    def __init__(self, path: str, ring: EventRing = ITEM_EVENTS, tasks: FileTasks | None = None):
+        self.path = path
+        self.ring = ring
+        self._log = CsvAppendLog(path, TIMES_HEADER, "los tiempos de respuesta", tasks, bom=True)
+        self._pages = 0
+
+    def page_saved(self, visit: int, meta: Sequence, item_code: Callable[[int], str],
+                   response: Callable[[int], str]):
+        """meta = (participant_id, block_id, stage_label, instrument) de la página guardada."""
+        rows = visit_rows(self.ring.take(visit), item_code, response)
+        if not rows:
+            return
+        ts = datetime.now().isoformat(timespec="seconds")
+        self._log.add([ts, *meta, *r] for r in rows)
+        self._pages += 1
+        if self._pages >= self.FLUSH_EVERY:
+            self.flush()
+
+    def flush(self):
+        self._pages = 0
+        self._log.flush()
+
+    def close(self):
+        self.flush()
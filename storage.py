@@ -0,0 +1,1173 @@
+"""Almacenamiento de respuestas: backends intercambiables detrás del escritor.
+
+- CsvBackend: el CSV largo de siempre (UTF-8 con BOM, compatible con Excel).
+- SqliteBackend: SQLite en modo WAL, sólo de anexado. El texto de cada ítem
+  se guarda una vez en la tabla `items` y los puntajes en columnas tipadas
+  (score_int / score_real). Puede exportar el CSV heredado cuando se pida.
+- ShardedBackend: una carpeta con un CSV pequeño por estudio/día/participante
+  y un manifiesto; los fragmentos cerrados se comprimen con gzip.
+
+Todos los backends reciben lotes de filas con el esquema CSV_HEADER y los
+escriben de forma atómica en write_batch(). Cada lote pasa antes por un
+diario de escritura anticipada (Journal) para que, tras un cierre inesperado,
+cada página quede guardada exactamente una vez. No depende de Qt.
+
+Exportar una base SQLite o una carpeta de fragmentos al CSV heredado, y
+listar los fragmentos (los filtros sólo abren los fragmentos que hacen falta):
+    python storage.py export respuestas_cuestionarios.sqlite -o respuestas.csv
+    python storage.py export respuestas_cuestionarios_shards -o p01.csv --participant P01
+    python storage.py shards respuestas_cuestionarios_shards --day 2025-03-14
+"""
+import argparse
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+import queue
+import re
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+import zlib
+from datetime import date
+from typing import Callable, Dict, Iterator, List, Sequence, Set, Tuple
+
+from instruments import INSTRUMENTS
+from records import ResponseRecord
+
+CSV_HEADER = ["timestamp", "participant_id", "block_id", "stage_label",
+              "instrument", "item_code", "item_text", "response", "score"]
+
+# Errores de escritura ante los que el escritor reintenta
+STORAGE_ERRORS = (OSError, sqlite3.Error)
+
+# =========================
+# CSV
+# =========================
+def ensure_csv_header(path: str):
+    exists = os.path.isfile(path)
+    if not exists:
+        with open(path, "a", newline="", encoding="utf-8-sig") as f:
+            w = csv.writer(f)
+            w.writerow(CSV_HEADER)
+
+def read_csv_rows(path: str) -> Iterator[List[str]]:
+    """Filas de datos de un CSV de respuestas (sin encabezado)."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        rows = csv.reader(f)
+        next(rows, None)
+        yield from rows
+
+def _parse_csv(text: str) -> List[List[str]]:
+    """Filas de un trozo de CSV; una fila que el lector no acepta se omite."""
+    rows = []
+    reader = csv.reader(io.StringIO(text))
+    while True:
+        try:
+            rows.append(next(reader))
+        except StopIteration:
+            return rows
+        except csv.Error:
+            continue  # p. ej. un NUL en versiones de Python que no lo aceptan
+
+def _encode_csv(rows: Sequence[Sequence]) -> bytes:
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    return buf.getvalue().encode("utf-8")
+
+class CsvBackend:
+    """Anexa cada lote al CSV con una sola escritura y un solo fsync."""
+    def __init__(self, path: str):
+        ensure_csv_header(path)
+        self.path = path
+        self._f = None
+
+    def write_batch(self, rows: Sequence[Sequence], seq: int | None = None):
+        if self._f is None:
+            self._f = open(self.path, "ab")
+        self._f.write(_encode_csv(rows))
+        self._f.flush()
+        os.fsync(self._f.fileno())
+
+    # ---- diario ----
+    def position(self) -> int:
+        """Tamaño actual del archivo: donde empezará el siguiente lote."""
+        return os.path.getsize(self.path)
+
+    def has_batch(self, seq: int, start: int, rows: Sequence[Sequence]) -> bool:
+        data = _encode_csv(rows)
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            return f.read(len(data)) == data
+
+    def repair(self, start: int):
+        """Descarta lo escrito desde `start` (un lote a medias)."""
+        self.close()
+        if os.path.getsize(self.path) > start:
+            with open(self.path, "r+b") as f:
+                f.truncate(start)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def iter_rows(self) -> Iterator[List[str]]:
+        return read_csv_rows(self.path)
+
+    def read_since(self, offset: int) -> Tuple[List[List[str]], int]:
+        """Filas completas agregadas después del byte `offset` y el nuevo offset."""
+        with open(self.path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            if offset > f.tell():
+                raise ValueError("el archivo es más corto que el punto de control")
+            f.seek(offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1  # una línea a medio escribir se lee la próxima vez
+        # Un byte que no es UTF-8 (p. ej. el archivo se volvió a guardar desde
+        # Excel en cp1252) se lee como U+FFFD en vez de detener las vistas
+        text = data[:end].decode("utf-8-sig" if offset == 0 else "utf-8", errors="replace")
+        rows = _parse_csv(text)
+        if offset == 0 and rows:
+            rows = rows[1:]  # encabezado
+        return rows, offset + end
+
+    def fingerprint(self, offset: int) -> str:
+        """Huella de los bytes previos a `offset` para detectar un archivo reemplazado."""
+        with open(self.path, "rb") as f:
+            f.seek(max(0, offset - 64))
+            return hashlib.sha1(f.read(min(offset, 64))).hexdigest()
+
+    def close(self):
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+# =========================
+# SQLITE
+# =========================
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id         INTEGER PRIMARY KEY,
+    instrument TEXT NOT NULL,
+    item_code  TEXT NOT NULL,
+    item_text  TEXT NOT NULL,
+    UNIQUE (instrument, item_code, item_text)
+);
+CREATE TABLE IF NOT EXISTS responses (
+    id             INTEGER PRIMARY KEY,
+    timestamp      TEXT NOT NULL,
+    participant_id TEXT NOT NULL,
+    block_id       INTEGER,
+    stage_label    TEXT,
+    item_id        INTEGER NOT NULL REFERENCES items(id),
+    response       TEXT,
+    score_int      INTEGER,
+    score_real     REAL
+);
+CREATE INDEX IF NOT EXISTS responses_session ON responses (participant_id, block_id);
+CREATE TABLE IF NOT EXISTS batches (
+    seq INTEGER PRIMARY KEY
+);
+"""
+
+class SqliteBackend:
+    """Base SQLite de sólo anexado (WAL); cada lote es una transacción."""
+    def __init__(self, path: str):
+        self.path = path
+        self._db = None
+        self._item_ids: Dict[Tuple[str, str, str], int] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            # El escritor la crea en su propio hilo; no se comparte entre hilos a la vez
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=FULL")
+            self._db.executescript(_SCHEMA)
+            self._item_ids = {(i, c, t): n for n, i, c, t in
+                              self._db.execute("SELECT id, instrument, item_code, item_text FROM items")}
+        return self._db
+
+    def _item_id(self, db: sqlite3.Connection, instrument: str, code: str, text: str) -> int:
+        key = (instrument, code, text)
+        n = self._item_ids.get(key)
+        if n is None:
+            n = db.execute("INSERT INTO items (instrument, item_code, item_text) VALUES (?, ?, ?)",
+                           key).lastrowid
+            self._item_ids[key] = n
+        return n
+
+    def write_batch(self, rows: Sequence[ResponseRecord], seq: int | None = None):
+        db = self._connect()
+        known = dict(self._item_ids)
+        try:
+            with db:
+                if seq is not None:
+                    db.execute("INSERT INTO batches (seq) VALUES (?)", (seq,))
+                db.executemany(
+                    "INSERT INTO responses (timestamp, participant_id, block_id, stage_label,"
+                    " item_id, response, score_int, score_real) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(ts, pid, block, stage, self._item_id(db, inst, code, txt), resp,
+                      score if score.__class__ is int else None, score if score.__class__ is float else None)
+                     for ts, pid, block, stage, inst, code, txt, resp, score in rows])
+        except sqlite3.Error:
+            self._item_ids = known  # los ítems nuevos se revirtieron con la transacción
+            raise
+
+    # ---- diario (el número de lote se registra en la misma transacción) ----
+    def position(self) -> int:
+        return 0
+
+    def has_batch(self, seq: int, start: int, rows: Sequence[Sequence]) -> bool:
+        return self._connect().execute("SELECT 1 FROM batches WHERE seq = ?", (seq,)).fetchone() is not None
+
+    def repair(self, start: int):
+        pass  # una transacción incompleta no queda en la base
+
+    def iter_rows(self) -> Iterator[list]:
+        """Filas en el esquema del CSV heredado, en orden de inserción."""
+        cur = self._connect().execute(
+            "SELECT r.timestamp, r.participant_id, r.block_id, r.stage_label,"
+            " i.instrument, i.item_code, i.item_text, r.response, r.score_int, r.score_real"
+            " FROM responses r JOIN items i ON i.id = r.item_id ORDER BY r.id")
+        for *head, s_int, s_real in cur:
+            yield head + [s_int if s_int is not None else (s_real if s_real is not None else "")]
+
+    def read_since(self, offset: int) -> Tuple[List[list], int]:
+        """Filas con id mayor que `offset` y el último id leído."""
+        db = self._connect()
+        if offset and db.execute("SELECT 1 FROM responses WHERE id = ?", (offset,)).fetchone() is None:
+            raise ValueError("la base no contiene el punto de control")
+        rows, last = [], offset
+        cur = db.execute(
+            "SELECT r.id, r.timestamp, r.participant_id, r.block_id, r.stage_label,"
+            " i.instrument, i.item_code, i.item_text, r.response, r.score_int, r.score_real"
+            " FROM responses r JOIN items i ON i.id = r.item_id WHERE r.id > ? ORDER BY r.id", (offset,))
+        for last, *head, s_int, s_real in cur:
+            rows.append(head + [s_int if s_int is not None else (s_real if s_real is not None else "")])
+        return rows, last
+
+    def fingerprint(self, offset: int) -> str:
+        row = self._connect().execute("SELECT timestamp, participant_id FROM responses WHERE id = ?",
+                                      (offset,)).fetchone()
+        return "|".join(map(str, row)) if row else ""
+
+    def export_csv(self, path: str) -> int:
+        n = 0
+        with open(path, "w", newline="", encoding="utf-8-sig") as f:
+            w = csv.writer(f)
+            w.writerow(CSV_HEADER)
+            for row in self.iter_rows():
+                w.writerow(row)
+                n += 1
+        return n
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+# =========================
+# FRAGMENTOS (SHARDS)
+# =========================
+SHARD_MANIFEST = "manifest.json"
+SHARD_LOG = "batches.log"
+_MANIFEST_KEYS = {"version", "id", "batches", "journal_seq", "next_shard", "shards"}
+_SHARD_KEYS = {"id", "study", "day", "participant", "file", "state", "rows", "bytes", "first", "last", "updated"}
+DEFAULT_STUDY = "estudio"
+
+def _safe_name(text: str, empty: str = "_") -> str:
+    """Texto apto para nombre de archivo o carpeta."""
+    return re.sub(r"[^\w.-]+", "_", str(text)).strip("._") or empty
+
+def _shard_day(timestamp: str) -> str:
+    day = str(timestamp)[:10]
+    return day if re.fullmatch(r"\d{4}-\d{2}-\d{2}", day) else "sin_fecha"
+
+class ShardedBackend:
+    """Respuestas repartidas en archivos pequeños por estudio/día/participante.
+
+    <raíz>/<estudio>/<día>/<participante>.csv (UTF-8 con BOM y encabezado,
+    como el CSV de siempre). Cada lote se anexa sólo al fragmento "caliente"
+    de su participante; al cambiar de día, pasar de MAX_SHARD_BYTES o quedar
+    sin escrituras IDLE_CLOSE_SECONDS, el fragmento se cierra (un fragmento
+    nuevo del mismo participante y día se llama <participante>.2.csv, ...) y
+    un hilo aparte lo comprime a .csv.gz.
+
+    <raíz>/manifest.json es el índice: por fragmento, su estudio, día,
+    participante, estado (hot / closed / gz, o missing si su archivo
+    desapareció), filas, bytes y el primer y último lote que contiene. Sólo
+    se reemplaza (de forma atómica) cuando se abre, se cierra o se comprime
+    un fragmento; si falta o no se puede leer, se reconstruye a partir de
+    los fragmentos en disco. Cada lote confirma con
+    una línea JSON anexada a <raíz>/batches.log (un fsync, sin importar
+    cuántos lotes haya):
+
+        {"b": lote, "seq": diario, "t": hora, "s": [[id, bytes, filas], ...]}
+
+    Al cargar, las líneas posteriores al manifiesto se le aplican; las
+    demás sólo dan las marcas (lote -> byte) de los fragmentos calientes,
+    que read_since() usa para empezar a leer a mitad de un fragmento. Al
+    reemplazar el manifiesto, el registro se reduce a esas marcas. Lo
+    registrado es la referencia: bytes de más en un fragmento caliente (un
+    lote a medias) se recortan antes de la siguiente escritura. El número
+    de lote global es el offset de read_since(), que sólo abre los
+    fragmentos con lotes nuevos; select()/iter_rows() filtran por estudio,
+    día y participante sin abrir los demás.
+    """
+    MAX_SHARD_BYTES = 4 * 1024 * 1024
+    IDLE_CLOSE_SECONDS = 2 * 3600
+
+    def __init__(self, path: str, study: str = DEFAULT_STUDY):
+        self.path = path
+        self.study = _safe_name(study, DEFAULT_STUDY)
+        self._manifest_path = os.path.join(path, SHARD_MANIFEST)
+        self._log_path = os.path.join(path, SHARD_LOG)
+        self._lock = threading.Lock()  # manifiesto: escritor, compresor y lectores
+        os.makedirs(path, exist_ok=True)
+        self._log_size = 0     # bytes válidos de batches.log
+        self._changed = False  # se abrió o cerró un fragmento: hay que reemplazar el manifiesto
+        self._header = _encode_csv([CSV_HEADER])
+        self._m = self._load_state()
+        self._compress_queue: "queue.SimpleQueue[int | None]" = queue.SimpleQueue()
+        self._compressor: threading.Thread | None = None
+        self._maintained = False  # sólo quien escribe cierra y comprime (leer no modifica nada)
+
+    # ---- manifiesto ----
+    def _load_manifest(self) -> dict | None:
+        """Manifiesto guardado, o None si no existe o no se puede leer."""
+        try:
+            with open(self._manifest_path, encoding="utf-8") as f:
+                m = json.load(f)
+            if (m["version"] == 1 and _MANIFEST_KEYS <= m.keys()
+                    and all(_SHARD_KEYS <= sh.keys() for sh in m["shards"])):
+                return m
+            problem = "versión o campos inesperados"
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            problem = f"{type(e).__name__}: {e}"
+        bad = self._manifest_path + ".bad"
+        print(f"[ShardedBackend] {self._manifest_path} no es un manifiesto válido ({problem}); "
+              f"se reconstruye a partir de los fragmentos y el anterior queda en {bad}", file=sys.stderr)
+        try:
+            os.replace(self._manifest_path, bad)
+        except OSError:
+            pass
+        return None
+
+    def _rebuild_manifest(self) -> dict:
+        """Manifiesto a partir de los fragmentos en disco, con un lote propio para cada uno.
+
+        Los números de lote originales se pierden: los fragmentos se numeran
+        por día y fecha de modificación y quedan cerrados. El id nuevo hace
+        que índices y vistas se reconstruyan desde el inicio; journal_seq
+        vuelve a 0, así que un lote pendiente del diario se escribe otra vez
+        (mejor repetido que perdido).
+        """
+        found = []
+        for study in sorted(os.listdir(self.path)):
+            for day in sorted(os.listdir(self._abs(study))) if os.path.isdir(self._abs(study)) else ():
+                folder = os.path.join(study, day)
+                if not os.path.isdir(self._abs(folder)):
+                    continue
+                names = set(os.listdir(self._abs(folder)))
+                for name in sorted(names):
+                    if not name.endswith((".csv", ".csv.gz")) or name + ".gz" in names:
+                        continue  # si existen ambos, la compresión ya había terminado
+                    path = self._abs(os.path.join(folder, name))
+                    try:
+                        with (gzip.open(path, "rb") if name.endswith(".gz") else open(path, "rb")) as f:
+                            data = f.read()
+                        mtime = os.path.getmtime(path)
+                    except (OSError, EOFError) as e:
+                        print(f"[ShardedBackend] Se omite {path}: {type(e).__name__}: {e}", file=sys.stderr)
+                        continue
+                    data = data[:data.rfind(b"\n") + 1]  # sin una fila a medias
+                    pid = re.sub(r"(\.\d+)?\.csv(\.gz)?$", "", name)
+                    found.append((day, mtime, study, pid, os.path.join(folder, name), data))
+        shards = []
+        for n, (day, mtime, study, pid, rel, data) in enumerate(sorted(found, key=lambda s: s[:2]), start=1):
+            rows = len(_parse_csv(data[len(self._header):].decode("utf-8", errors="replace")))
+            shards.append({"id": n, "study": study, "day": day, "participant": pid, "file": rel,
+                           "state": "gz" if rel.endswith(".gz") else "closed", "rows": rows,
+                           "bytes": max(len(data), len(self._header)), "first": n, "last": n, "updated": mtime})
+        if shards:
+            print(f"[ShardedBackend] Manifiesto reconstruido con {len(shards)} fragmentos de {self.path}", file=sys.stderr)
+        return {"version": 1, "id": uuid.uuid4().hex, "batches": len(shards), "journal_seq": 0,
+                "next_shard": len(shards) + 1, "shards": shards}
+
+    def _load_state(self) -> dict:
+        """Manifiesto más los lotes de batches.log (las marcas sólo viven en memoria)."""
+        m = self._load_manifest()
+        if m is None:
+            # batches.log habla de fragmentos del manifiesto anterior: se reemplaza al escribir
+            m = self._rebuild_manifest()
+            for sh in m["shards"]:
+                sh["marks"] = []
+            self._log_size = 0
+            self._changed = True
+            return m
+        shards = {}
+        for sh in m["shards"]:
+            sh["marks"] = []  # manifiestos anteriores las guardaban aquí
+            shards[sh["id"]] = sh
+        self._log_size = 0
+        try:
+            with open(self._log_path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # línea a medio escribir: el lote no se confirmó
+                    try:
+                        entry = json.loads(line)
+                        batch, parts = int(entry["b"]), entry["s"]
+                    except (ValueError, KeyError, TypeError):
+                        break
+                    new = batch > m["batches"]
+                    for part in parts:
+                        sh = shards.get(part[0])
+                        if sh is None or sh["state"] != "hot" and not new:
+                            continue
+                        sh["marks"].append([batch, part[1]])
+                        if new:
+                            sh["bytes"], sh["rows"] = part[1], part[2]
+                            sh["first"] = sh["first"] or batch
+                            sh["last"] = batch
+                            sh["updated"] = entry.get("t", sh["updated"])
+                    if new:
+                        m["batches"] = batch
+                        if entry.get("seq") is not None:
+                            m["journal_seq"] = entry["seq"]
+                    self._log_size += len(line)
+        except FileNotFoundError:
+            pass
+        return m
+
+    def _save_manifest(self):
+        m = dict(self._m, shards=[{k: v for k, v in sh.items() if k != "marks"} for sh in self._m["shards"]])
+        tmp = self._manifest_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(m, f, ensure_ascii=False, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._manifest_path)
+
+    def _rewrite_log(self):
+        """Deja en batches.log sólo las marcas de los fragmentos calientes (tras guardar el manifiesto)."""
+        by_batch: Dict[int, list] = {}
+        for sh in self._m["shards"]:
+            if sh["state"] == "hot":
+                for batch, size in sh["marks"]:
+                    by_batch.setdefault(batch, []).append([sh["id"], size])
+        data = b"".join(json.dumps({"b": b, "s": parts}, separators=(",", ":")).encode("utf-8") + b"\n"
+                        for b, parts in sorted(by_batch.items()))
+        tmp = self._log_path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._log_path)
+        self._log_size = len(data)
+
+    def _append_log(self, entry: dict):
+        data = json.dumps(entry, separators=(",", ":")).encode("utf-8") + b"\n"
+        with open(self._log_path, "a+b") as f:
+            f.truncate(self._log_size)  # descarta una línea a medias de un intento anterior
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        self._log_size += len(data)
+
+    def _abs(self, rel: str) -> str:
+        return os.path.join(self.path, rel)
+
+    @staticmethod
+    def _remove_quietly(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    # ---- escritura ----
+    def _maintain(self):
+        """Al primer lote: retoma compresiones pendientes y cierra fragmentos viejos."""
+        self._maintained = True
+        for sh in self._m["shards"]:
+            if sh["state"] == "gz":
+                self._remove_quietly(self._abs(sh["file"][:-3]))  # sobrante de una compresión interrumpida
+            elif sh["state"] == "closed":
+                self._schedule_compress(sh)
+            elif sh["state"] == "hot" and self._exists(sh) and os.path.getsize(self._abs(sh["file"])) > sh["bytes"]:
+                with open(self._abs(sh["file"]), "r+b") as f:
+                    f.truncate(sh["bytes"])  # lote a medias de la ejecución anterior
+        self._close_stale(time.time())
+
+    def _exists(self, sh: dict) -> bool:
+        """¿Sigue en disco el archivo del fragmento caliente? Si no, queda como missing."""
+        if os.path.exists(self._abs(sh["file"])):
+            return True
+        print(f"[ShardedBackend] Falta {self._abs(sh['file'])}; se continúa en un fragmento nuevo", file=sys.stderr)
+        sh["state"] = "missing"
+        sh["marks"] = []
+        self._changed = True
+        return False
+
+    def _hot_shard(self, day: str, pid: str) -> dict:
+        hot = [sh for sh in self._m["shards"] if sh["state"] == "hot"
+               and sh["study"] == self.study and sh["day"] == day and sh["participant"] == pid]
+        hot = [sh for sh in hot if self._exists(sh)]
+        if hot and hot[-1]["bytes"] < self.MAX_SHARD_BYTES:
+            return hot[-1]
+        for sh in hot:
+            self._close_shard(sh)
+        part = 1 + sum(1 for sh in self._m["shards"]
+                       if sh["study"] == self.study and sh["day"] == day and sh["participant"] == pid)
+        name = _safe_name(pid) + (f".{part}" if part > 1 else "") + ".csv"
+        rel = os.path.join(self.study, day, name)
+        os.makedirs(os.path.dirname(self._abs(rel)), exist_ok=True)
+        with open(self._abs(rel), "wb") as f:
+            f.write(self._header)
+            f.flush()
+            os.fsync(f.fileno())
+        sh = {"id": self._m["next_shard"], "study": self.study, "day": day, "participant": pid,
+              "file": rel, "state": "hot", "rows": 0, "bytes": len(self._header),
+              "first": 0, "last": 0, "marks": [], "updated": time.time()}
+        self._m["next_shard"] += 1
+        self._m["shards"].append(sh)
+        self._changed = True
+        return sh
+
+    def write_batch(self, rows: Sequence[Sequence], seq: int | None = None):
+        groups: Dict[Tuple[str, str], List[Sequence]] = {}
+        for r in rows:
+            groups.setdefault((_shard_day(r[0]), str(r[1])), []).append(r)
+        now = time.time()
+        with self._lock:
+            try:
+                self._write_locked(groups, seq, now)
+            except BaseException:
+                # Lo confirmado es lo que está en disco: se descarta el estado a medias
+                self._changed = False
+                self._m = self._load_state()
+                raise
+
+    def _write_locked(self, groups: Dict[Tuple[str, str], List[Sequence]], seq: int | None, now: float):
+        if not self._maintained:
+            self._maintain()
+        batch = self._m["batches"] + 1
+        written = []
+        for (day, pid), group in groups.items():
+            sh = self._hot_shard(day, pid)
+            data = _encode_csv(group)
+            with open(self._abs(sh["file"]), "r+b") as f:
+                f.truncate(sh["bytes"])  # descarta un lote a medias de un intento anterior
+                f.seek(sh["bytes"])
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            written.append((sh, len(group), len(data)))
+        for sh, n, size in written:
+            sh["rows"] += n
+            sh["bytes"] += size
+            sh["first"] = sh["first"] or batch
+            sh["last"] = batch
+            sh["marks"].append([batch, sh["bytes"]])
+            sh["updated"] = now
+        self._m["batches"] = batch
+        if seq is not None:
+            self._m["journal_seq"] = seq
+        self._close_stale(now)
+        # El lote cuenta como escrito al guardarse el manifiesto o su línea en batches.log
+        if self._changed:
+            self._save_manifest()
+            self._changed = False
+            self._rewrite_log()
+        else:
+            self._append_log({"b": batch, "seq": seq, "t": now,
+                              "s": [[sh["id"], sh["bytes"], sh["rows"]] for sh, _, _ in written]})
+
+    def _close_stale(self, now: float):
+        today = date.today().isoformat()
+        for sh in self._m["shards"]:
+            if sh["state"] == "hot" and (sh["day"] < today or now - sh["updated"] > self.IDLE_CLOSE_SECONDS):
+                self._close_shard(sh)
+
+    def _close_shard(self, sh: dict):
+        sh["state"] = "closed"
+        sh["marks"] = []  # ya no recibe lotes: basta con first/last
+        self._changed = True
+        self._schedule_compress(sh)
+
+    # ---- compresión en segundo plano ----
+    def _schedule_compress(self, sh: dict):
+        if self._compressor is None:
+            self._compressor = threading.Thread(target=self._compress_loop, name="shard-gzip", daemon=True)
+            self._compressor.start()
+        self._compress_queue.put(sh["id"])
+
+    def _compress_loop(self):
+        while True:
+            shard_id = self._compress_queue.get()
+            if shard_id is None:
+                return
+            with self._lock:
+                sh = self._closed_shard(shard_id)
+                if sh is None:
+                    continue
+                rel, size = sh["file"], sh["bytes"]
+            src = self._abs(rel)
+            dst = src + ".gz"
+            try:
+                with open(src, "rb") as fin, gzip.open(dst + ".tmp", "wb") as fout:
+                    fout.write(fin.read(size))  # sólo lo que registra el manifiesto
+                with open(dst + ".tmp", "rb+") as f:
+                    os.fsync(f.fileno())
+                with self._lock:
+                    # Si el manifiesto se recargó mientras tanto, cuenta lo que dice ahora
+                    sh = self._closed_shard(shard_id)
+                    if sh is None or (sh["file"], sh["bytes"]) != (rel, size):
+                        self._remove_quietly(dst + ".tmp")
+                        continue
+                    os.replace(dst + ".tmp", dst)
+                    sh["file"] += ".gz"
+                    sh["state"] = "gz"
+                    self._save_manifest()
+            except OSError as e:
+                print(f"[ShardedBackend] No se pudo comprimir {src}: {e}", file=sys.stderr)
+                continue  # se reintenta en la próxima ejecución
+            self._remove_quietly(src)  # si está abierto (p. ej. en Excel) se borra al iniciar otra vez
+
+    def _closed_shard(self, shard_id: int) -> dict | None:
+        """Entrada actual (en self._m, con el lock tomado) de un fragmento cerrado."""
+        return next((s for s in self._m["shards"] if s["id"] == shard_id and s["state"] == "closed"), None)
+
+    # ---- diario ----
+    def position(self) -> int:
+        return 0
+
+    def has_batch(self, seq: int, start: int, rows: Sequence[Sequence]) -> bool:
+        with self._lock:
+            return seq <= self._m["journal_seq"]
+
+    def repair(self, start: int):
+        pass  # write_batch() recorta lo que el manifiesto no registra
+
+    # ---- lectura ----
+    def select(self, study: str | None = None, day: str | None = None,
+               participant: str | None = None) -> List[dict]:
+        """Entradas del manifiesto (copias) que cumplen los filtros, en orden de creación."""
+        with self._lock:
+            return [dict(sh) for sh in self._m["shards"]
+                    if (study is None or sh["study"] == study) and (day is None or sh["day"] == day)
+                    and (participant is None or sh["participant"] == participant)]
+
+    def _read_shard(self, sh: dict, start: int) -> List[List[str]]:
+        """Filas del fragmento entre el byte `start` y los bytes que registra el manifiesto."""
+        if sh["state"] == "missing":
+            return []
+        start = max(start, len(self._header))
+        path = self._abs(sh["file"])
+        try:
+            f = gzip.open(path, "rb") if path.endswith(".gz") else open(path, "rb")
+        except FileNotFoundError:
+            # se comprimió mientras tanto
+            f = gzip.open(path + ".gz", "rb")
+        with f:
+            f.seek(start)
+            data = f.read(sh["bytes"] - start)
+        return _parse_csv(data.decode("utf-8", errors="replace"))
+
+    def iter_rows(self, study: str | None = None, day: str | None = None,
+                  participant: str | None = None) -> Iterator[List[str]]:
+        for sh in self.select(study, day, participant):
+            yield from self._read_shard(sh, 0)
+
+    def read_since(self, offset: int) -> Tuple[List[List[str]], int]:
+        """Filas de los lotes posteriores a `offset` (número de lote) y el último lote.
+
+        Las filas de cada participante salen en orden; fragmentos distintos,
+        según el primer lote nuevo de cada uno.
+        """
+        with self._lock:
+            batches = self._m["batches"]
+            shards = [dict(sh, marks=list(sh["marks"])) for sh in self._m["shards"] if sh["last"] > offset]
+        if offset > batches:
+            raise ValueError("el manifiesto no llega al punto de control")
+        parts = []
+        for sh in shards:
+            if sh["state"] == "missing":
+                continue
+            if offset < sh["first"]:
+                parts.append((sh["first"], sh, 0))
+                continue
+            if not sh["marks"]:
+                raise ValueError("el punto de control cae dentro de un fragmento ya cerrado")
+            start = max((b for n, b in sh["marks"] if n <= offset), default=0)
+            parts.append((min(n for n, _ in sh["marks"] if n > offset), sh, start))
+        rows: List[List[str]] = []
+        for _, sh, start in sorted(parts, key=lambda p: p[0]):
+            rows.extend(self._read_shard(sh, start))
+        return rows, batches
+
+    def fingerprint(self, offset: int) -> str:
+        with self._lock:
+            return f"{self._m['id']}:{offset}" if offset <= self._m["batches"] else ""
+
+    def export_csv(self, path: str, study: str | None = None, day: str | None = None,
+                   participant: str | None = None) -> int:
+        n = 0
+        with open(path, "w", newline="", encoding="utf-8-sig") as f:
+            w = csv.writer(f)
+            w.writerow(CSV_HEADER)
+            for row in self.iter_rows(study, day, participant):
+                w.writerow(row)
+                n += 1
+        return n
+
+    def close(self):
+        """Espera a que terminen las compresiones pendientes."""
+        if self._compressor is not None:
+            self._compress_queue.put(None)
+            self._compressor.join()
+            self._compressor = None
+
+# =========================
+# DIARIO DE ESCRITURA ANTICIPADA
+# =========================
+class Journal:
+    """Diario de sólo anexado con un registro por página guardada.
+
+    Antes de escribir un lote en el backend se anexa (una escritura y un
+    fsync) un registro con número de secuencia, CRC32, la posición donde
+    empezará el lote y las filas:
+
+        B<TAB>seq<TAB>crc<TAB>inicio<TAB>filas-json
+
+    Al terminar se anexa `C<TAB>seq`. Al iniciar, recover() revisa los
+    registros sin confirmar: si el lote ya está completo en el backend se da
+    por guardado; si quedó a medias se recorta desde su inicio y se vuelve a
+    escribir. Un registro truncado o con CRC inválido nunca llegó al backend
+    y se ignora. Después el diario se compacta a una sola línea `S<TAB>seq`
+    para que los números de secuencia sigan creciendo entre ejecuciones.
+    También se compacta, si no queda ningún lote sin confirmar, cada
+    COMPACT_LINES registros y al cerrar: así no guarda una copia de todas
+    las filas ni crece de una sesión a otra.
+    """
+    COMPACT_LINES = 100
+
+    def __init__(self, path: str):
+        self.path = path
+        self.last_seq = 0
+        self.pending: List[Tuple[int, int, List[ResponseRecord]]] = []  # (seq, inicio, filas) sin confirmar
+        self._open: Set[int] = set()  # lotes de esta ejecución registrados y aún sin confirmar
+        self._lines = 0  # registros B/C desde la última compactación
+        self._f = None
+        self._read()
+
+    def _read(self):
+        if not os.path.isfile(self.path):
+            return
+        records: Dict[int, Tuple[int, List[ResponseRecord]]] = {}
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    self._lines += 1  # se descarta al compactar
+                    break  # registro a medio escribir
+                if not line.startswith(b"S"):
+                    self._lines += 1
+                parts = line.rstrip(b"\n").split(b"\t", 4)
+                try:
+                    if parts[0] == b"S":
+                        self.last_seq = max(self.last_seq, int(parts[1]))
+                    elif parts[0] == b"C":
+                        records.pop(int(parts[1]), None)
+                    elif parts[0] == b"B":
+                        seq, crc, start, payload = int(parts[1]), int(parts[2], 16), int(parts[3]), parts[4]
+                        if zlib.crc32(payload) != crc:
+                            continue
+                        records[seq] = (start, [ResponseRecord.from_row(r) for r in json.loads(payload)])
+                        self.last_seq = max(self.last_seq, seq)
+                except (IndexError, ValueError, TypeError):
+                    continue
+        self.pending = [(seq, start, rows) for seq, (start, rows) in sorted(records.items())]
+
+    def recover(self, backend, on_done: Callable[[int, List[ResponseRecord]], None] | None = None) -> int:
+        """Completa en el backend los lotes sin confirmar; devuelve cuántos se reescribieron.
+
+        on_done(seq, filas) se llama con cada lote ya completo en el backend,
+        antes de darlo por confirmado (p. ej. para anexarlo a la bandeja de salida).
+        """
+        replayed = 0
+        while self.pending:
+            seq, start, rows = self.pending[0]
+            if not backend.has_batch(seq, start, rows):
+                backend.repair(start)
+                backend.write_batch(rows, seq)
+                replayed += 1
+            if on_done is not None:
+                on_done(seq, rows)
+            self.pending.pop(0)
+        if not self._open:
+            self._compact()
+        return replayed
+
+    def compact(self):
+        """Reduce el diario a `S<TAB>seq` si no queda nada sin confirmar."""
+        if self.pending or self._open or not self._lines:
+            return
+        try:
+            self._compact()
+        except OSError as e:
+            print(f"[Journal] No se pudo compactar {self.path}: {e}", file=sys.stderr)
+
+    def _compact(self):
+        self._close_file()
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(f"S\t{self.last_seq}\n".encode())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self._lines = 0
+
+    def _append(self, data: bytes, sync: bool):
+        if self._f is None:
+            self._f = open(self.path, "ab")
+        self._f.write(data)
+        self._f.flush()
+        if sync:
+            os.fsync(self._f.fileno())
+
+    def begin(self, rows: Sequence[Sequence], start: int) -> int:
+        """Registra un lote antes de escribirlo; devuelve su número de secuencia."""
+        seq = self.last_seq + 1
+        payload = json.dumps(rows, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self._append(b"B\t%d\t%08x\t%d\t%s\n" % (seq, zlib.crc32(payload), start, payload), sync=True)
+        self.last_seq = seq
+        self._open.add(seq)
+        self._lines += 1
+        return seq
+
+    def commit(self, seq: int):
+        # Sin fsync: si se pierde, recover() comprobará el lote en el backend
+        self._append(b"C\t%d\n" % seq, sync=False)
+        self._open.discard(seq)
+        self._lines += 1
+        if self._lines >= self.COMPACT_LINES:
+            self.compact()
+
+    def close(self):
+        self.compact()
+        self._close_file()
+
+    def _close_file(self):
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+def journal_path(backend) -> str:
+    return backend.path + ".journal"
+
+# =========================
+# ÍNDICE DE SESIONES
+# =========================
+# instrumento de las filas resumen -> código del instrumento
+_SUMMARY_OF = {inst.summary_instrument: code for code, inst in INSTRUMENTS.items() if inst.summary_instrument}
+
+class SessionIndex:
+    """Páginas ya guardadas por (participant_id, block_id, instrument).
+
+    Se construye de forma incremental: un punto de control (<datos>.index.json)
+    guarda el índice y hasta dónde se leyó el archivo (byte en CSV, id en
+    SQLite), de modo que al iniciar sólo se leen las filas agregadas desde la
+    última ejecución. Una página cuenta como guardada cuando aparecen sus filas
+    resumen. refresh() puede llamarse desde el hilo escritor; las consultas
+    son búsquedas en diccionarios protegidas por un candado.
+    """
+    def __init__(self, backend):
+        self.backend = backend
+        self.checkpoint_path = backend.path + ".index.json"
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._reset()
+
+    def _reset(self):
+        self._offset = 0
+        self._pages: Dict[Tuple[str, int, str], List] = {}  # -> [páginas, último timestamp]
+        self._by_pid: Dict[str, Dict[int, Set[str]]] = {}
+
+    def _load_checkpoint(self):
+        try:
+            with open(self.checkpoint_path, encoding="utf-8") as f:
+                cp = json.load(f)
+            if self.backend.fingerprint(cp["offset"]) != cp["fingerprint"]:
+                return  # el archivo cambió: se reconstruye desde el inicio
+            for pid, block, inst, count, last_ts in cp["pages"]:
+                self._add(pid, block, inst, count, last_ts)
+            self._offset = cp["offset"]
+        except (OSError, ValueError, KeyError, TypeError, sqlite3.Error):
+            self._reset()
+
+    def _save_checkpoint(self):
+        cp = {"offset": self._offset, "fingerprint": self.backend.fingerprint(self._offset),
+              "pages": [[pid, block, inst, count, last_ts]
+                        for (pid, block, inst), (count, last_ts) in self._pages.items()]}
+        tmp = self.checkpoint_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(cp, f, ensure_ascii=False)
+        os.replace(tmp, self.checkpoint_path)
+
+    def _add(self, pid: str, block: int, inst: str, count: int, last_ts: str):
+        self._pages[(pid, block, inst)] = [count, last_ts]
+        self._by_pid.setdefault(pid, {}).setdefault(block, set()).add(inst)
+
+    def refresh(self) -> int:
+        """Lee lo agregado desde el último punto de control; devuelve cuántas filas."""
+        if not self._loaded:
+            self._loaded = True
+            with self._lock:
+                self._load_checkpoint()
+        try:
+            rows, offset = self.backend.read_since(self._offset)
+        except (ValueError, csv.Error):
+            # Punto de control inválido o archivo dañado: se reconstruye; si
+            # tampoco se puede leer desde el inicio, el índice queda vacío
+            with self._lock:
+                self._reset()
+            rows, offset = self.backend.read_since(0)
+        if not rows and offset == self._offset:
+            return 0
+        with self._lock:
+            for r in rows:
+                code = _SUMMARY_OF.get(r[4]) if len(r) >= 9 else None
+                if code is None:
+                    continue
+                try:
+                    block = int(r[2])
+                except ValueError:
+                    continue
+                entry = self._pages.get((r[1], block, code))
+                if entry is None:
+                    self._add(r[1], block, code, 1, r[0])
+                elif entry[1] != r[0]:
+                    entry[0] += 1
+                    entry[1] = r[0]
+            self._offset = offset
+            try:
+                self._save_checkpoint()
+            except OSError:
+                pass  # el punto de control es sólo una caché
+        return len(rows)
+
+    # ---- consultas ----
+    def blocks(self, pid: str) -> Dict[int, Set[str]]:
+        """{bloque: instrumentos guardados} de un participante."""
+        with self._lock:
+            return {b: set(s) for b, s in self._by_pid.get(pid, {}).items()}
+
+    def completed_blocks(self, pid: str) -> List[int]:
+        """Bloques inter-etapas terminados (con SAM-estrés guardado)."""
+        return sorted(b for b, s in self.blocks(pid).items() if "SAM_Stress" in s)
+
+    def initial_done(self, pid: str) -> bool:
+        return any("PANAS" in s for s in self.blocks(pid).values())
+
+    def suggest_block(self, pid: str) -> int:
+        done = self.completed_blocks(pid)
+        return done[-1] + 1 if done else 1
+
+# =========================
+# VISTA EN FORMATO ANCHO
+# =========================
+WIDE_KEY = ["participant_id", "block_id", "stage_label", "last_timestamp"]
+
+def wide_path(backend) -> str:
+    return backend.path + ".wide.csv"
+
+class WideView:
+    """Vista materializada: una fila por (participant_id, block_id) con todos los ítems y resúmenes.
+
+    Se mantiene como el índice de sesiones: cada refresh() lee sólo las filas
+    largas agregadas desde el último punto de control (<datos>.wide.json) y
+    actualiza las celdas afectadas; si una página se repite, gana la última.
+    El CSV ancho (<datos>.wide.csv, UTF-8 con BOM) conserva el orden en que aparecieron las
+    sesiones, así que en la práctica sólo cambian sus últimas filas: se
+    recorta desde la primera fila que cambió y se vuelve a escribir desde
+    ahí (una sesión nueva sólo se agrega al final). Si el archivo no coincide
+    con lo que se escribió, se reescribe completo de forma atómica. Si no se
+    puede (p. ej. abierto en Excel) se intenta de nuevo en el siguiente
+    refresh() sin perder nada.
+    """
+    def __init__(self, backend, path: str | None = None):
+        self.backend = backend
+        self.path = path or wide_path(backend)
+        self.checkpoint_path = backend.path + ".wide.json"
+        wide = [c for inst in INSTRUMENTS.values() for c in inst.wide_columns()]
+        self.columns = WIDE_KEY + [c[0] for c in wide]
+        self._header = b"\xef\xbb\xbf" + _encode_csv([self.columns])
+        # (instrument, item_code) -> [(posición de la columna, índice del campo en la fila larga)]
+        self._cells: Dict[Tuple[str, str], List[Tuple[int, int]]] = {}
+        for n, (_, inst, code, field) in enumerate(wide, start=len(WIDE_KEY)):
+            self._cells.setdefault((inst, code), []).append((n, 7 if field == "response" else 8))
+        self._loaded = False
+        self._reset()
+
+    def _reset(self):
+        self._offset = 0
+        self._rows: Dict[Tuple[str, str], List[str]] = {}
+        self._line: Dict[Tuple[str, str], int] = {}  # sesión -> número de fila (en orden de aparición)
+        self._starts: List[int] = []  # byte donde empieza cada fila ya escrita en el CSV ancho
+        self._size = 0                # bytes del CSV ancho según lo escrito
+        self._dirty_from: int | None = None  # primera fila que difiere del archivo
+
+    def _load(self):
+        try:
+            with open(self.checkpoint_path, encoding="utf-8") as f:
+                cp = json.load(f)
+            if cp["columns"] != self.columns or self.backend.fingerprint(cp["offset"]) != cp["fingerprint"]:
+                return  # cambió el registro o el archivo: se reconstruye desde el inicio
+            if os.path.getsize(self.path) != cp["size"]:
+                return  # el CSV ancho no es el que registra el punto de control
+            with open(self.path, newline="", encoding="utf-8-sig") as f:
+                rows = csv.reader(f)
+                if next(rows, None) != self.columns:
+                    return
+                pos = len(self._header)
+                for r in rows:
+                    key = (r[0], r[1])
+                    self._line[key] = len(self._starts)
+                    self._rows[key] = r
+                    self._starts.append(pos)
+                    pos += len(_encode_csv([r]))
+            if pos != cp["size"]:
+                raise ValueError("el CSV ancho no coincide con sus filas")
+            self._size = pos
+            self._offset = cp["offset"]
+        except (OSError, ValueError, KeyError, TypeError, sqlite3.Error):
+            self._reset()
+
+    def _save(self):
+        first = min(self._dirty_from, len(self._starts))
+        if first and (not os.path.isfile(self.path) or os.path.getsize(self.path) != self._size):
+            first = 0  # el archivo cambió por fuera: se reescribe completo
+        cut = self._starts[first] if first < len(self._starts) else self._size
+        starts = self._starts[:first]
+        chunks = [self._header] if first == 0 else []
+        pos = len(self._header) if first == 0 else cut
+        for r in list(self._rows.values())[first:]:
+            data = _encode_csv([r])
+            starts.append(pos)
+            chunks.append(data)
+            pos += len(data)
+        if first == 0:
+            tmp = self.path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.writelines(chunks)
+            os.replace(tmp, self.path)
+        else:
+            with open(self.path, "r+b") as f:
+                f.truncate(cut)
+                f.seek(cut)
+                f.writelines(chunks)
+        self._starts, self._size = starts, pos
+        self._dirty_from = None
+        cp = {"offset": self._offset, "fingerprint": self.backend.fingerprint(self._offset),
+              "columns": self.columns, "size": self._size}
+        tmp = self.checkpoint_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(cp, f, ensure_ascii=False)
+        os.replace(tmp, self.checkpoint_path)
+
+    def refresh(self) -> int:
+        """Incorpora las filas nuevas y actualiza el CSV ancho si cambió; devuelve cuántas filas."""
+        if not self._loaded:
+            self._loaded = True
+            self._load()
+        try:
+            rows, offset = self.backend.read_since(self._offset)
+        except ValueError:
+            self._reset()
+            rows, offset = self.backend.read_since(0)
+        width = len(self.columns)
+        for r in rows:
+            cells = self._cells.get((r[4], r[5])) if len(r) >= 9 else None
+            if cells is None:
+                continue
+            key = (str(r[1]), str(r[2]))
+            row = self._rows.get(key)
+            if row is None:
+                row = self._rows[key] = [key[0], key[1], "", ""] + [""] * (width - len(WIDE_KEY))
+                self._line[key] = len(self._line)
+            row[2], row[3] = str(r[3]), str(r[0])
+            for n, field in cells:
+                row[n] = str(r[field])
+            line = self._line[key]
+            if self._dirty_from is None or line < self._dirty_from:
+                self._dirty_from = line
+        self._offset = offset
+        if self._dirty_from is not None:
+            self._save()
+        return len(rows)
+
+# =========================
+# SELECCIÓN
+# =========================
+BACKENDS = {"csv": CsvBackend, "sqlite": SqliteBackend, "sharded": ShardedBackend}
+
+def backend_path(kind: str, csv_path: str) -> str:
+    """Ruta de datos del backend a partir del nombre del CSV configurado."""
+    if kind == "csv":
+        return csv_path
+    return os.path.splitext(csv_path)[0] + (".sqlite" if kind == "sqlite" else "_shards")
+
+def open_backend(kind: str, csv_path: str, study: str = DEFAULT_STUDY):
+    path = backend_path(kind, csv_path)
+    return ShardedBackend(path, study) if kind == "sharded" else BACKENDS[kind](path)
+
+def open_path(path: str):
+    """Backend adecuado para un archivo o carpeta existente."""
+    if os.path.isdir(path):
+        return ShardedBackend(path)
+    return SqliteBackend(path) if path.endswith((".sqlite", ".db")) else CsvBackend(path)
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Utilidades del almacenamiento de respuestas.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    exp = sub.add_parser("export", help="exportar una base SQLite o una carpeta de fragmentos al CSV heredado")
+    exp.add_argument("database")
+    exp.add_argument("-o", "--output", required=True)
+    lst = sub.add_parser("shards", help="listar los fragmentos de una carpeta según su manifiesto")
+    lst.add_argument("database")
+    for p in (exp, lst):
+        p.add_argument("--study", help="sólo este estudio (carpeta de fragmentos)")
+        p.add_argument("--day", metavar="AAAA-MM-DD", help="sólo este día (carpeta de fragmentos)")
+        p.add_argument("--participant", help="sólo este participante (carpeta de fragmentos)")
+    args = ap.parse_args(argv)
+    filters = {k: getattr(args, k) for k in ("study", "day", "participant")}
+
+    if args.cmd == "export":
+        db = ShardedBackend(args.database) if os.path.isdir(args.database) else SqliteBackend(args.database)
+        if isinstance(db, SqliteBackend) and any(filters.values()):
+            ap.error("--study/--day/--participant sólo se aplican a una carpeta de fragmentos")
+        try:
+            n = db.export_csv(args.output, **{k: v for k, v in filters.items() if v is not None})
+        finally:
+            db.close()
+        print(f"{n} filas exportadas a {args.output}", file=sys.stderr)
+    elif args.cmd == "shards":
+        if not os.path.isfile(os.path.join(args.database, SHARD_MANIFEST)):
+            ap.error(f"{args.database} no es una carpeta de fragmentos (falta {SHARD_MANIFEST})")
+        db = ShardedBackend(args.database)
+        try:
+            for sh in db.select(**filters):
+                print(f"{sh['file']}\t{sh['state']}\t{sh['rows']} filas\t{sh['bytes']} bytes")
+        finally:
+            db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,283 @@
+"""Envío al concentrador con bandeja de salida persistente (primero local, después la red).
+
+Cada lote confirmado por el escritor se anexa a la bandeja de salida
+(<archivo de respuestas>.outbox) y un trabajador asyncio, en su propio hilo,
+la vacía hacia el concentrador (aggregator.py). Así:
+
+- la interfaz nunca espera a la red: el escritor sólo anexa una línea al disco;
+- una estación sin red durante horas o días conserva la bandeja entre
+  ejecuciones y, al reconectarse, la vacía en pocas peticiones grandes
+  (varios lotes por POST) sobre una sola conexión HTTP/1.1 reutilizada;
+- los fallos se reintentan con espera exponencial (con variación aleatoria)
+  y el concentrador descarta lo repetido por (estación, seq).
+
+Formato de la bandeja (una línea por registro, como el diario):
+    B<TAB>seq<TAB>filas-json    lote por enviar
+    A<TAB>seq                   lote aceptado por el concentrador
+Cuando ya no queda nada por enviar el archivo se vacía. No depende de Qt.
+"""
+import asyncio
+import json
+import os
+import random
+import sys
+import threading
+from typing import Dict, List, Sequence, Tuple
+from urllib.parse import urlsplit
+
+
+def outbox_path(data_path: str) -> str:
+    return data_path + ".outbox"
+
+
+# =========================
+# BANDEJA DE SALIDA
+# =========================
+class Outbox:
+    """Lotes pendientes de envío, persistidos en un archivo de sólo anexado."""
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()  # add() desde el escritor; take()/ack() desde el trabajador
+        self._pending: Dict[int, list] = {}  # seq -> filas, en orden de llegada
+        self._f = None
+        self._read()
+
+    def _read(self):
+        if not os.path.isfile(self.path):
+            return
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # registro a medio escribir
+                parts = line.rstrip(b"\n").split(b"\t", 2)
+                try:
+                    if parts[0] == b"B":
+                        self._pending[int(parts[1])] = json.loads(parts[2])
+                    elif parts[0] == b"A":
+                        self._pending.pop(int(parts[1]), None)
+                except (IndexError, ValueError):
+                    continue
+        self._compact()
+
+    def _compact(self):
+        """Reescribe el archivo sólo con lo pendiente."""
+        self._close_file()
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            for seq, rows in self._pending.items():
+                f.write(self._record(seq, rows))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    @staticmethod
+    def _record(seq: int, rows: list) -> bytes:
+        payload = json.dumps(rows, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return b"B\t%d\t%s\n" % (seq, payload)
+
+    def _append(self, data: bytes, sync: bool):
+        if self._f is None:
+            self._f = open(self.path, "ab")
+        self._f.write(data)
+        self._f.flush()
+        if sync:
+            os.fsync(self._f.fileno())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def add(self, seq: int, rows: Sequence[Sequence]):
+        rows = [list(r) for r in rows]
+        with self._lock:
+            if seq in self._pending:
+                return
+            self._append(self._record(seq, rows), sync=True)
+            self._pending[seq] = rows
+
+    def take(self, max_batches: int, max_rows: int) -> List[Tuple[int, list]]:
+        """Los lotes más antiguos, hasta max_batches o max_rows (al menos uno)."""
+        out: List[Tuple[int, list]] = []
+        n_rows = 0
+        with self._lock:
+            for seq, rows in self._pending.items():
+                if out and (len(out) >= max_batches or n_rows + len(rows) > max_rows):
+                    break
+                out.append((seq, rows))
+                n_rows += len(rows)
+        return out
+
+    def ack(self, seqs: Sequence[int]):
+        with self._lock:
+            for seq in seqs:
+                if self._pending.pop(seq, None) is not None:
+                    self._append(b"A\t%d\n" % seq, sync=False)  # si se pierde, se reenvía y se descarta
+            if not self._pending:
+                self._compact()
+
+    def _close_file(self):
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+    def close(self):
+        with self._lock:
+            self._close_file()
+
+
+# =========================
+# TRABAJADOR ASYNCIO
+# =========================
+class _Rejected(Exception):
+    """El concentrador rechazó la petición (4xx); reenviarla no ayudaría."""
+
+
+class SyncWorker:
+    """Vacía la bandeja de salida hacia el concentrador desde un ciclo asyncio propio.
+
+    push() sólo escribe en la bandeja y despierta al trabajador, de modo que
+    puede llamarse desde el hilo escritor sin esperar a la red.
+    """
+    MAX_BATCHES = 200        # lotes por petición al vaciar un atraso
+    MAX_ROWS = 10000
+    RETRY_SECONDS = 1.0
+    MAX_RETRY_SECONDS = 60.0
+    TIMEOUT = 15.0
+    CLOSE_SECONDS = 5.0      # lo que se espera al cerrar antes de dejar la bandeja para la próxima vez
+
+    def __init__(self, url: str, station: str, outbox: Outbox):
+        parts = urlsplit(url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.ssl = parts.scheme == "https"
+        self.port = parts.port or (443 if self.ssl else 80)
+        self.path = parts.path.rstrip("/") + "/batches"
+        self.station = station
+        self.outbox = outbox
+        self.sent = 0
+        self._reader = self._writer = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._ready = threading.Event()
+        self._closing = False
+        self._thread = threading.Thread(target=lambda: asyncio.run(self._main()), name="SyncWorker", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    # ---- otros hilos ----
+    def push(self, seq: int, rows: Sequence[Sequence]):
+        self.outbox.add(seq, rows)
+        self._loop.call_soon_threadsafe(self._wake.set)
+
+    def close(self):
+        if self._closing:
+            return
+        self._closing = True
+        self._loop.call_soon_threadsafe(self._stop_now)
+        self._thread.join()
+        self.outbox.close()
+
+    # ---- ciclo asyncio ----
+    def _stop_now(self):
+        self._stop.set()
+        self._wake.set()
+
+    async def _main(self):
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._ready.set()
+        delay = self.RETRY_SECONDS
+        deadline = None
+        try:
+            while True:
+                if self._closing and deadline is None:
+                    deadline = self._loop.time() + self.CLOSE_SECONDS
+                batches = self.outbox.take(self.MAX_BATCHES, self.MAX_ROWS)
+                if not batches:
+                    if self._closing:
+                        return
+                    self._wake.clear()
+                    if len(self.outbox) == 0:
+                        await self._wake.wait()
+                    continue
+                try:
+                    await asyncio.wait_for(self._send(batches), self.TIMEOUT)
+                except _Rejected as e:
+                    print(f"[SyncWorker] {len(batches)} lote(s) rechazados ({e}); se descartan de la bandeja.",
+                          file=sys.stderr)
+                    self.outbox.ack([seq for seq, _ in batches])
+                except (OSError, EOFError, ValueError, asyncio.TimeoutError) as e:
+                    await self._disconnect()
+                    if deadline is not None and self._loop.time() >= deadline:
+                        print(f"[SyncWorker] {len(self.outbox)} lote(s) quedan en {self.outbox.path} ({e}).",
+                              file=sys.stderr)
+                        return
+                    await self._sleep(0.2 if self._closing else delay * random.uniform(0.5, 1.0))
+                    delay = min(delay * 2, self.MAX_RETRY_SECONDS)
+                    continue
+                delay = self.RETRY_SECONDS
+        finally:
+            await self._disconnect()
+
+    async def _sleep(self, seconds: float):
+        """Espera de reintento; la interrumpe un cierre, no un push()."""
+        try:
+            await asyncio.wait_for(self._stop.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _send(self, batches: List[Tuple[int, list]]):
+        body = json.dumps({"station": self.station, "batches": [{"seq": s, "rows": r} for s, r in batches]},
+                          ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        code, data = await self._post(body)
+        if code >= 500 or code in (408, 429):
+            raise OSError(f"HTTP {code}")
+        if code >= 400:
+            raise _Rejected(f"HTTP {code}: {data[:200]!r}")
+        results = json.loads(data)["results"]
+        for r in results:
+            if r.get("status") == "conflict":
+                print(f"[SyncWorker] El concentrador ya tiene otro lote {r.get('seq')} de {self.station}.",
+                      file=sys.stderr)
+        self.outbox.ack([seq for seq, _ in batches])
+        self.sent += len(batches)
+
+    async def _post(self, body: bytes) -> Tuple[int, bytes]:
+        head = (f"POST {self.path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\nContent-Length: {len(body)}\r\n\r\n").encode("ascii")
+        for attempt in range(2):
+            reused = self._writer is not None
+            if not reused:
+                self._reader, self._writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl or None)
+            try:
+                self._writer.write(head + body)
+                await self._writer.drain()
+                status = await self._reader.readline()
+                if not status:
+                    raise ConnectionResetError("conexión cerrada por el concentrador")
+                break
+            except ConnectionError:
+                await self._disconnect()
+                if not reused or attempt:
+                    raise  # una conexión reutilizada pudo caducar: se reintenta una vez con otra nueva
+        code = int(status.split()[1])
+        headers = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            k, _, v = line.decode("latin-1").partition(":")
+            headers[k.strip().lower()] = v.strip()
+        data = await self._reader.readexactly(int(headers.get("content-length", 0)))
+        if headers.get("connection", "").lower() == "close":
+            await self._disconnect()
+        return code, data
+
+    async def _disconnect(self):
+        if self._writer is None:
+            return
+        w, self._reader, self._writer = self._writer, None, None
+        w.close()
+        try:
+            await w.wait_closed()
+        except (OSError, ConnectionError):
+            pass
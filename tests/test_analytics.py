@@ -0,0 +1,57 @@
+import math
+import statistics
+
+from analytics import RunningStat, RunningStats
+from instruments import INSTRUMENTS
+from storage import CsvBackend
+
+
+def sam_page(pid, v, a, d):
+    inst = INSTRUMENTS["SAM_Manikin"]
+    return inst.page_records([v - 1, a - 1, d - 1], "2026-01-01T10:00:00", pid, 1, "Base")
+
+
+def test_running_stat_matches_statistics():
+    values = [3.0, 7.5, 1.0, 9.0, 4.25, 4.25]
+    s = RunningStat()
+    for x in values:
+        s.add(x)
+    assert s.n == len(values)
+    assert math.isclose(s.mean, statistics.mean(values))
+    assert math.isclose(s.variance, statistics.variance(values))
+    assert (s.min, s.max, s.baseline, s.last) == (1.0, 9.0, 3.0, 4.25)
+    assert s.change == 1.25
+    assert RunningStat.from_list(s.to_list()).to_list() == s.to_list()
+
+
+def test_refresh_is_incremental_and_checkpointed(tmp_path):
+    backend = CsvBackend(str(tmp_path / "r.csv"))
+    for v in (5, 7, 3):
+        backend.write_batch(sam_page("P01", v, 5, 5))
+    backend.write_batch(sam_page("P02", 9, 1, 1))
+    stats = RunningStats(backend)
+    assert stats.refresh() > 0
+    valence = dict((t.key, s) for t, s in stats.snapshot("P01"))["valence"]
+    assert (valence.n, valence.mean, valence.baseline, valence.last) == (3, 5.0, 5.0, 3.0)
+    assert stats.refresh() == 0
+
+    backend.write_batch(sam_page("P01", 9, 5, 5))
+    reopened = RunningStats(backend)  # retoma desde <datos>.stats.json
+    assert reopened.refresh() == len(sam_page("P01", 9, 5, 5))
+    valence = dict((t.key, s) for t, s in reopened.snapshot("P01"))["valence"]
+    assert (valence.n, valence.mean, valence.last) == (4, 6.0, 9.0)
+    assert [t.key for t, _ in reopened.snapshot("P02")] == ["valence", "arousal", "dominance"]
+    backend.close()
+
+
+def test_damaged_checkpoint_is_rebuilt(tmp_path):
+    backend = CsvBackend(str(tmp_path / "r.csv"))
+    backend.write_batch(sam_page("P01", 6, 5, 5))
+    stats = RunningStats(backend)
+    stats.refresh()
+    with open(stats.path, "w", encoding="utf-8") as f:
+        f.write('{"offset": 0, "fingerprint": "", "stats": []}')
+    reopened = RunningStats(backend)
+    reopened.refresh()
+    assert [s.n for _, s in reopened.snapshot("P01")] == [1, 1, 1]
+    backend.close()
@@ -0,0 +1,79 @@
+import random
+
+import pytest
+
+from instruments import (INSTRUMENTS, PSS_REVERSE, SAM_STRESS_SUBSCALES, interpret_bai, interpret_pss,
+                         panas_summary, PANAS_NEG_IDX, PANAS_POS_IDX, sam_quadrant_and_emotion,
+                         sam_stress_summary)
+
+
+def random_answers(inst, rnd):
+    return [rnd.randrange(len(inst.options)) for _ in inst.items]
+
+
+def test_bai_total_and_band():
+    bai = INSTRUMENTS["BAI"]
+    raw = bai.raw_scores([1] * len(bai.items))
+    values = bai.evaluate(raw)
+    assert values["total"] == 21
+    assert values["total_band"] == interpret_bai(21) == "Moderate anxiety"
+
+
+def test_pss_reverse_items():
+    pss = INSTRUMENTS["PSS"]
+    raw = pss.raw_scores([4] * len(pss.items))  # "Muy a menudo" = 4 en todos
+    scores = pss.item_scores(raw)
+    for k, s in zip(pss.item_keys, scores):
+        assert s == (0 if k in PSS_REVERSE else 4)
+    assert pss.evaluate(raw)["sum"] == 4 * (len(pss.items) - len(PSS_REVERSE))
+
+
+def baseline(code, raw):
+    """Puntuación ítem por ítem con las funciones de interpretación originales."""
+    if code == "BAI":
+        total = sum(raw)
+        return {"total": total, "total_band": interpret_bai(total)}
+    if code == "PSS":
+        total = sum(4 - r if k in PSS_REVERSE else r for k, r in enumerate(raw, start=1))
+        return {"sum": total, "sum_band": interpret_pss(total)}
+    if code == "PANAS":
+        pa = sum(r for k, r in enumerate(raw, start=1) if k in PANAS_POS_IDX)
+        na = sum(r for k, r in enumerate(raw, start=1) if k in PANAS_NEG_IDX)
+        return panas_summary(pa, na)
+    if code == "SAM_Manikin":
+        quadrant, emotion = sam_quadrant_and_emotion(raw[0], raw[1])
+        return {"V": raw[0], "A": raw[1], "D": raw[2], "quadrant": quadrant, "emotion": emotion}
+    if code == "SAM_Stress":
+        inst = INSTRUMENTS[code]
+        out = {}
+        for key, (s, band) in sam_stress_summary(dict(zip(inst.item_keys, raw))).items():
+            sub = next(sub for sub in SAM_STRESS_SUBSCALES if sub.key == key)
+            out.update({key: s, key + "_band": band, key + "_norm": s / sub.max_score})
+        return out
+    raise KeyError(code)
+
+
+@pytest.mark.parametrize("code", ["BAI", "PSS", "PANAS", "SAM_Manikin", "SAM_Stress"])
+def test_evaluate_many_matches_baseline(code):
+    inst = INSTRUMENTS[code]
+    rnd = random.Random(code)
+    raws = [inst.raw_scores(random_answers(inst, rnd)) for _ in range(200)]
+    for raw, values in zip(raws, inst.evaluate_many(raws)):
+        expected = baseline(code, list(raw))
+        assert {k: values[k] for k in expected} == expected
+        assert values == inst.evaluate(raw)
+
+
+def test_page_records_items_then_summary():
+    inst = INSTRUMENTS["SAM_Manikin"]
+    records = inst.page_records([6, 2, 0], "2026-01-01T10:00:00", "P01", 3, "Ruta 1")
+    assert [r.item_code for r in records[:3]] == list(inst.item_codes)
+    assert [r.score for r in records[:3]] == [7, 3, 1]
+    assert [(r.instrument, r.item_code, r.response) for r in records[3:]] == [
+        ("SAM_Manikin_SUMMARY", "quadrant", "Q4"), ("SAM_Manikin_SUMMARY", "interpretation", "Calm")]
+    assert all(r[:4] == ("2026-01-01T10:00:00", "P01", 3, "Ruta 1") for r in records)
+
+
+def test_wide_columns_are_unique():
+    names = [c[0] for inst in INSTRUMENTS.values() for c in inst.wide_columns()]
+    assert len(names) == len(set(names))
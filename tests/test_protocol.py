@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+from protocol import ProtocolError, load_protocol, parse_protocol
+
+
+def flows(*steps):
+    return {"flows": [{"name": "block", "steps": list(steps)}]}
+
+
+def test_repo_protocol_loads():
+    p = load_protocol("protocol.json")
+    assert list(p.flows) == ["initial", "block"]
+    assert p.pages() == ["BAI", "PSS", "PANAS", "SAM_Manikin", "SAM_Stress"]
+
+
+def test_repeat_and_page_navigation():
+    p = parse_protocol(flows({"transition": "Bloque {block}"},
+                             {"repeat": 2, "steps": [{"page": "SAM_Manikin"}, {"transition": "Pausa"}]}))
+    flow = p.flows["block"]
+    assert [s.page or s.text for s in flow.steps] == ["Bloque {block}", "SAM_Manikin", "Pausa", "SAM_Manikin", "Pausa"]
+    assert flow.next_page(0) == 1
+    assert flow.next_page(1) == 3
+    assert flow.next_page(3) is None
+    assert flow.prev_page(3) == 1
+    assert p.blocks == 20
+
+
+@pytest.mark.parametrize("data", [
+    [],
+    {"flows": []},
+    {"blocks": 0, "flows": [{"name": "a", "steps": [{"page": "BAI"}]}]},
+    flows(),
+    flows({"page": "NO_EXISTE"}),
+    flows({"repeat": 0, "steps": [{"page": "BAI"}]}),
+    flows({"otro": 1}),
+    {"flows": [{"name": "a", "steps": [{"page": "BAI"}]}, {"name": "a", "steps": [{"page": "PSS"}]}]},
+])
+def test_invalid_structure(data):
+    with pytest.raises(ProtocolError):
+        parse_protocol(data)
+
+
+@pytest.mark.parametrize("text", ["Bloque {bloque}", "Bloque {block", "Bloque {0}", "Bloque {block:d}x{stage:d}"])
+def test_invalid_transition_text(text):
+    with pytest.raises(ProtocolError):
+        parse_protocol(flows({"transition": text}))
+
+
+def test_literal_braces_allowed():
+    p = parse_protocol(flows({"transition": "{{llaves}} {participant} {stage}"}))
+    assert p.flows["block"].steps[0].text.format(block=1, participant="P01", stage="Base") == "{llaves} P01 Base"
+
+
+def test_load_errors(tmp_path):
+    with pytest.raises(ProtocolError):
+        load_protocol(str(tmp_path / "falta.json"))
+    bad = tmp_path / "bad.json"
+    bad.write_text("{", encoding="utf-8")
+    with pytest.raises(ProtocolError):
+        load_protocol(str(bad))
+    good = tmp_path / "good.json"
+    good.write_text(json.dumps(flows({"page": "BAI"})), encoding="utf-8")
+    assert load_protocol(str(good)).pages() == ["BAI"]
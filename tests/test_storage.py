@@ -0,0 +1,133 @@
+import os
+from datetime import date
+
+import pytest
+
+from instruments import INSTRUMENTS
+from storage import CsvBackend, Journal, ShardedBackend, SqliteBackend
+
+
+def page(pid="P01", block=1, day="2026-01-01", answer=1):
+    inst = INSTRUMENTS["SAM_Manikin"]
+    return inst.page_records([answer] * len(inst.items), f"{day}T10:00:00", pid, block, "Base")
+
+
+def as_text(rows):
+    return [["" if v is None else str(v) for v in r] for r in rows]
+
+
+@pytest.fixture(params=["csv", "sqlite", "sharded"])
+def backend(request, tmp_path):
+    if request.param == "csv":
+        b = CsvBackend(str(tmp_path / "r.csv"))
+    elif request.param == "sqlite":
+        b = SqliteBackend(str(tmp_path / "r.sqlite"))
+    else:
+        b = ShardedBackend(str(tmp_path / "r_shards"))
+    yield b
+    b.close()
+
+
+def test_read_since_returns_only_new_rows(backend):
+    first, second = page("P01"), page("P02", answer=3)
+    backend.write_batch(first, 1)
+    rows, offset = backend.read_since(0)
+    assert as_text(rows) == as_text(first)
+    backend.write_batch(second, 2)
+    rows, offset2 = backend.read_since(offset)
+    assert as_text(rows) == as_text(second)
+    assert backend.read_since(offset2) == ([], offset2)
+    assert backend.fingerprint(offset) == backend.fingerprint(offset)
+
+
+def test_journal_replays_half_written_batch(tmp_path):
+    b = CsvBackend(str(tmp_path / "r.csv"))
+    j = Journal(str(tmp_path / "r.csv.journal"))
+    b.write_batch(page("P01"))
+    rows = page("P02")
+    seq = j.begin(rows, b.position())
+    with open(b.path, "ab") as f:
+        f.write(b"2026-01-01T10:00:00,P02,1,Ba")  # el proceso murió a mitad del lote
+    j._close_file()
+
+    done = []
+    j = Journal(j.path)
+    assert [s for s, _, _ in j.pending] == [seq]
+    assert j.recover(b, lambda s, r: done.append(s)) == 1
+    assert done == [seq]
+    assert list(b.iter_rows()) == as_text(page("P01") + rows)
+    j.close()
+    j = Journal(j.path)
+    assert j.pending == [] and j.last_seq == seq
+
+
+def test_journal_skips_batch_already_written(tmp_path):
+    b = CsvBackend(str(tmp_path / "r.csv"))
+    j = Journal(str(tmp_path / "r.csv.journal"))
+    rows = page()
+    seq = j.begin(rows, b.position())
+    b.write_batch(rows, seq)  # escrito, pero el commit no llegó al diario
+    j._close_file()
+    j = Journal(j.path)
+    assert j.recover(b) == 0
+    assert list(b.iter_rows()) == as_text(rows)
+    assert j.begin(page(), b.position()) == seq + 1
+
+
+def test_journal_ignores_torn_or_corrupt_records(tmp_path):
+    path = tmp_path / "r.journal"
+    j = Journal(str(path))
+    j.commit(j.begin(page(), 0))
+    j._close_file()
+    with open(path, "ab") as f:
+        f.write(b"B\t2\t00000000\t0\t[]\n")   # CRC inválido
+        f.write(b"B\t3\t1234")                # registro a medias
+    j = Journal(str(path))
+    assert j.pending == [] and j.last_seq == 1
+
+
+def test_sharded_state_survives_reopen(tmp_path):
+    root = str(tmp_path / "shards")
+    b = ShardedBackend(root)
+    for n in range(1, 6):
+        b.write_batch(page(f"P0{n % 2}"), n)
+    b.close()
+    b2 = ShardedBackend(root)
+    assert b2.has_batch(5, 0, []) and not b2.has_batch(6, 0, [])
+    rows, offset = b2.read_since(3)
+    assert offset == 5
+    assert sorted(rows) == sorted(as_text(page("P00") + page("P01")))
+    assert len(list(b2.iter_rows(participant="P01"))) == 3 * len(page())
+    b2.close()
+
+
+def test_sharded_rebuilds_damaged_manifest(tmp_path):
+    root = tmp_path / "shards"
+    b = ShardedBackend(str(root))
+    b.write_batch(page("P01", day="2026-01-01"), 1)
+    b.write_batch(page("P02", day="2026-01-02"), 2)
+    b.close()
+    want = sorted(b.iter_rows())
+    (root / "manifest.json").write_text('{"version": 1, "sha', encoding="utf-8")
+
+    b2 = ShardedBackend(str(root))
+    assert (root / "manifest.json.bad").exists()
+    assert sorted(b2.iter_rows()) == want
+    rows, offset = b2.read_since(0)
+    assert sorted(rows) == want and offset == 2
+    b2.write_batch(page("P03", day="2026-01-02"), 3)
+    b2.close()
+    assert len(list(ShardedBackend(str(root)).iter_rows())) == 3 * len(page())
+
+
+def test_sharded_continues_when_hot_shard_is_missing(tmp_path):
+    today = date.today().isoformat()  # un día anterior se cerraría al escribir
+    root = str(tmp_path / "shards")
+    b = ShardedBackend(root)
+    b.write_batch(page("P01", day=today), 1)
+    hot = b.select(participant="P01")[0]
+    os.remove(os.path.join(root, hot["file"]))
+    b.write_batch(page("P01", day=today, answer=2), 2)
+    assert [sh["state"] for sh in b.select(participant="P01")] == ["missing", "hot"]
+    assert list(b.iter_rows()) == as_text(page("P01", day=today, answer=2))
+    b.close()
@@ -0,0 +1,56 @@
+from aggregator import AggregateStore
+from instruments import INSTRUMENTS
+from sync import Outbox
+
+
+def rows(pid="P01", answer=1):
+    inst = INSTRUMENTS["BAI"]
+    return [list(r) for r in inst.page_records([answer] * len(inst.items), "2026-01-01T10:00:00", pid, 1, "Base")]
+
+
+def test_outbox_survives_restart_and_ignores_repeats(tmp_path):
+    path = str(tmp_path / "r.csv.outbox")
+    box = Outbox(path)
+    box.add(1, rows("P01"))
+    box.add(2, rows("P02"))
+    box.add(1, rows("P01"))  # p. ej. reenviado al recuperar el diario
+    assert len(box) == 2
+    box.ack([1])
+    box.close()
+
+    box = Outbox(path)
+    assert [seq for seq, _ in box.take(10, 10_000)] == [2]
+    box.ack([2, 2])
+    assert len(box) == 0
+    box.close()
+    assert Outbox(path).take(10, 10_000) == []
+
+
+def test_outbox_take_limits(tmp_path):
+    box = Outbox(str(tmp_path / "r.csv.outbox"))
+    for seq in range(1, 6):
+        box.add(seq, rows())
+    n = len(rows())
+    assert [s for s, _ in box.take(2, 10_000)] == [1, 2]
+    assert [s for s, _ in box.take(10, 3 * n)] == [1, 2, 3]
+    assert [s for s, _ in box.take(10, 1)] == [1]  # al menos un lote
+    box.close()
+
+
+def test_aggregator_discards_repeated_batches(tmp_path):
+    store = AggregateStore(str(tmp_path / "c.sqlite"))
+    try:
+        page = rows()
+        assert store.add("S1", 1, page) == "stored"
+        assert store.add("S1", 1, page) == "duplicate"
+        assert store.add("S1", 1, rows(answer=2)) == "conflict"
+        assert store.add("S2", 1, page) == "stored"
+        # un puntaje vacío puede llegar como None o como ""
+        blank = [r[:8] + [None] for r in page]
+        assert store.add("S1", 2, blank) == "stored"
+        assert store.add("S1", 2, [r[:8] + [""] for r in page]) == "duplicate"
+        status = store.status()
+        assert status["S1"] == {"batches": 2, "rows": 2 * len(page), "last_seq": 2}
+        assert status["S2"]["rows"] == len(page)
+    finally:
+        store.close()